@@ -1,168 +1,151 @@
-from fastapi import APIRouter, UploadFile, File, Form, Body
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+import asyncio
 import pandas as pd
-from io import BytesIO, StringIO
-from datetime import datetime
-from app.utils.formatter import apply_excel_formats
+from app.core.datasets import load_dataframe
+from app.core.executor import map_blocking, run_blocking
+from app.core.overlap import find_overlap_pairs
+from app.core.partitioned import merge_by_code, read_shard, shard_files, use_partitions
+from app.core.query import compile_filters, parse_filters
+from app.core.stats import (
+    DATE_BUCKETS, GROUP_COLUMNS, OUTPUT_NAMES, combine_totals, finish_stats, stats_cache, stats_records, stats_totals,
+    top_insights, yield_stats
+)
+from app.core.export import filter_frame
+from app.api.generate import generate_export
+from app.utils.serializer import json_response
 
 router = APIRouter()
 
-ALLOWED_COLUMNS = [
-    "package", "partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
-    "boxno", "serialst", "serialsp", "inqty", "currqty", "testedqty", "goodqty", "yld", "이슈사항"
-]
-
-COLUMN_MAPPING = {
-    "testdate": "Testdate",
-    "shipdate": "shipdate",
-    "codes": "codes",
-    "serialst": "serialst",
-    "serialsp": "serialsp"
-}
-
-def detect_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    # Ensure serial columns are numeric
-    df['serialst'] = pd.to_numeric(df.get('serialst', pd.Series()), errors='coerce')
-    df['serialsp'] = pd.to_numeric(df.get('serialsp', pd.Series()), errors='coerce')
-    duplicates = []
-    for code, group in df.groupby("codes"):
-        group = group.sort_values(by=["serialst"], na_position='last')
-        for i in range(len(group) - 1):
-            curr_end = group.iloc[i]["serialsp"]
-            next_start = group.iloc[i + 1]["serialst"]
-            if pd.notna(curr_end) and pd.notna(next_start) and curr_end >= next_start:
-                duplicates.append(group.iloc[i])
-                duplicates.append(group.iloc[i + 1])
-    return pd.DataFrame(duplicates).drop_duplicates() if duplicates else pd.DataFrame(columns=df.columns)
+# Columns needed for filters, overlap pairs and stats
+ANALYZE_COLUMNS = ["codes", "lotno", "partno", "Testdate", "serialst", "serialsp", "testedqty", "goodqty"]
+
+def overlap_frame(df_filtered: pd.DataFrame) -> pd.DataFrame:
+    """Conflicting pairs with excel row numbers (header = row 1), in (code, serial) order"""
+    pairs = find_overlap_pairs(df_filtered)
+    row_numbers = df_filtered.index.to_numpy() + 2
+    return pd.DataFrame({
+        "codes":         pairs["codes"].to_numpy(),
+        "row":           row_numbers[pairs["left"].to_numpy(dtype="int64")],
+        "other_row":     row_numbers[pairs["right"].to_numpy(dtype="int64")],
+        "overlap_start": pairs["overlap_start"].to_numpy(),
+        "overlap_end":   pairs["overlap_end"].to_numpy(),
+    })
+
+def analysis_content(overlaps: pd.DataFrame, stats: pd.DataFrame, top: int = 1) -> dict:
+    """Response body from the overlap pairs and the yield stats table"""
+    overlap_records = [
+        {
+            "product_code":  code,
+            "row":           row,
+            "other_row":     other_row,
+            "overlap_start": start,
+            "overlap_end":   end,
+        }
+        for code, row, other_row, start, end in zip(*(overlaps[c].tolist() for c in overlaps.columns))
+    ]
+
+    top_groups = top_insights(stats, top)
+
+    keys = [OUTPUT_NAMES.get(col, col) for col in stats.columns[:list(stats.columns).index("testedqty")]]
+
+    def label(item: dict) -> str:
+        return " / ".join(str(item[k]) for k in keys)
+
+    insights = []
+    if top_groups["top_yield"]:
+        best = ", ".join(f"{label(item)} ({item['yield_rate']}%)" for item in top_groups["top_yield"])
+        insights.append(f"가장 수율이 높은 제품은 {best}입니다.")
+    if top_groups["top_defect"]:
+        worst = ", ".join(f"{label(item)} ({item['defect_rate']}%)" for item in top_groups["top_defect"])
+        insights.append(f"가장 불량율이 높은 제품은 {worst}입니다.")
+    insight = " ".join(insights)
+
+    return {
+        "status":      "success",
+        "yield_stats": stats_records(stats),
+        "top":         top_groups,
+        "insight":     insight,
+        "overlaps":    overlap_records
+    }
+
+def analyze_frame(df: pd.DataFrame, filters: dict, group_by: list[str] = None, bucket: str = None, top: int = 1) -> dict:
+    """Filter, overlap pairs and yield stats (runs in the worker pool)"""
+    # Filtering (same filters as the export)
+    df_filtered = filter_frame(df, filters)
+
+    # Yield & defect stats over the whole (filtered) dataset, one groupby pass
+    return analysis_content(overlap_frame(df_filtered), yield_stats(df_filtered, group_by, bucket), top)
+
+def analyze_shard(path: str, filters: dict, group_by: list[str] = None, bucket: str = None) -> tuple:
+    """One code shard: overlap pairs and partial stat totals (runs in the worker pool)"""
+    df_filtered = filter_frame(read_shard(path), filters)
+    return overlap_frame(df_filtered), stats_totals(df_filtered, group_by, bucket)
+
+def merge_analysis(parts: list[tuple], top: int = 1) -> dict:
+    """Shard results -> one response (pairs in code order, totals re-aggregated before the rates)"""
+    overlaps = merge_by_code([overlaps for overlaps, _ in parts])
+    stats = finish_stats(combine_totals([totals for _, totals in parts]))
+    return analysis_content(overlaps, stats, top)
+
+async def analyze_dataframe(df: pd.DataFrame, filters: dict, group_by: list[str] = None, bucket: str = None,
+                            top: int = 1) -> dict:
+    """analyze_frame in the worker pool; large inputs are split into code shards and analyzed on every worker"""
+    if not use_partitions(df):
+        return await run_blocking(analyze_frame, df, filters, group_by, bucket, top)
+    async with shard_files(df) as paths:
+        parts = await map_blocking(analyze_shard, [(path, filters, group_by, bucket) for path in paths])
+    return await asyncio.to_thread(merge_analysis, parts, top)
 
 @router.post("/analyze_excel")
 async def analyze_excel(
-    file: UploadFile = File(...),
-    filters: dict = Body(default={})
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    filters: str = Form("{}"),  # JSON 문자열 (app.core.query 필터 언어)
+    group_by: str = Query("codes", description="comma separated: codes, lotno, partno"),
+    bucket: str = Query(None, description="Testdate bucket: day | week | month"),
+    top: int = Query(1, ge=1)
 ):
     try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents), usecols=lambda c: c in ALLOWED_COLUMNS)
-
-        # Column cleanup & mapping
-        df.columns = [col.strip().lower() for col in df.columns]
-        df = df.rename(columns={col: COLUMN_MAPPING.get(col, col) for col in df.columns})
-
-        # Date formatting
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df.columns:
-                df[date_col] = pd.to_datetime(df[date_col], errors='coerce').dt.strftime("%Y-%m-%d")
-
-        # Filtering
-        df_filtered = df.copy()
-        if "codes" in filters:
-            df_filtered = df_filtered[df_filtered["codes"].isin(filters["codes"]) ]
-        if "testdate__gte" in filters:
-            df_filtered = df_filtered[
-                pd.to_datetime(df_filtered["testdate"]) >= pd.to_datetime(filters["testdate__gte"]) ]
-
-        # Sorting
-        sort_keys = [k for k in ["codes", "lotno", "testdate", "shipdate", "serialst"] if k in df_filtered.columns]
-        df_sorted = df_filtered.sort_values(by=sort_keys, ascending=True, na_position='last') if sort_keys else df_filtered
-
-        # Duplicate detection
-        df_dup = detect_duplicates(df_sorted)
-
-        # Yield & defect stats
-        stats = []
-        for code, grp in df_dup.groupby("codes"):
-            tested_total = int(grp.get("testedqty", pd.Series()).sum())
-            good_total   = int(grp.get("goodqty", pd.Series()).sum())
-            defect_count = tested_total - good_total
-            yield_rate   = round((good_total / tested_total * 100) if tested_total else 0.0, 1)
-            defect_rate  = round((defect_count / tested_total * 100) if tested_total else 0.0, 1)
-            stats.append({
-                "product_code": code,
-                "testedqty":    tested_total,
-                "goodqty":      good_total,
-                "defect_count": defect_count,
-                "yield_rate":   yield_rate,
-                "defect_rate":  defect_rate
+        group_cols = [col.strip() for col in group_by.split(",") if col.strip()]
+        if not set(group_cols) <= set(GROUP_COLUMNS) or (bucket and bucket not in DATE_BUCKETS):
+            return JSONResponse(status_code=400, content={
+                "error": f"❌ group_by 는 {GROUP_COLUMNS}, bucket 은 {list(DATE_BUCKETS)} 중에서 선택"
             })
 
-        top_yield = max(stats, key=lambda x: x["yield_rate"], default=None)
-        top_defect = max(stats, key=lambda x: x["defect_rate"], default=None)
-        insights = []
-        if top_yield:
-            insights.append(f"가장 수율이 높은 제품은 {top_yield['product_code']} ({top_yield['yield_rate']}%)입니다.")
-        if top_defect:
-            insights.append(f"가장 불량율이 높은 제품은 {top_defect['product_code']} ({top_defect['defect_rate']}%)입니다.")
-        insight = " ".join(insights)
-
-        return JSONResponse(content={
-            "status":      "success",
-            "yield_stats": stats,
-            "insight":     insight
-        })
-
+        filters = parse_filters(filters)
+        where = compile_filters(filters)
+
+        # Results are cached per dataset (content hash) and options
+        options = {"filters": filters, "group_by": group_cols, "bucket": bucket, "top": top}
+        if dataset_id:
+            cached = stats_cache.get(stats_cache.key(dataset_id, **options))
+            if cached is not None:
+                return json_response(cached)
+
+        # Only matching rows are read; filter columns are loaded too so the worker can re-apply them
+        columns = ANALYZE_COLUMNS + sorted(where.columns() - set(ANALYZE_COLUMNS)) if where else ANALYZE_COLUMNS
+        dataset_id, df = await load_dataframe(file, dataset_id, columns=columns, where=where)
+        content = await analyze_dataframe(df, filters, group_cols, bucket, top)
+        stats_cache.put(stats_cache.key(dataset_id, **options), content)
+        return json_response(content)
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print("❌ analyze_excel 오류:", e)
         print(traceback.format_exc())
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-# File generation endpoint (alias for generate & download)
+# File generation endpoint (alias for generate & download, same path as /generate incl. out-of-core export)
 @router.post("/generate_excel")
 @router.post("/download_result")
 async def generate_excel(
-    file: UploadFile = File(...),
+    request: Request,
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
     format: str = Form("xlsx"),
-    filters: dict = Body(default={})
+    filters: str = Form("{}")  # JSON 문자열 (app.core.query 필터 언어)
 ):
-    try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents), usecols=lambda name: name in ALLOWED_COLUMNS)
-
-        df.columns = [col.strip().lower() for col in df.columns]
-        df = df.rename(columns={col: COLUMN_MAPPING.get(col, col) for col in df.columns})
-
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df.columns:
-                df[date_col] = pd.to_datetime(df[date_col], errors='coerce').dt.strftime("%Y-%m-%d")
-
-        df_filtered = df.copy()
-        if "codes" in filters:
-            df_filtered = df_filtered[df_filtered["codes"] .isin(filters["codes"])]
-        if "Testdate__gte" in filters:
-            df_filtered = df_filtered[
-                pd.to_datetime(df_filtered["Testdate"]) >= pd.to_datetime(filters["Testdate__gte"])
-            ]
-
-        sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df.columns]
-        df_sorted = df_filtered.sort_values(by=sort_keys, ascending=True, na_position="last") if sort_keys else df_filtered
-
-        df_duplicates = detect_duplicates(df_sorted)
-
-        if format == "csv":
-            output = StringIO()
-            df_sorted.to_csv(output, index=False, encoding="utf-8-sig")
-            output.seek(0)
-            filename = f"sheetflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            media_type = "text/csv"
-        else:
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                df_sorted.to_excel(writer, index=False, sheet_name="SortedData")
-                if not df_duplicates.empty:
-                    df_duplicates.to_excel(writer, index=False, sheet_name="Duplicates")
-                apply_excel_formats(writer, df_sorted)
-            output.seek(0)
-            filename = f"sheetflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-        return StreamingResponse(
-            output,
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-
-    except Exception as e:
-        import traceback
-        print("❌ generate_excel 오류:", e)
-        print(traceback.format_exc())
-        return JSONResponse(status_code=500, content={"error": str(e)})
+    return await generate_export(request, file, dataset_id, format, filters)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
+import asyncio, os, shutil, tempfile
+from app.api.generate import export_response
+from app.core.batch import list_sheets, load_sheets, spool_files, store_sheet
+from app.core.config import BATCH_MAX_SHEETS, SPILL_DIR
+from app.core.executor import map_blocking, run_blocking
+from app.core.export import export_ext, prepare_export_frame, sort_export_frame, write_export
+from app.core.overlap import detect_duplicates
+from app.core.query import compile_filters, parse_filters
+from app.core.stats import OUTPUT_NAMES, yield_stats
+from app.utils.exporter import export_temp_path
+
+router = APIRouter()
+
+
+# 여러 파일(zip 포함) / 여러 시트를 한 번에 처리해서 통합 내보내기 파일 하나로 반환
+# 시트 파싱은 작업 풀 전체에 나눠 실행하고, 정렬 / 중복 / 통계는 합친 데이터에 한 번만 실행한다.
+
+def build_batch_export(sheets: list[tuple], filters: dict, format: str = "xlsx") -> tuple[str, str, str, dict]:
+    """시트 합치기 + 정렬 + 중복 체크 + 수율 통계 후 (임시 파일 경로, 파일명, MIME 타입, 요약) 반환 (작업 풀에서 실행)"""
+    df = load_sheets(sheets, filters)
+    df_sorted = sort_export_frame(prepare_export_frame(df, {}))  # 필터는 읽을 때 적용됨
+    df_duplicates = detect_duplicates(df_sorted)
+    stats = yield_stats(df, ["codes"]).rename(columns=OUTPUT_NAMES)
+
+    path = export_temp_path(export_ext(format))
+    try:
+        filename, media_type = write_export(df_sorted, df_duplicates, format, path, extra_sheets={"Stats": stats})
+    except BaseException:
+        os.remove(path)
+        raise
+    summary = {"rows": len(df_sorted), "duplicates": len(df_duplicates)}
+    return path, filename, media_type, summary
+
+@router.post("/")
+async def batch_export(
+    files: list[UploadFile] = File(...),  # 엑셀 / CSV / zip 여러 개
+    format: str = Form("xlsx"),  # "csv" or "xlsx"
+    filters: str = Form("{}")  # JSON 문자열로 조건 받음 (app.core.query 필터 언어)
+):
+    filters = parse_filters(filters)
+    compile_filters(filters)  # 잘못된 필터는 파싱 전에 400
+    tmp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="sheetflow_batch_", dir=SPILL_DIR)
+    try:
+        sources = await spool_files(files, tmp_dir)
+        sheets = [sheet for found in await map_blocking(list_sheets, sources) for sheet in found]
+        if not sheets:
+            raise HTTPException(status_code=400, detail="❌ 처리할 엑셀/CSV 파일이 없습니다")
+        if len(sheets) > BATCH_MAX_SHEETS:
+            raise HTTPException(status_code=400, detail=f"❌ 시트가 너무 많습니다 (최대 {BATCH_MAX_SHEETS}개)")
+
+        # ✅ 시트별 파싱 + 정규화 + 저장을 병렬로 (같은 시트는 한 번만)
+        unique = list({sheet[0]: sheet[:3] for sheet in sheets}.values())
+        await map_blocking(store_sheet, unique)
+
+        path, filename, media_type, summary = await run_blocking(build_batch_export, sheets, filters, format)
+        return export_response(path, filename, media_type, headers={
+            "X-Batch-Files": str(len(sources)),
+            "X-Batch-Sheets": str(len(sheets)),
+            "X-Batch-Rows": str(summary["rows"]),
+            "X-Batch-Duplicates": str(summary["duplicates"]),
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print("❌ batch_export 오류:", e)
+        print(traceback.format_exc())
+        return JSONResponse(status_code=500, content={"error": str(e)})
+    finally:
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, True)
@@ -1,101 +1,177 @@
-from fastapi import APIRouter, UploadFile, File, Form, Body
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
+import asyncio, os, re, tempfile
+import numpy as np
 import pandas as pd
-from io import BytesIO, StringIO
-from datetime import datetime
-from app.utils.formatter import apply_excel_formats
+from app.core.datasets import load_dataframe, uploaded_dataset
+from app.core.executor import map_blocking, run_blocking
+from app.core.export import (
+    build_export, export_ext, export_name, prepare_export_frame, sort_export_frame, write_temp_export
+)
+from app.utils.exporter import export_temp_path, write_csv_stream, write_xlsx_stream
+from app.core.config import SPILL_DIR
+from app.core.export_cache import export_cache
+from app.core.external_sort import (
+    PartitionSpill, input_memory, iter_source_chunks, merge_sorted, needs_external, partition_count, sort_partitions
+)
+from app.core.overlap import detect_duplicates
+from app.core.partitioned import code_runs, merge_runs, read_shard, shard_files, use_partitions
+from app.core.query import compile_filters, parse_filters
 
 router = APIRouter()
 
-ALLOWED_COLUMNS = [
-    "package", "partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
-    "boxno", "serialst", "serialsp", "inqty", "currqty", "testedqty", "goodqty", "yld", "이슈사항"
-]
-
-COLUMN_MAPPING = {
-    "testdate": "Testdate",
-    "shipdate": "shipdate",
-    "codes": "codes",
-    "serialst": "serialst",
-    "serialsp": "serialsp"
-}
-
-def detect_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    duplicates = []
-    for code, group in df.groupby("codes"):
-        group = group.sort_values(by=["serialst"])
-        for i in range(len(group) - 1):
-            curr_end = group.iloc[i]["serialsp"]
-            next_start = group.iloc[i + 1]["serialst"]
-            if curr_end >= next_start:
-                duplicates.append(group.iloc[i])
-                duplicates.append(group.iloc[i + 1])
-    return pd.DataFrame(duplicates).drop_duplicates() if duplicates else pd.DataFrame(columns=df.columns)
+def sort_shard(path: str, filters: dict) -> tuple[tuple, tuple]:
+    """코드 샤드 하나를 필터 + 정렬 + 겹침 검사해서 정렬 결과 / 중복 행의 (샤드 안 행 위치, 코드 구간 키, 구간 경계) 반환
+    (작업 풀에서 실행, 행 데이터는 돌려주지 않음)"""
+    df_sorted = sort_export_frame(prepare_export_frame(read_shard(path).reset_index(drop=True), filters))
+    df_duplicates = detect_duplicates(df_sorted)
+    return (
+        (df_sorted.index.to_numpy(), *code_runs(df_sorted["codes"])),
+        (df_duplicates.index.to_numpy(), *code_runs(df_duplicates["codes"])),
+    )
 
-@router.post("/generate_excel")
-async def generate_excel(
-    file: UploadFile = File(...),
-    format: str = Form("xlsx"),  # "csv" or "xlsx"
-    filters: dict = Body(default={})  # JSON으로 조건 받음
-):
+def build_shard_export(paths: list[str], parts: list[tuple], format: str = "xlsx") -> tuple[str, str, str]:
+    """sort_shard 결과를 코드 순으로 합쳐 build_export 와 같은 파일 작성 (작업 풀에서 실행)"""
+    shards = [read_shard(path).reset_index(drop=True) for path in paths]
+    offsets = np.cumsum([0] + [len(shard) for shard in shards])
+    df = pd.concat(shards, ignore_index=True)
+    del shards
+
+    def merged(i: int) -> pd.DataFrame:
+        """i = 0 정렬 결과, 1 중복 행 (샤드 안 위치 -> 합친 DataFrame 위치)"""
+        order = merge_runs([(offset + part[i][0], *part[i][1:]) for offset, part in zip(offsets, parts)])
+        return prepare_export_frame(df.take(order), {})
+
+    return write_temp_export(merged(0), merged(1), format)
+
+async def export_dataframe(df: pd.DataFrame, filters: dict, format: str = "xlsx") -> tuple[str, str, str]:
+    """build_export 를 작업 풀에서 실행 (행이 많으면 코드 샤드로 나눠 작업 풀 전체에서 정렬 / 중복 검사, app.core.partitioned)"""
+    if not use_partitions(df):
+        return await run_blocking(build_export, df, filters, format)
+    async with shard_files(df) as paths:
+        parts = await map_blocking(sort_shard, [(path, filters) for path in paths])
+        return await run_blocking(build_shard_export, paths, parts, format)
+
+def build_external_export(file_path: str, dataset_id: str, filters: dict, format: str = "xlsx") -> tuple[str, str, str]:
+    """메모리보다 큰 입력용 build_export (청크 읽기 -> 코드 해시 파티션 정렬 / 중복 검사 -> 병합 쓰기, 작업 풀에서 실행)"""
+    where = compile_filters(filters)
+    order_frame = lambda df: sort_export_frame(prepare_export_frame(df, {}))
+    with tempfile.TemporaryDirectory(prefix="sheetflow_spill_", dir=SPILL_DIR) as spill_dir:
+        spill = PartitionSpill(spill_dir, partition_count(input_memory(file_path, dataset_id)))
+        for chunk in iter_source_chunks(file_path, dataset_id, where=where):
+            spill.add(chunk)
+        columns = spill.columns()
+        sorted_paths, duplicate_paths, _ = sort_partitions(spill.close(), order_frame, spill_dir, spill.dtypes)
+
+        path = export_temp_path(export_ext(format))
+        try:
+            if format == "csv":
+                write_csv_stream(path, columns, merge_sorted(sorted_paths))
+            else:
+                write_xlsx_stream(path, columns, merge_sorted(sorted_paths), merge_sorted(duplicate_paths))
+        except BaseException:
+            os.remove(path)
+            raise
+    return (path, *export_name(format))
+
+def export_response(path: str, filename: str, media_type: str, headers: dict = None) -> FileResponse:
+    """임시 파일을 청크 단위로 보내고 전송이 끝나면 삭제"""
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}", **(headers or {})},
+        background=BackgroundTask(os.remove, path),
+    )
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 에 etag 가 있는지 (약한 비교, * 포함)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def cached_export_response(request: Request, key: str, path: str, format: str, hit: bool = True) -> Response:
+    """캐시된 내보내기 파일 응답 (ETag = 캐시 키, If-None-Match 가 같으면 본문 없이 304, 파일은 지우지 않음)"""
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Location": f"/generate/exports/{key}{export_ext(format)}",
+        "X-Export-Cache": "hit" if hit else "miss",
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    filename, media_type = export_name(format)
+    return FileResponse(path, media_type=media_type,
+                        headers={"Content-Disposition": f"attachment; filename={filename}", **headers})
+
+async def cache_export(request: Request, key: str, path: str, filename: str, media_type: str, format: str) -> Response:
+    """새로 만든 임시 내보내기 파일을 캐시에 넣고 응답 (캐시에 못 넣으면 보낸 뒤 삭제)"""
+    cached = await asyncio.to_thread(export_cache.put, key, path, export_ext(format))
+    if cached is None:
+        return export_response(path, filename, media_type, headers={"X-Export-Cache": "miss"})
+    return cached_export_response(request, key, cached, format, hit=False)
+
+async def find_cached_export(request: Request, key: str, format: str):
+    """캐시 적중이면 응답, 아니면 None"""
+    cached = await asyncio.to_thread(export_cache.get, key, export_ext(format))
+    if cached is None:
+        return None
+    return cached_export_response(request, key, cached, format)
+
+async def generate_export(request: Request, file: UploadFile, dataset_id: str, format: str, filters: str) -> Response:
+    """필터 + 정렬 + 중복 검사 결과 파일 응답 (/generate/generate_excel, /analyze/download_result 공용)"""
     try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents), usecols=lambda name: name in ALLOWED_COLUMNS)
-
-        # 컬럼 정리
-        df.columns = [col.strip().lower() for col in df.columns]
-        df = df.rename(columns={col: COLUMN_MAPPING.get(col, col) for col in df.columns})
-
-        # 날짜 포맷 통일
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df.columns:
-                df[date_col] = pd.to_datetime(df[date_col], errors="coerce").dt.strftime("%Y-%m-%d")
-
-        # ✅ 임시 조건 필터 적용
-        df_filtered = df.copy()
-        if "codes" in filters:
-            df_filtered = df_filtered[df_filtered["codes"].isin(filters["codes"])]
-        if "Testdate__gte" in filters:
-            df_filtered = df_filtered[
-                pd.to_datetime(df_filtered["Testdate"]) >= pd.to_datetime(filters["Testdate__gte"])
-            ]
-
-        # 정렬
-        sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df.columns]
-        if sort_keys:
-            df_sorted = df_filtered.sort_values(by=sort_keys, ascending=True, na_position="last")
-        else:
-            df_sorted = df_filtered
-
-        # 중복 체크
-        df_duplicates = detect_duplicates(df_sorted)
-
-        # 저장
-        if format == "csv":
-            output = StringIO()
-            df_sorted.to_csv(output, index=False, encoding="utf-8-sig")
-            output.seek(0)
-            filename = f"sheetflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            media_type = "text/csv"
-        else:
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                df_sorted.to_excel(writer, index=False, sheet_name="SortedData")
-                if not df_duplicates.empty:
-                    df_duplicates.to_excel(writer, index=False, sheet_name="Duplicates")
-                apply_excel_formats(writer, df_sorted)
-            output.seek(0)
-            filename = f"sheetflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-        return StreamingResponse(
-            output,
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        filters = parse_filters(filters)
+        where = compile_filters(filters)
 
+        # 업로드는 먼저 받아 내용 해시를 구하고, (내용, 필터, 형식) 이 같은 내보내기 파일이 캐시에 있으면 그대로 보냄
+        async with uploaded_dataset(file, dataset_id) as (dataset_id, file_path):
+            key = export_cache.key(dataset_id, filters, format)
+            cached = await find_cached_export(request, key, format)
+            if cached is not None:
+                return cached
+
+            # 메모리 예산보다 큰 입력은 청크 단위 외부 정렬 (app.core.external_sort)
+            if needs_external(dataset_id=dataset_id, file_path=file_path):
+                path, filename, media_type = await run_blocking(
+                    build_external_export, file_path, None if file_path else dataset_id, filters, format
+                )
+            else:
+                # 조건에 맞는 행만 읽음 (컬럼형 저장소에서는 row group 단위 pushdown)
+                _, df = await load_dataframe(dataset_id=dataset_id, where=where, file_path=file_path)
+                path, filename, media_type = await export_dataframe(df, filters, format)
+            return await cache_export(request, key, path, filename, media_type, format)
+
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print("❌ generate_excel 오류:", e)
         print(traceback.format_exc())
         return JSONResponse(status_code=500, content={"error": str(e)})
+
+@router.post("/generate_excel")
+async def generate_excel(
+    request: Request,
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    format: str = Form("xlsx"),  # "csv" or "xlsx"
+    filters: str = Form("{}")  # JSON 문자열로 조건 받음 (app.core.query 필터 언어)
+):
+    return await generate_export(request, file, dataset_id, format, filters)
+
+# ✅ 캐시된 내보내기 파일 다시 받기 (응답의 Content-Location, If-None-Match 면 304)
+@router.get("/exports/{name}")
+async def get_export(request: Request, name: str):
+    match = re.fullmatch(r"([0-9a-f]{64})(\.xlsx|\.csv)", name)
+    if match is None:
+        raise HTTPException(status_code=404, detail=f"❌ 내보내기 파일을 찾을 수 없음: {name}")
+    key, ext = match.groups()
+    format = ext.lstrip(".")
+    cached = await find_cached_export(request, key, format)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"❌ 내보내기 파일을 찾을 수 없음: {name}")
+    return cached
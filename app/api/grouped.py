@@ -1,70 +1,124 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
 from fastapi.responses import JSONResponse
+import numpy as np
 import pandas as pd
-from io import BytesIO
+from app.core.datasets import load_dataframe
+from app.core.executor import run_blocking
+from app.core.metrics import staged
+from app.utils.serializer import dumps, json_stream_response, ndjson_response
 
 router = APIRouter()
 
-# 사용자 컬럼명을 분석용 내부 명칭으로 매핑
-COLUMN_MAPPING = {
-    "codes": "제품코드",
-    "testdate": "준비일",     # 준비 날짜 (Test Date)
-    "shipdate": "출하일",     # 출하 날짜 (Ship Date)
-    "serialst": "시작시리얼",
-    "serialsp": "종료시리얼",
-}
+# 시리얼 로그에 필요한 컬럼 (표준 표기, 로딩 시 스키마로 정규화됨)
+REQUIRED_COLUMNS = ["codes", "Testdate", "shipdate", "serialst", "serialsp"]
+
+GROUP_SHAPES = ("rows", "columnar")
+GROUP_FORMATS = ("json", "ndjson")
+
+# 시리얼 로그 필드 -> 원본 컬럼
+LOG_FIELDS = {"test_date": "Testdate", "ship_date": "shipdate", "serial_start": "serialst", "serial_end": "serialsp"}
+GROUP_BATCH_ROWS = 10_000  # 응답을 만들 때 한 번에 포맷할 행 수 (코드 경계에서 끊음)
+
+def _log_values(s: pd.Series) -> list:
+    """날짜는 YYYY-MM-DD (없으면 None), 시리얼은 문자열 (컬럼 단위로 한 번에)"""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.strftime("%Y-%m-%d").astype(object).where(s.notna(), None).tolist()
+    return s.astype(str).str.strip().tolist()
+
+@staged("group")
+def group_page(df: pd.DataFrame, code_offset: int = 0, code_limit: int = None) -> tuple[int, pd.DataFrame, np.ndarray]:
+    """제품코드별 출하일 순 정렬 -> (전체 코드 수, 요청한 코드 구간 [code_offset, code_offset + code_limit) 의 행,
+    코드 경계) (작업 풀에서 실행, 행 포맷 / 직렬화는 iter_group_items 가 응답을 보내면서 배치 단위로)"""
+    # ✅ 시리얼이 존재하는 행만 (코드 없는 행은 그룹에서 빠짐)
+    df = df[df["serialst"].notnull() & df["serialsp"].notnull() & df["codes"].notnull()]
+    df = df.sort_values(["codes", "shipdate"], kind="stable", na_position="last")
+
+    # ✅ 코드가 바뀌는 위치 = 그룹 경계
+    codes = df["codes"].astype(object).to_numpy()
+    bounds = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1, len(codes)] if len(codes) else np.zeros(1, dtype=int)
+    total = len(bounds) - 1
+
+    first = min(code_offset, total)
+    last = total if code_limit is None else min(first + code_limit, total)
+    bounds = bounds[first:last + 1]
+    page = df.iloc[bounds[0]:bounds[-1]].reset_index(drop=True)
+    return total, page, bounds - bounds[0]
+
+def iter_group_items(page: pd.DataFrame, bounds: np.ndarray, shape: str = "rows", batch_rows: int = GROUP_BATCH_ROWS):
+    """코드별 JSON 바이트를 하나씩 생성 (코드 경계에서 끊은 batch_rows 행 내외 배치마다 컬럼 단위로 포맷
+    -> 응답 메모리는 페이지 행 + 배치 하나의 포맷 결과).
+    shape="columnar" 면 코드마다 필드별 배열 ({"product_code", "test_date": [...], ...})"""
+    codes = page["codes"].astype(object).to_numpy()
+    groups = len(bounds) - 1
+    i = 0
+    while i < groups:
+        j = min(max(int(np.searchsorted(bounds, bounds[i] + batch_rows, side="left")), i + 1), groups)
+        lo, hi = bounds[i], bounds[j]
+        fields = {name: _log_values(page[col].iloc[lo:hi]) for name, col in LOG_FIELDS.items()}
+        for begin, end in zip(bounds[i:j] - lo, bounds[i + 1:j + 1] - lo):
+            code = codes[lo + begin]
+            if shape == "columnar":
+                item = {"product_code": code, **{name: values[begin:end] for name, values in fields.items()}}
+            else:
+                logs = zip(*(values[begin:end] for values in fields.values()))
+                item = {"product_code": code, "serial_logs": [dict(zip(LOG_FIELDS, log)) for log in logs]}
+            yield dumps(item)
+        i = j
+
+def group_serial_logs(df: pd.DataFrame, code_offset: int = 0, code_limit: int = None,
+                      shape: str = "rows") -> tuple[int, list[bytes]]:
+    """제품코드별 출하일 순 시리얼 로그 -> (전체 코드 수, 코드별 JSON 바이트 목록) (한 번에 모두 만듦)"""
+    total, page, bounds = group_page(df, code_offset, code_limit)
+    return total, list(iter_group_items(page, bounds, shape))
 
 @router.post("/")
-async def group_excel(file: UploadFile = File(...)):
+async def group_excel(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    code_offset: int = Query(0, ge=0, description="건너뛸 제품코드 수"),
+    code_limit: int = Query(None, ge=1, description="응답에 담을 제품코드 수 (생략 시 전체)"),
+    shape: str = Query("rows", description="rows | columnar (코드별 필드 배열)"),
+    format: str = Query("json", description="json | ndjson (코드 하나당 한 줄)")
+):
     try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
+        if shape not in GROUP_SHAPES or format not in GROUP_FORMATS:
+            return JSONResponse(status_code=400, content={
+                "error": f"❌ shape 는 {list(GROUP_SHAPES)}, format 은 {list(GROUP_FORMATS)} 중에서 선택"
+            })
 
-        # ✅ 소문자 변환 후 매핑
-        original_columns = df.columns
-        df.columns = [col.lower() for col in df.columns]
-        df = df.rename(columns={k: v for k, v in COLUMN_MAPPING.items() if k in df.columns})
+        _, df = await load_dataframe(file, dataset_id, columns=REQUIRED_COLUMNS)
 
         # ✅ 필수 컬럼 확인
-        required = list(COLUMN_MAPPING.values())
-        for col in required:
+        for col in REQUIRED_COLUMNS:
             if col not in df.columns:
                 return JSONResponse(status_code=400, content={
                     "error": f"❌ 필수 컬럼 누락: {col}",
-                    "hint": f"현재 컬럼들: {original_columns.tolist()}"
+                    "hint": f"현재 컬럼들: {df.columns.tolist()}"
                 })
 
-        # ✅ 날짜 변환
-        df["준비일"] = pd.to_datetime(df["준비일"], errors="coerce")
-        df["출하일"] = pd.to_datetime(df["출하일"], errors="coerce")
-
-        # ✅ 시리얼이 존재하는 행만 필터링
-        df = df[df["시작시리얼"].notnull() & df["종료시리얼"].notnull()]
-
-        grouped_result = []
+        # 정렬 + 페이지 선택만 작업 풀에서, 코드별 JSON 은 응답을 보내면서 만듦 (StreamingResponse 가 스레드에서 순회)
+        total, page, bounds = await run_blocking(group_page, df, code_offset, code_limit)
+        count = len(bounds) - 1
+        next_offset = code_offset + count if code_offset + count < total else None
+        items = iter_group_items(page, bounds, shape)
         warnings = []
 
-        # ✅ 제품코드 기준 그룹화
-        for code, group in df.groupby("제품코드"):
-            logs = []
-            for _, row in group.sort_values("출하일").iterrows():
-                logs.append({
-                    "test_date": row["준비일"].strftime("%Y-%m-%d") if pd.notnull(row["준비일"]) else None,
-                    "ship_date": row["출하일"].strftime("%Y-%m-%d") if pd.notnull(row["출하일"]) else None,
-                    "serial_start": str(row["시작시리얼"]).strip(),
-                    "serial_end": str(row["종료시리얼"]).strip(),
-                })
-
-            grouped_result.append({
-                "product_code": code,
-                "serial_logs": logs,
-            })
+        # ✅ 페이지 정보는 헤더로도 (NDJSON 은 본문에 코드 목록만)
+        headers = {"X-Total-Codes": str(total), "X-Code-Offset": str(code_offset)}
+        if next_offset is not None:
+            headers["X-Next-Code-Offset"] = str(next_offset)
 
-        return JSONResponse(content={
-            "grouped_by_product": grouped_result,
-            "warnings": warnings
-        })
+        if format == "ndjson":
+            return ndjson_response(items, headers=headers)
+        return json_stream_response("grouped_by_product", items, extra={
+            "warnings": warnings,
+            "total_codes": total,
+            "code_offset": code_offset,
+            "next_code_offset": next_offset,
+        }, headers=headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"🚨 전체 처리 실패: {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.api.analyze import analyze_frame
+from app.core.datasets import dataset_exists, get_dataset, register_dataset
+from app.core.executor import run_sync
+from app.core.export import export_ext, prepare_export_frame, sort_export_frame, write_export
+from app.core.ingest import spool_upload
+from app.core.jobs import jobs, result_file
+from app.core.overlap import detect_duplicates
+from app.core.query import compile_filters, parse_filters
+
+router = APIRouter()
+
+
+# 대용량 generate / analyze 를 비동기 작업으로 실행
+# 제출 즉시 job_id 를 돌려주고, 상태 조회 / 결과 다운로드는 별도 엔드포인트에서 한다.
+# 작업 스레드는 데이터셋만 읽고, 필터 / 정렬 / 쓰기 / 분석은 run_sync 로 작업 풀에서 실행한다.
+
+def _load(job_id: str, dataset_id: str, temp_path: str, filters: dict):
+    jobs.update(job_id, "parse", 0.05)
+    where = compile_filters(filters)  # 저장소에서 조건에 맞는 row group 만 읽음
+    try:
+        if temp_path:
+            df = register_dataset(dataset_id, temp_path, where=where)
+        else:
+            df = get_dataset(dataset_id, where=where)
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+    if df is None:
+        raise ValueError(f"데이터셋을 찾을 수 없음: {dataset_id}")
+    return df.copy()
+
+
+def export_job_stages(job_id: str, df, filters: dict, format: str) -> dict:
+    """필터 -> 정렬 -> 중복 검사 -> 파일 쓰기 (작업 풀에서 실행, 진행률은 작업 저장소에 기록)"""
+    jobs.update(job_id, "filter", 0.3)
+    df_filtered = prepare_export_frame(df, filters)
+    jobs.update(job_id, "sort", 0.4)
+    df_sorted = sort_export_frame(df_filtered)
+    jobs.update(job_id, "dedupe", 0.6)
+    df_duplicates = detect_duplicates(df_sorted)
+
+    jobs.update(job_id, "write", 0.7)
+    result_path = result_file(job_id, export_ext(format))
+    filename, media_type = write_export(df_sorted, df_duplicates, format, result_path)
+    return {"result_path": result_path, "filename": filename, "media_type": media_type}
+
+
+def _generate_job(job_id: str, dataset_id: str, temp_path: str, filters: dict, format: str) -> dict:
+    df = _load(job_id, dataset_id, temp_path, filters)
+    return run_sync(export_job_stages, job_id, df, filters, format)
+
+
+def _analyze_job(job_id: str, dataset_id: str, temp_path: str, filters: dict) -> dict:
+    df = _load(job_id, dataset_id, temp_path, filters)
+    jobs.update(job_id, "analyze", 0.4)
+    return {"result": run_sync(analyze_frame, df, filters)}
+
+
+async def _resolve_source(file: UploadFile, dataset_id: str) -> tuple[str, str]:
+    """(dataset_id, 임시 파일 경로 또는 None) - 파일은 작업이 파싱 후 삭제"""
+    if file is not None:
+        return await spool_upload(file)
+    if dataset_id and await asyncio.to_thread(dataset_exists, dataset_id):
+        return dataset_id, None
+    if dataset_id:
+        raise HTTPException(status_code=404, detail=f"❌ 데이터셋을 찾을 수 없음: {dataset_id}")
+    raise HTTPException(status_code=400, detail="❌ file 또는 dataset_id 가 필요합니다")
+
+
+def _submitted(job) -> JSONResponse:
+    return JSONResponse(status_code=202, content={
+        **job.to_dict(),
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    })
+
+
+@router.post("/generate")
+async def submit_generate(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    format: str = Form("xlsx"),
+    filters: str = Form("{}")  # JSON 문자열 (app.core.query 필터 언어)
+):
+    filters = parse_filters(filters)
+    compile_filters(filters)  # 잘못된 필터는 제출 전에 400
+    dataset_id, temp_path = await _resolve_source(file, dataset_id)
+    try:
+        job = await asyncio.to_thread(jobs.submit, "generate", _generate_job, dataset_id, temp_path, filters, format)
+    except HTTPException:
+        if temp_path:
+            await asyncio.to_thread(os.remove, temp_path)
+        raise
+    return _submitted(job)
+
+
+@router.post("/analyze")
+async def submit_analyze(
+    file: UploadFile = File(None),
+    dataset_id: str = Form(None),
+    filters: str = Form("{}")  # JSON 문자열 (app.core.query 필터 언어)
+):
+    filters = parse_filters(filters)
+    compile_filters(filters)  # 잘못된 필터는 제출 전에 400
+    dataset_id, temp_path = await _resolve_source(file, dataset_id)
+    try:
+        job = await asyncio.to_thread(jobs.submit, "analyze", _analyze_job, dataset_id, temp_path, filters)
+    except HTTPException:
+        if temp_path:
+            await asyncio.to_thread(os.remove, temp_path)
+        raise
+    return _submitted(job)
+
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    job = await asyncio.to_thread(jobs.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"❌ 작업을 찾을 수 없음: {job_id}"})
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    job = await asyncio.to_thread(jobs.get, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"❌ 작업을 찾을 수 없음: {job_id}"})
+    if job.state == "failed":
+        return JSONResponse(status_code=500, content={"error": job.error})
+    if job.state != "done":
+        return JSONResponse(status_code=409, content={"error": "❌ 작업이 아직 끝나지 않았습니다", **job.to_dict()})
+
+    if job.result_path:
+        return FileResponse(job.result_path, media_type=job.media_type, filename=job.filename)
+    return JSONResponse(content=job.result)
@@ -1,16 +1,31 @@
-from fastapi import APIRouter
-from app.api.upload import latest_result  # ✅ 정확한 경로로 import
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+from app.api.upload import page_result
+from app.core.config import PREVIEW_PAGE_SIZE
+from app.core.result_store import results
+from app.utils.serializer import json_response
 
 router = APIRouter()
 
 @router.get("/")
-async def get_result():
+async def get_result(offset: int = Query(0, ge=0), limit: int = Query(PREVIEW_PAGE_SIZE, ge=1)):
+    # ✅ 가장 최근 업로드 결과 (dataset_id 별 조회는 /result/{dataset_id})
+    dataset_id, latest_result = results.latest()
     if latest_result is None:
         return {
             "result": {
                 "total": 0,
                 "duplicated": 0,
-                "duplicates": []
+                "duplicates": [],
+                "cross_file_duplicated": 0,
+                "cross_file_duplicates": []
             }
         }
-    return {"result": latest_result}
+    return json_response({"dataset_id": dataset_id, "result": page_result(latest_result, offset, limit)})
+
+@router.get("/{dataset_id}")
+async def get_result_by_id(dataset_id: str, offset: int = Query(0, ge=0), limit: int = Query(PREVIEW_PAGE_SIZE, ge=1)):
+    result = results.get(dataset_id)
+    if result is None:
+        return JSONResponse(status_code=404, content={"error": f"❌ 결과를 찾을 수 없음: {dataset_id}"})
+    return json_response({"dataset_id": dataset_id, "result": page_result(result, offset, limit)})
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+import asyncio
+from app.core.serial_index import serial_index
+from app.utils.serializer import json_response
+
+router = APIRouter()
+
+# 등록된 모든 데이터셋 기준 시리얼 조회 (업로드 / 폴더 감시로 들어온 시트가 누적됨)
+
+@router.get("/lookup")
+async def lookup_serial(codes: str = Query(...), serial: int = Query(...)):
+    # ✅ 시리얼 하나가 들어 있는 lot / box
+    matches = await asyncio.to_thread(serial_index.query, codes, serial)
+    return json_response({"codes": codes, "serial": serial, "matches": matches})
+
+@router.get("/overlaps")
+async def find_overlaps(
+    codes: str = Query(...),
+    start: int = Query(...),
+    end: int = Query(...),
+    limit: int = Query(1000, ge=1)
+):
+    # ✅ 새 구간 [start, end] 와 겹치는 기존 구간
+    if end < start:
+        return JSONResponse(status_code=400, content={"error": "❌ end 는 start 이상이어야 합니다"})
+    matches = await asyncio.to_thread(serial_index.query, codes, start, end, limit)
+    return json_response({"codes": codes, "start": start, "end": end, "matches": matches})
+
+@router.get("/stats")
+async def index_stats():
+    return await asyncio.to_thread(serial_index.stats)
@@ -1,54 +1,42 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
 import pandas as pd
-from io import BytesIO
-from app.utils.cleaner import clean_dataframe
-from app.utils.formatter import format_numbers_preview
+from app.core.datasets import load_dataframe
+from app.core.executor import run_blocking
+from app.core.metrics import staged
+from app.core.external_sort import iter_source_chunks, needs_external, run_external, streaming_head
+from app.models.schema import PREVIEW_COLUMNS
+from app.utils.serializer import json_response, preview_records
 
 router = APIRouter()
 
-@router.post("/sort_excel")
-async def sort_excel(file: UploadFile = File(...)):
-    try:
-        contents = await file.read()
-        allowed_columns = [
-            "package", "partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
-            "boxno", "serialst", "serialsp", "inqty", "currqty", "testedqty", "goodqty", "yld"
-        ]
-        df = pd.read_excel(BytesIO(contents), usecols=lambda name: name in allowed_columns)
-
-        original_columns = df.columns.tolist()
-
-        df_lower = df.copy()
-        df_lower.columns = [col.lower() for col in df_lower.columns]
-        rename_map = {
-            "testdate": "Testdate",
-            "shipdate": "shipdate",
-            "codes": "codes",
-            "serialst": "serialst",
-            "serialsp": "serialsp"
-        }
-        df_lower = df_lower.rename(columns={col: rename_map.get(col, col) for col in df_lower.columns})
+@staged("sort")
+def sort_frame(df: pd.DataFrame) -> pd.DataFrame:
+    sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df.columns]
+    return df.sort_values(by=sort_keys, ascending=True, na_position="last") if sort_keys else df
 
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df_lower.columns:
-                df_lower[date_col] = pd.to_datetime(df_lower[date_col], errors="coerce")
+def sort_preview(df: pd.DataFrame) -> list[dict]:
+    """정렬 후 상위 50행 미리보기 (작업 풀에서 실행)"""
+    return preview_records(sort_frame(df).head(50))
 
-        sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df_lower.columns]
-        df_sorted = df_lower.sort_values(by=sort_keys, ascending=True, na_position="last") if sort_keys else df_lower
+def sort_preview_external(file_path: str, dataset_id: str) -> list[dict]:
+    """메모리보다 큰 입력: 청크마다 상위 50행만 유지하며 정렬 (작업 풀에서 실행)"""
+    chunks = iter_source_chunks(file_path, dataset_id, columns=PREVIEW_COLUMNS)
+    return preview_records(streaming_head(chunks, 50, sort_frame))
 
-        df_sorted = df_sorted[[col for col in original_columns if col in df_sorted.columns]]
-        df_sorted = clean_dataframe(df_sorted)
-
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df_sorted.columns:
-                df_sorted[date_col] = df_sorted[date_col].apply(
-                    lambda x: x.strftime("%Y-%m-%d") if pd.notnull(x) and hasattr(x, "strftime") else x
-                )
+@router.post("/sort_excel")
+async def sort_excel(file: UploadFile = File(None), dataset_id: str = Form(None)):
+    try:
+        if needs_external(file, dataset_id):
+            rows = await run_external(sort_preview_external, file, dataset_id)
+            return json_response({"sorted_preview": rows})
 
-        rows = [format_numbers_preview(r) for r in df_sorted.head(50).to_dict(orient="records")]
-        return {"sorted_preview": rows}
+        _, df = await load_dataframe(file, dataset_id, columns=PREVIEW_COLUMNS)
+        rows = await run_blocking(sort_preview, df)
+        return json_response({"sorted_preview": rows})
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("❌ sort_excel 오류:", e)
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -1,79 +1,67 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
 from fastapi.responses import JSONResponse
 import pandas as pd
-import os, math
-from app.utils.cleaner import clean_dataframe
-from app.utils.formatter import format_numbers_preview
+import asyncio, os
+from app.core.config import API_UPLOAD_DIR, PREVIEW_PAGE_SIZE
+from app.core.datasets import register_dataset_async
+from app.core.executor import run_blocking
+from app.core.ingest import spool_upload
+from app.core.result_store import results
+from app.core.serial_index import serial_index
+from app.models.schema import PREVIEW_COLUMNS
+from app.utils.serializer import json_response, preview_records
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploaded_files"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(API_UPLOAD_DIR, exist_ok=True)
 
-latest_result = None
+def summarize_duplicates(df: pd.DataFrame) -> dict:
+    """전체 행 수 + 완전 중복 행 목록 (작업 풀에서 실행)"""
+    subset = ["codes", "serialst", "serialsp", "Testdate"]
+    keys = df[subset].copy()
+    keys["Testdate"] = keys["Testdate"].dt.floor("D")  # 날짜 단위 비교
+    dups = df[keys.duplicated(keep=False)]
 
-def clean_json_safe(obj):
-    if isinstance(obj, float) and math.isnan(obj):
-        return None
-    if isinstance(obj, list):
-        return [clean_json_safe(x) for x in obj]
-    if isinstance(obj, dict):
-        return {k: clean_json_safe(v) for k, v in obj.items()}
-    return obj
+    return {
+        "total": len(df),
+        "duplicated": len(dups),
+        "duplicates": preview_records(dups)
+    }
+
+def page_result(result: dict, offset: int, limit: int) -> dict:
+    """duplicates / cross_file_duplicates 목록 중 [offset, offset + limit) 구간만 반환"""
+    paged = {**result, "offset": offset, "limit": limit}
+    for key in ("duplicates", "cross_file_duplicates"):
+        if key in result:
+            paged[key] = result[key][offset:offset + limit]
+    return paged
 
 @router.post("/")
-async def upload_excel(file: UploadFile = File(...)):
-    global latest_result
+async def upload_excel(
+    file: UploadFile = File(...),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(PREVIEW_PAGE_SIZE, ge=1)
+):
     try:
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-
-        allowed_columns = [
-            "package", "partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
-            "boxno", "serialst", "serialsp", "inqty", "currqty", "testedqty", "goodqty", "yld"
-        ]
-        df = pd.read_excel(file_path, usecols=lambda name: name in allowed_columns)
-
-        df.columns = [col.strip().lower() for col in df.columns]
-        rename_map = {
-            "testdate": "Testdate",
-            "shipdate": "shipdate",
-            "codes": "codes",
-            "serialst": "serialst",
-            "serialsp": "serialsp"
-        }
-        df = df.rename(columns={col: rename_map.get(col, col) for col in df.columns})
-
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in df.columns:
-                df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-                df[date_col] = df[date_col].apply(lambda x: x.strftime("%Y-%m-%d") if pd.notnull(x) else None)
+        dataset_id, file_path = await spool_upload(file, os.path.join(API_UPLOAD_DIR, file.filename))
+        df = await register_dataset_async(dataset_id, file_path, file_path, columns=PREVIEW_COLUMNS)
 
         required = {"codes", "serialst", "serialsp"}
         if not required.issubset(df.columns):
             return JSONResponse(status_code=400, content={"error": "❌ Missing required columns"})
 
-        dups = df[df.duplicated(subset=["codes", "serialst", "serialsp", "Testdate"], keep=False)].copy()
-
-        for date_col in ["Testdate", "shipdate"]:
-            if date_col in dups.columns:
-                dups[date_col] = pd.to_datetime(dups[date_col], errors="coerce")
-                dups[date_col] = dups[date_col].apply(lambda x: x.strftime("%Y-%m-%d") if pd.notnull(x) else None)
-
-        df = clean_dataframe(df)
-        dups = clean_dataframe(dups)
+        safe_result = await run_blocking(summarize_duplicates, df)
 
-        safe_result = {
-            "total": len(df),
-            "duplicated": len(dups),
-            "duplicates": [format_numbers_preview(r) for r in dups.to_dict(orient="records")]
-        }
-        safe_result = clean_json_safe(safe_result)
+        # ✅ 이전 업로드 파일들과 겹치는 시리얼 구간 (새 파일의 행만 검사)
+        cross_file = await asyncio.to_thread(serial_index.add_dataset, dataset_id, df, file.filename)
+        safe_result["cross_file_duplicated"] = len(cross_file)
+        safe_result["cross_file_duplicates"] = cross_file
 
-        latest_result = safe_result
-        return JSONResponse(content={"result": safe_result})
+        await asyncio.to_thread(results.put, dataset_id, safe_result)
+        return json_response({"dataset_id": dataset_id, "result": page_result(safe_result, offset, limit)})
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("❌ 예외 발생:", e)
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import os
+import zipfile
+
+import pandas as pd
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import BATCH_MAX_BYTES, BATCH_MAX_FILES, BATCH_ZIP_MAX_RATIO, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+from app.core.dataset_store import has_dataset, load_dataset, save_dataset
+from app.core.datasets import parse_file
+from app.core.ingest import hash_file, spool_upload
+from app.core.query import apply_filters, compile_filters
+from app.core.readers import sheet_names
+
+
+# 여러 파일 / 시트 일괄 처리
+# 1) 업로드 파일을 임시 폴더에 받고, zip 은 풀어서 엑셀/CSV 만 꺼낸다
+#    (파일 하나 / 요청 전체 크기와 zip 항목의 압축률을 제한 - 압축 폭탄으로 디스크가 차지 않게).
+# 2) 파일별 시트 목록을 만들고 시트마다 dataset_id 를 정한다 (첫 시트는 파일 해시 = /upload 와 같은 데이터셋).
+# 3) 시트 파싱 + 정규화 + 컬럼형 저장소 저장은 작업 풀 전체에 나눠 실행한다 (이미 저장된 시트는 건너뜀).
+# 4) 합치기 단계는 저장소에서 (필터 pushdown 으로) 다시 읽으므로 DataFrame 을 프로세스 간에 넘기지 않는다.
+
+BATCH_EXTENSIONS = (".xlsx", ".xls", ".csv")
+SOURCE_COLUMN = "source"  # 행이 온 파일:시트
+
+
+def _accept(name: str) -> bool:
+    return name.lower().endswith(BATCH_EXTENSIONS) and not name.startswith(("~$", "."))
+
+
+def _too_many() -> HTTPException:
+    return HTTPException(status_code=400, detail=f"❌ 파일이 너무 많습니다 (최대 {BATCH_MAX_FILES}개)")
+
+
+def _too_much(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"❌ {detail} (요청 전체 최대 {BATCH_MAX_BYTES // (1024 * 1024)}MB)")
+
+
+def extract_zip(path: str, dest_dir: str, start: int = 0, zip_name: str = None,
+                max_bytes: int = BATCH_MAX_BYTES) -> tuple[list[tuple[str, str]], int]:
+    """zip 안의 엑셀/CSV 를 dest_dir 에 풀고 ((파일명, 경로) 목록, 풀린 바이트 수) 반환
+    (하위 폴더 경로는 버림, 풀린 크기는 항목마다 UPLOAD_MAX_BYTES / 압축률 BATCH_ZIP_MAX_RATIO,
+    전체 max_bytes 로 제한 - 헤더의 크기를 믿지 않고 실제로 풀린 바이트로 검사)"""
+    files = []
+    extracted = 0
+    try:
+        with zipfile.ZipFile(path) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and _accept(os.path.basename(info.filename))
+            ]
+            if start + len(members) > BATCH_MAX_FILES:
+                raise _too_many()
+            if sum(info.file_size for info in members) > max_bytes:
+                raise _too_much(f"zip 을 풀면 용량 초과: {zip_name or os.path.basename(path)}")
+            for info in members:
+                name = os.path.basename(info.filename)
+                target = os.path.join(dest_dir, f"{start + len(files)}_{name}")
+                limit = min(UPLOAD_MAX_BYTES, BATCH_ZIP_MAX_RATIO * max(info.compress_size, 1))
+                total = 0
+                with archive.open(info) as src, open(target, "wb") as dst:
+                    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                        total += len(chunk)
+                        if total > limit:
+                            raise HTTPException(status_code=413, detail=f"❌ zip 안의 파일 용량 / 압축률 초과: {name}")
+                        if extracted + total > max_bytes:
+                            raise _too_much(f"zip 을 풀면 용량 초과: {zip_name or os.path.basename(path)}")
+                        dst.write(chunk)
+                extracted += total
+                files.append((name, target))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"❌ zip 파일을 열 수 없음: {zip_name or os.path.basename(path)}")
+    return files, extracted
+
+
+async def spool_files(uploads: list[UploadFile], dest_dir: str) -> list[tuple[str, str]]:
+    """업로드 파일들을 dest_dir 에 저장 (zip 은 풀어서) 후 (파일명, 경로) 목록 반환
+    (업로드 + 풀린 파일 크기 합계가 BATCH_MAX_BYTES 를 넘으면 413)"""
+    files = []
+    total = 0
+    for upload in uploads:
+        name = os.path.basename(upload.filename or "")
+        is_zip = name.lower().endswith(".zip")
+        if not is_zip and not _accept(name):
+            raise HTTPException(status_code=400, detail=f"❌ 지원하지 않는 파일 형식: {name}")
+        if len(files) >= BATCH_MAX_FILES:
+            raise _too_many()
+
+        _, path = await spool_upload(upload, os.path.join(dest_dir, f"{len(files)}_{name}"))
+        if is_zip:
+            found, extracted = await asyncio.to_thread(
+                extract_zip, path, dest_dir, len(files), name, BATCH_MAX_BYTES - total
+            )
+            await asyncio.to_thread(os.remove, path)
+            files.extend(found)
+            total += extracted
+        else:
+            files.append((name, path))
+            total += await asyncio.to_thread(os.path.getsize, path)
+        if total > BATCH_MAX_BYTES:
+            raise _too_much("업로드 용량 초과")
+    return files
+
+
+def sheet_dataset_id(file_id: str, index: int, sheet: str) -> str:
+    """첫 시트는 파일 해시 그대로 (/upload 와 공유), 나머지는 파일 해시 + 시트명"""
+    if index == 0:
+        return file_id
+    return hashlib.sha256(f"{file_id}:{sheet}".encode("utf-8")).hexdigest()
+
+
+def list_sheets(name: str, path: str) -> list[tuple]:
+    """파일 하나의 (dataset_id, 경로, 시트명, 출처) 목록 (작업 풀에서 실행, CSV 는 시트명 None)"""
+    file_id = hash_file(path)
+    if path.lower().endswith(".csv"):
+        return [(file_id, path, None, name)]
+    sheets = sheet_names(path)
+    return [(sheet_dataset_id(file_id, i, sheet), path, sheet, f"{name}:{sheet}") for i, sheet in enumerate(sheets)]
+
+
+def store_sheet(dataset_id: str, path: str, sheet: str = None) -> int:
+    """시트 하나를 파싱 + 정규화해서 컬럼형 저장소에 저장 (작업 풀에서 실행, 저장된 행 수 반환)"""
+    if has_dataset(dataset_id):
+        return 0
+    df = parse_file(path, sheet)
+    save_dataset(dataset_id, df)
+    return len(df)
+
+
+def load_sheets(sheets: list[tuple], filters: dict) -> pd.DataFrame:
+    """저장된 시트들을 조건에 맞는 행만 읽어 하나로 합침 (출처 컬럼 추가)"""
+    where = compile_filters(filters)
+    frames = []
+    for dataset_id, path, sheet, source in sheets:
+        df = load_dataset(dataset_id, where=where)
+        if df is None:  # 저장소 비활성화 (pyarrow 없음)
+            df = apply_filters(parse_file(path, sheet), where)
+        frames.append(df.assign(**{SOURCE_COLUMN: source}))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
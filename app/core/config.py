@@ -0,0 +1,104 @@
+import os
+
+
+# 배포 환경별 설정 (환경변수로 덮어쓰기 가능)
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+UPLOAD_DIR = os.environ.get("SHEETFLOW_UPLOAD_DIR", "uploaded_files")  # 폴더 감시 대상 (여기 넣은 파일은 자동 분석)
+# /upload 로 받은 원본 (감시 폴더 밖 - 하위 폴더는 감시하지 않음, 같은 업로드를 감시 워커가 다시 처리하지 않게)
+API_UPLOAD_DIR = os.environ.get("SHEETFLOW_API_UPLOAD_DIR", os.path.join(UPLOAD_DIR, "api"))
+
+# ✅ 업로드 세션 캐시 (파싱 + 정규화된 DataFrame)
+DATASET_CACHE_MAX_BYTES = _env_int("SHEETFLOW_DATASET_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+DATASET_CACHE_MAX_ITEMS = _env_int("SHEETFLOW_DATASET_CACHE_MAX_ITEMS", 32)
+DATASET_CACHE_TTL = _env_int("SHEETFLOW_DATASET_CACHE_TTL", 30 * 60)  # 초
+
+# ✅ 컬럼형 데이터셋 저장소 (Parquet)
+DATASET_STORE_DIR = os.environ.get("SHEETFLOW_DATASET_STORE_DIR", "dataset_store")
+DATASET_ROW_GROUP_ROWS = _env_int("SHEETFLOW_DATASET_ROW_GROUP_ROWS", 64 * 1024)  # 필터 pushdown 단위
+
+# ✅ 업로드 수신 (청크 단위 스트리밍)
+UPLOAD_MAX_BYTES = _env_int("SHEETFLOW_UPLOAD_MAX_BYTES", 512 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = _env_int("SHEETFLOW_UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+# ✅ 요청별 최대 메모리 측정 (tracemalloc, 측정 중에는 느려짐)
+TRACE_MEMORY = os.environ.get("SHEETFLOW_TRACE_MEMORY", "0") == "1"
+
+# ✅ 시작 예열: 첫 / 응답 뒤 (늦어도 이 시간 뒤) 백그라운드에서 라우터 import + 폴더 감시 시작
+# 예열 전에 들어온 요청은 해당 라우터만 그 자리에서 import 한다 (0 이면 시작하자마자 예열)
+STARTUP_WARMUP_DELAY_MS = _env_int("SHEETFLOW_STARTUP_WARMUP_DELAY_MS", 2000)
+
+# ✅ 요청 지표 (/metrics) + ?profile=1 요청별 cProfile 결과 허용 여부 (기본 꺼짐, 개발 / 측정 환경에서만 1)
+PROFILE_REQUESTS = os.environ.get("SHEETFLOW_PROFILE_REQUESTS", "0") == "1"
+
+# ✅ 무거운 pandas/openpyxl 작업 실행 풀 + 동시 실행 제한
+EXECUTOR_MODE = os.environ.get("SHEETFLOW_EXECUTOR", "process")  # "process" | "thread"
+EXECUTOR_WORKERS = _env_int("SHEETFLOW_EXECUTOR_WORKERS", os.cpu_count() or 1)
+MAX_IN_FLIGHT = _env_int("SHEETFLOW_MAX_IN_FLIGHT", EXECUTOR_WORKERS)
+MAX_QUEUE = _env_int("SHEETFLOW_MAX_QUEUE", 4 * EXECUTOR_WORKERS)
+
+# ✅ 비동기 작업(job) 실행 + 결과 파일 보관
+JOB_WORKERS = _env_int("SHEETFLOW_JOB_WORKERS", 2)
+JOB_MAX_PENDING = _env_int("SHEETFLOW_JOB_MAX_PENDING", 16)  # 대기 + 실행 중
+JOB_RESULT_DIR = os.environ.get("SHEETFLOW_JOB_RESULT_DIR", "job_results")
+JOB_RETENTION = _env_int("SHEETFLOW_JOB_RETENTION", 24 * 60 * 60)  # 초
+JOB_RESULT_MAX_BYTES = _env_int("SHEETFLOW_JOB_RESULT_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+JOB_DB_PATH = os.environ.get("SHEETFLOW_JOB_DB", "sheetflow_jobs.db")  # 작업 상태 (여러 워커 공유)
+
+# ✅ 업로드 분석 결과 저장소 (메모리 LRU + SQLite, 여러 워커 공유)
+RESULT_DB_PATH = os.environ.get("SHEETFLOW_RESULT_DB", "sheetflow_results.db")
+RESULT_CACHE_ITEMS = _env_int("SHEETFLOW_RESULT_CACHE_ITEMS", 64)
+RESULT_RETENTION = _env_int("SHEETFLOW_RESULT_RETENTION", 7 * 24 * 60 * 60)  # 초
+
+# ✅ 내보내기 (xlsxwriter constant_memory, 행 청크 단위)
+EXPORT_CHUNK_ROWS = _env_int("SHEETFLOW_EXPORT_CHUNK_ROWS", 10_000)
+# 값 있는 셀 노란색 방식: "conditional" (조건부 서식) | "cells" (셀 서식) | "auto" (행 수로 선택)
+XLSX_FORMAT_MODE = os.environ.get("SHEETFLOW_XLSX_FORMAT_MODE", "auto")
+XLSX_CONDITIONAL_MAX_ROWS = _env_int("SHEETFLOW_XLSX_CONDITIONAL_MAX_ROWS", 100_000)  # auto 일 때 이 행 수까지 조건부 서식
+
+# ✅ 내보내기 파일 캐시 (같은 업로드 내용 + 필터 + 형식이면 다시 만들지 않음, 0 이면 비활성화)
+EXPORT_CACHE_DIR = os.environ.get("SHEETFLOW_EXPORT_CACHE_DIR", "export_cache")
+EXPORT_CACHE_MAX_BYTES = _env_int("SHEETFLOW_EXPORT_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+
+# ✅ JSON 미리보기 페이지 크기 (/upload, /result 의 duplicates)
+PREVIEW_PAGE_SIZE = _env_int("SHEETFLOW_PREVIEW_PAGE_SIZE", 500)
+
+# ✅ 제품코드별 시리얼 구간 인덱스 (SQLite + 코드별 정렬 배열)
+SERIAL_INDEX_DB = os.environ.get("SHEETFLOW_SERIAL_INDEX_DB", "sheetflow_serials.db")
+SERIAL_INDEX_CODES = _env_int("SHEETFLOW_SERIAL_INDEX_CODES", 256)  # 메모리에 정렬 배열을 둘 코드 수 (LRU)
+
+# ✅ 폴더 감시 수집 (쓰기 완료 대기 -> 제한된 대기열 -> 워커 풀)
+WATCH_DEBOUNCE_MS = _env_int("SHEETFLOW_WATCH_DEBOUNCE_MS", 1000)  # 크기/수정시각이 이 시간 동안 그대로면 쓰기 완료
+WATCH_POLL_MS = _env_int("SHEETFLOW_WATCH_POLL_MS", 250)
+WATCH_QUEUE_SIZE = _env_int("SHEETFLOW_WATCH_QUEUE_SIZE", 64)
+WATCH_WORKERS = _env_int("SHEETFLOW_WATCH_WORKERS", EXECUTOR_WORKERS)
+WATCH_OUTPUT_DIR = os.environ.get("SHEETFLOW_WATCH_OUTPUT_DIR", "auto_generated")
+
+# ✅ /analyze 결과 캐시 (dataset_id + 옵션 기준)
+ANALYZE_CACHE_ITEMS = _env_int("SHEETFLOW_ANALYZE_CACHE_ITEMS", 128)
+
+# ✅ 여러 파일 / 시트 일괄 처리 (/batch, zip 은 풀어서 파일별로 처리)
+BATCH_MAX_FILES = _env_int("SHEETFLOW_BATCH_MAX_FILES", 200)  # zip 안의 파일 포함
+BATCH_MAX_SHEETS = _env_int("SHEETFLOW_BATCH_MAX_SHEETS", 1000)
+BATCH_MAX_BYTES = _env_int("SHEETFLOW_BATCH_MAX_BYTES", 2 * 1024 * 1024 * 1024)  # 요청 하나의 업로드 + zip 풀린 크기 합계
+BATCH_ZIP_MAX_RATIO = _env_int("SHEETFLOW_BATCH_ZIP_MAX_RATIO", 200)  # zip 항목 하나의 풀린 크기 / 압축 크기 상한
+
+# ✅ 시트 읽기 엔진 (auto | calamine | openpyxl | pandas, CSV 는 auto | pyarrow | pandas)
+EXCEL_ENGINE = os.environ.get("SHEETFLOW_EXCEL_ENGINE", "auto")
+CSV_ENGINE = os.environ.get("SHEETFLOW_CSV_ENGINE", "auto")
+
+# ✅ 메모리보다 큰 입력의 정렬 / 중복 검사 (청크 읽기 -> 코드 해시 파티션 spill -> 파티션별 정렬 -> 병합 쓰기)
+SORT_MEMORY_BUDGET = _env_int("SHEETFLOW_SORT_MEMORY_BUDGET", 1024 * 1024 * 1024)  # 파티션 하나를 정렬할 때 쓸 메모리
+EXTERNAL_CHUNK_ROWS = _env_int("SHEETFLOW_EXTERNAL_CHUNK_ROWS", 100_000)
+SPILL_DIR = os.environ.get("SHEETFLOW_SPILL_DIR") or None  # 없으면 시스템 임시 폴더
+
+# ✅ 코드 샤드 병렬 처리 (행이 많으면 codes 별 샤드로 나눠 작업 풀 전체에서 정렬 / 중복 검사 / 통계)
+PARTITION_MIN_ROWS = _env_int("SHEETFLOW_PARTITION_MIN_ROWS", 500_000)  # 0 이면 비활성화
+PARTITION_SHARDS = _env_int("SHEETFLOW_PARTITION_SHARDS", EXECUTOR_WORKERS)
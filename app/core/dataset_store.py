@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+
+from app.core.config import DATASET_ROW_GROUP_ROWS, DATASET_STORE_DIR
+from app.core.metrics import staged
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 저장소 비활성화 (매번 엑셀 파싱)
+    pq = None
+
+
+# 컬럼형 데이터셋 저장소
+# 최초 업로드 시 정규화된 DataFrame 을 Parquet 으로 저장하고,
+# 이후에는 메모리 맵으로 필요한 컬럼만 읽는다.
+# 필터가 있으면 pyarrow 필터 식으로 넘겨서 row group 통계로 걸러지는 구간은 읽지 않는다.
+# 원본 행 위치(엑셀 행 번호 계산용)는 ROW_COLUMN 으로 함께 저장해서 필터 후에도 index 로 복원한다.
+
+ROW_COLUMN = "__row__"
+
+
+def _path(dataset_id: str) -> str:
+    return os.path.join(DATASET_STORE_DIR, f"{dataset_id}.parquet")
+
+
+def has_dataset(dataset_id: str) -> bool:
+    return pq is not None and os.path.exists(_path(dataset_id))
+
+
+@staged("store_save")
+def save_dataset(dataset_id: str, df: pd.DataFrame):
+    """정규화된 DataFrame 을 Parquet 으로 저장 (임시 파일에 쓴 뒤 교체)"""
+    if pq is None:
+        return
+    os.makedirs(DATASET_STORE_DIR, exist_ok=True)
+    path = _path(dataset_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df = df.reset_index(drop=True).rename_axis(ROW_COLUMN).reset_index()
+    df.to_parquet(tmp_path, engine="pyarrow", index=False, row_group_size=DATASET_ROW_GROUP_ROWS)
+    os.replace(tmp_path, path)
+
+
+@staged("store_load")
+def load_dataset(dataset_id: str, columns: list[str] = None, where=None):
+    """저장된 데이터셋을 메모리 맵으로 읽음 (columns 지정 시 해당 컬럼만, where 는 app.core.query 조건, 없으면 None)"""
+    if not has_dataset(dataset_id):
+        return None
+    path = _path(dataset_id)
+    available = pq.read_schema(path).names
+    has_rows = ROW_COLUMN in available
+    read_columns = None
+    if columns is not None:
+        extra = where.columns() - set(columns) if where is not None and not has_rows else set()
+        read_columns = [col for col in available if col in set(columns) | extra or col == ROW_COLUMN]
+
+    if where is not None and has_rows:
+        table = pq.read_table(path, columns=read_columns, filters=where.expression(), memory_map=True)
+    else:
+        table = pq.read_table(path, columns=read_columns, memory_map=True)
+    df = table.to_pandas()
+
+    if has_rows:
+        df = df.set_index(ROW_COLUMN).rename_axis(None)
+    elif where is not None:
+        # 행 위치가 없는 이전 저장본은 전체를 읽은 뒤 마스크로 필터
+        df = df[where.mask(df)]
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+def dataset_bytes(dataset_id: str) -> int:
+    """저장 파일 크기 (없으면 0)"""
+    return os.path.getsize(_path(dataset_id)) if has_dataset(dataset_id) else 0
+
+
+def iter_dataset(dataset_id: str, columns: list[str] = None, batch_rows: int = DATASET_ROW_GROUP_ROWS):
+    """저장된 데이터셋을 batch_rows 행씩 읽음 (전체를 메모리에 올리지 않음)"""
+    path = _path(dataset_id)
+    parquet = pq.ParquetFile(path, memory_map=True)
+    available = parquet.schema_arrow.names
+    read_columns = None if columns is None else [col for col in available if col in set(columns) or col == ROW_COLUMN]
+    start = 0
+    for batch in parquet.iter_batches(batch_size=batch_rows, columns=read_columns):
+        df = batch.to_pandas()
+        if ROW_COLUMN in df.columns:
+            df = df.set_index(ROW_COLUMN).rename_axis(None)
+        else:
+            df.index = range(start, start + len(df))
+        start += len(df)
+        yield df
@@ -0,0 +1,198 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import pandas as pd
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import DATASET_CACHE_MAX_BYTES, DATASET_CACHE_MAX_ITEMS, DATASET_CACHE_TTL
+from app.core.dataset_store import has_dataset, load_dataset, save_dataset
+from app.core.executor import run_blocking, run_sync
+from app.core.ingest import hash_file, spool_upload
+from app.core.query import apply_filters
+from app.core.readers import read_csv, read_excel
+from app.models.schema import ALLOWED_COLUMNS, normalize_frame
+
+
+# 업로드 세션 캐시
+# 업로드 내용의 해시를 dataset_id 로 사용하고, 파싱 + 정규화된 DataFrame 을
+# 메모리 상한(바이트) / 개수 / TTL 기준의 LRU 캐시에 보관한다.
+# 캐시 미스 시 컬럼형 저장소(app.core.dataset_store)에서 먼저 읽는다.
+
+class DatasetCache:
+    def __init__(self, max_bytes: int, max_items: int, ttl: int):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # dataset_id -> (df, nbytes, last_access)
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str):
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                return None
+            df, nbytes, last_access = entry
+            if time.monotonic() - last_access > self.ttl:
+                self._pop(dataset_id)
+                return None
+            self._entries[dataset_id] = (df, nbytes, time.monotonic())
+            self._entries.move_to_end(dataset_id)
+            return df
+
+    def put(self, dataset_id: str, df: pd.DataFrame):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return  # 캐시 한도보다 큰 시트는 보관하지 않음
+        with self._lock:
+            if dataset_id in self._entries:
+                self._pop(dataset_id)
+            self._entries[dataset_id] = (df, nbytes, time.monotonic())
+            self.total_bytes += nbytes
+            self._evict()
+
+    def _pop(self, dataset_id: str):
+        _, nbytes, _ = self._entries.pop(dataset_id)
+        self.total_bytes -= nbytes
+
+    def _evict(self):
+        now = time.monotonic()
+        for dataset_id in [k for k, (_, _, t) in self._entries.items() if now - t > self.ttl]:
+            self._pop(dataset_id)
+        while self._entries and (self.total_bytes > self.max_bytes or len(self._entries) > self.max_items):
+            self._pop(next(iter(self._entries)))
+
+
+_cache = DatasetCache(DATASET_CACHE_MAX_BYTES, DATASET_CACHE_MAX_ITEMS, DATASET_CACHE_TTL)
+_sources = {}  # dataset_id -> 원본 파일 경로 (저장소에 없을 때 재파싱용)
+
+
+def parse_excel(source, sheet=None) -> pd.DataFrame:
+    """엑셀을 읽어 표준 컬럼/타입으로 정규화 (스키마 컬럼만 읽음, 엔진은 app.core.readers)"""
+    return normalize_frame(read_excel(source, sheet, ALLOWED_COLUMNS))
+
+
+def parse_file(source, sheet=None) -> pd.DataFrame:
+    """파일 경로가 .csv 면 CSV, 그 외에는 엑셀로 읽어 정규화"""
+    if isinstance(source, str) and source.lower().endswith(".csv"):
+        return normalize_frame(read_csv(source, ALLOWED_COLUMNS))
+    return parse_excel(source, sheet)
+
+
+def parse_and_store(dataset_id: str, source) -> pd.DataFrame:
+    """파일 파싱 + 컬럼형 저장소 저장 (작업 풀에서 실행)"""
+    df = parse_file(source)
+    save_dataset(dataset_id, df)
+    return df
+
+
+def _select(df: pd.DataFrame, columns: list[str] = None, where=None) -> pd.DataFrame:
+    df = apply_filters(df, where)
+    return df if columns is None else df[[col for col in columns if col in df.columns]]
+
+
+def find_dataset(dataset_id: str, columns: list[str] = None, where=None):
+    """캐시 -> 컬럼형 저장소 순으로 조회 (없으면 None, where 는 저장소에서 pushdown)"""
+    df = _cache.get(dataset_id)
+    if df is not None:
+        return _select(df, columns, where)
+
+    df = load_dataset(dataset_id, columns, where)
+    if df is not None and columns is None and where is None:
+        _cache.put(dataset_id, df)
+    return df
+
+
+def _source_for(dataset_id: str):
+    """재파싱용 원본 경로 (없거나 같은 이름의 다른 파일로 덮어써졌으면 None)"""
+    file_path = _sources.get(dataset_id)
+    if not file_path or not os.path.exists(file_path) or hash_file(file_path) != dataset_id:
+        return None
+    return file_path
+
+
+def register_dataset(dataset_id: str, source, file_path: str = None, columns: list[str] = None, where=None) -> pd.DataFrame:
+    """업로드 내용을 등록 (캐시 -> 컬럼형 저장소 -> source 엑셀 파싱 순으로 조회, 스레드에서 호출)"""
+    if file_path:
+        _sources[dataset_id] = file_path
+
+    df = find_dataset(dataset_id, columns, where)
+    if df is None:
+        df = run_sync(parse_and_store, dataset_id, source)
+        _cache.put(dataset_id, df)
+        df = _select(df, columns, where)
+    return df
+
+
+def get_dataset(dataset_id: str, columns: list[str] = None, where=None):
+    """dataset_id 로 조회 (캐시 -> 저장소 -> 원본 재파싱, 없으면 None, 스레드에서 호출)"""
+    df = find_dataset(dataset_id, columns, where)
+    if df is None:
+        source = _source_for(dataset_id)
+        if source is not None:
+            df = register_dataset(dataset_id, source, source, columns, where)
+    return df
+
+
+def dataset_exists(dataset_id: str) -> bool:
+    return _cache.get(dataset_id) is not None or has_dataset(dataset_id) or _source_for(dataset_id) is not None
+
+
+async def register_dataset_async(dataset_id: str, source, file_path: str = None, columns: list[str] = None, where=None) -> pd.DataFrame:
+    """register_dataset 과 같지만 조회/파싱을 이벤트 루프 밖에서 실행"""
+    if file_path:
+        _sources[dataset_id] = file_path
+
+    df = await asyncio.to_thread(find_dataset, dataset_id, columns, where)
+    if df is None:
+        df = await run_blocking(parse_and_store, dataset_id, source)
+        _cache.put(dataset_id, df)
+        df = _select(df, columns, where)
+    return df
+
+
+async def load_dataframe(file: UploadFile = None, dataset_id: str = None, columns: list[str] = None, where=None,
+                         file_path: str = None) -> tuple[str, pd.DataFrame]:
+    """업로드 파일 또는 dataset_id 로 (dataset_id, DataFrame 복사본) 반환
+    (columns 지정 시 해당 컬럼만, where 지정 시 조건에 맞는 행만 - app.core.query,
+    file_path 는 uploaded_dataset 으로 이미 받아 둔 업로드 파일)"""
+    if file_path:
+        df = await register_dataset_async(dataset_id, file_path, columns=columns, where=where)
+    elif dataset_id:
+        df = await asyncio.to_thread(find_dataset, dataset_id, columns, where)
+        if df is None:
+            source = await asyncio.to_thread(_source_for, dataset_id)
+            if source is None:
+                raise HTTPException(status_code=404, detail=f"❌ 데이터셋을 찾을 수 없음: {dataset_id}")
+            df = await register_dataset_async(dataset_id, source, source, columns, where)
+    elif file is not None:
+        dataset_id, file_path = await spool_upload(file)
+        try:
+            df = await register_dataset_async(dataset_id, file_path, columns=columns, where=where)
+        finally:
+            os.remove(file_path)
+    else:
+        raise HTTPException(status_code=400, detail="❌ file 또는 dataset_id 가 필요합니다")
+
+    # 캐시 원본은 공유되므로 라우터에서는 복사본을 가공
+    return dataset_id, df.copy()
+
+
+@asynccontextmanager
+async def uploaded_dataset(file: UploadFile = None, dataset_id: str = None):
+    """업로드 파일을 먼저 받아 내용 해시로 (dataset_id, 임시 파일 경로) 를 넘기고 끝나면 임시 파일 삭제
+    (dataset_id 가 있으면 업로드는 무시하고 (dataset_id, None), 파싱 전에 dataset_id 로 캐시를 찾을 때 사용)"""
+    if dataset_id:
+        yield dataset_id, None
+        return
+    if file is None:
+        raise HTTPException(status_code=400, detail="❌ file 또는 dataset_id 가 필요합니다")
+    dataset_id, file_path = await spool_upload(file)
+    try:
+        yield dataset_id, file_path
+    finally:
+        await asyncio.to_thread(os.remove, file_path)
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from fastapi import HTTPException
+
+from app.core.config import EXECUTOR_MODE, EXECUTOR_WORKERS, MAX_IN_FLIGHT, MAX_QUEUE, TRACE_MEMORY
+from app.core.metrics import call_collecting, merge_report, profiling
+
+
+# 무거운 pandas/openpyxl 작업을 이벤트 루프 밖(프로세스 풀, 실패 시 스레드 풀)에서 실행
+# 동시에 MAX_IN_FLIGHT 개까지 실행하고, 대기열이 MAX_QUEUE 를 넘으면 503 으로 거절한다.
+# 스레드에서 부르는 run_sync (폴더 감시, 비동기 작업) 도 같은 슬롯을 차례대로 기다린다 (503 없이 대기).
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class _Slots:
+    """동시 실행 슬롯 (이벤트 루프의 요청과 스레드의 run_sync 가 함께 쓰는 FIFO 세마포어)"""
+
+    def __init__(self, size: int):
+        self.free = size
+        self.in_flight = 0
+        self._waiters = deque()  # asyncio (loop, future) 또는 threading.Event
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _take(self) -> bool:
+        """바로 차지할 수 있으면 차지 (self._lock 안에서 호출)"""
+        if self.free and not self._waiters:
+            self.free -= 1
+            self.in_flight += 1
+            return True
+        return False
+
+    async def acquire(self, max_waiting: int = None):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take():
+                return
+            if max_waiting is not None and len(self._waiters) >= max_waiting:
+                raise HTTPException(
+                    status_code=503,
+                    detail="❌ 처리 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요",
+                    headers={"Retry-After": "1"},
+                )
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                self.release()  # 슬롯을 받은 직후 취소됨
+            raise
+
+    def acquire_sync(self):
+        with self._lock:
+            if self._take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            if not self._waiters:
+                self.free += 1
+                return
+            waiter = self._waiters.popleft()
+            self.in_flight += 1  # 슬롯을 다음 대기자에게 그대로 넘김
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _hand_over(self, future):
+        if future.done():  # 넘기는 사이 요청이 취소됨 -> 다음 대기자에게
+            self.release()
+        else:
+            future.set_result(None)
+
+
+_slots = _Slots(MAX_IN_FLIGHT)
+
+
+def _create_executor():
+    if EXECUTOR_MODE == "process":
+        try:
+            return ProcessPoolExecutor(max_workers=EXECUTOR_WORKERS)
+        except (OSError, NotImplementedError, ValueError) as e:
+            print("⚠️ 프로세스 풀 생성 실패, 스레드 풀로 대체:", e)
+    return ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="sheetflow")
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _create_executor()
+        return _executor
+
+
+def _fallback_to_threads(broken):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            print("⚠️ 프로세스 풀 중단됨, 스레드 풀로 전환")
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="sheetflow")
+        return _executor
+
+
+@asynccontextmanager
+async def _admit():
+    """동시 실행 슬롯 하나를 차지 (대기열이 가득 차면 503)"""
+    await _slots.acquire(MAX_QUEUE)
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def _collected(executor, fn, *args, **kwargs):
+    """작업 풀에 넘길 호출 (단계 기록 / 최대 RSS / 프로파일을 결과와 함께 돌려받음, app.core.metrics)
+    (SHEETFLOW_TRACE_MEMORY=1 이고 프로세스 풀이면 작업별 최대 할당도 워커에서 잼 - 스레드 풀은 API 프로세스에서 잼)"""
+    trace_memory = TRACE_MEMORY and isinstance(executor, ProcessPoolExecutor)
+    return partial(call_collecting, fn, profiling(), trace_memory, *args, **kwargs)
+
+
+def _unwrap(outcome):
+    result, report = outcome
+    merge_report(report)
+    return result
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """fn 을 작업 풀에서 실행 (인자/반환값은 프로세스 간 전달 가능해야 함)"""
+    async with _admit():
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        try:
+            return _unwrap(await loop.run_in_executor(executor, _collected(executor, fn, *args, **kwargs)))
+        except BrokenProcessPool:
+            executor = _fallback_to_threads(executor)
+            return _unwrap(await loop.run_in_executor(executor, _collected(executor, fn, *args, **kwargs)))
+
+
+async def map_blocking(fn, arg_list: list[tuple]) -> list:
+    """arg_list 의 인자 묶음마다 fn 을 작업 풀 전체에 나눠 실행 (요청 하나가 슬롯 하나만 차지)"""
+    async with _admit():
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        try:
+            outcomes = await asyncio.gather(*(loop.run_in_executor(executor, _collected(executor, fn, *args)) for args in arg_list))
+        except BrokenProcessPool:
+            executor = _fallback_to_threads(executor)
+            outcomes = await asyncio.gather(*(loop.run_in_executor(executor, _collected(executor, fn, *args)) for args in arg_list))
+        return [_unwrap(outcome) for outcome in outcomes]
+
+
+def run_sync(fn, *args, **kwargs):
+    """fn 을 작업 풀에서 실행하고 결과를 기다림 (이벤트 루프 밖의 스레드에서 사용, 요청과 같은 슬롯을 기다림)
+    작업 풀 안에서 다시 부르면 안 됨 (슬롯을 잡은 채 슬롯을 기다림)"""
+    _slots.acquire_sync()
+    try:
+        executor = get_executor()
+        try:
+            return _unwrap(executor.submit(_collected(executor, fn, *args, **kwargs)).result())
+        except BrokenProcessPool:
+            executor = _fallback_to_threads(executor)
+            return _unwrap(executor.submit(_collected(executor, fn, *args, **kwargs)).result())
+    finally:
+        _slots.release()
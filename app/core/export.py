@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from app.core.metrics import staged
+from app.core.overlap import detect_duplicates
+from app.core.query import apply_filters, compile_filters
+from app.models.schema import DATE_COLUMNS
+from app.utils.exporter import XLSX_MEDIA_TYPE, export_temp_path, write_csv, write_xlsx
+
+
+# 내보내기 단계 (필터 -> 날짜 포맷 -> 정렬 -> 중복 검사 -> CSV/XLSX 쓰기)
+# API 라우터 (/generate, /analyze, /batch, /jobs) 와 폴더 감시 워커가 같은 단계를 쓰고,
+# 작업 풀 프로세스도 라우터 모듈을 import 하지 않고 이 모듈만 읽는다.
+
+def filter_frame(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """조건 필터 (app.core.query 필터 언어, 컬럼/타입은 로딩 시 스키마로 정규화됨)"""
+    return apply_filters(df, compile_filters(filters))
+
+
+def prepare_export_frame(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """조건 필터 + 날짜 포맷 통일"""
+    df_filtered = filter_frame(df, filters)
+    return df_filtered.assign(**{
+        col: df_filtered[col].dt.strftime("%Y-%m-%d") for col in DATE_COLUMNS if col in df_filtered.columns
+    })
+
+
+@staged("sort")
+def sort_export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df.columns]
+    if sort_keys:
+        return df.sort_values(by=sort_keys, ascending=True, na_position="last")
+    return df
+
+
+def export_ext(format: str) -> str:
+    return ".csv" if format == "csv" else ".xlsx"
+
+
+def export_name(format: str) -> tuple[str, str]:
+    """(다운로드 파일명, MIME 타입)"""
+    media_type = "text/csv" if format == "csv" else XLSX_MEDIA_TYPE
+    return f"sheetflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}{export_ext(format)}", media_type
+
+
+def write_export(df_sorted: pd.DataFrame, df_duplicates: pd.DataFrame, format: str, path: str,
+                 extra_sheets: dict = None) -> tuple[str, str]:
+    """path 에 CSV/XLSX 저장 후 (파일명, MIME 타입) 반환 (extra_sheets 는 XLSX 에만 추가)"""
+    if format == "csv":
+        write_csv(path, df_sorted)
+    else:
+        write_xlsx(path, df_sorted, df_duplicates, extra_sheets=extra_sheets)
+    return export_name(format)
+
+
+def write_temp_export(df_sorted: pd.DataFrame, df_duplicates: pd.DataFrame, format: str) -> tuple[str, str, str]:
+    """임시 파일에 저장 후 (경로, 파일명, MIME 타입) 반환 (실패하면 임시 파일 삭제)"""
+    path = export_temp_path(export_ext(format))
+    try:
+        filename, media_type = write_export(df_sorted, df_duplicates, format, path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, filename, media_type
+
+
+def build_export(df: pd.DataFrame, filters: dict, format: str = "xlsx") -> tuple[str, str, str]:
+    """필터 + 정렬 + 중복 체크 후 임시 파일 경로, 파일명, MIME 타입 반환 (작업 풀에서 실행)"""
+    df_sorted = sort_export_frame(prepare_export_frame(df, filters))
+    df_duplicates = detect_duplicates(df_sorted)
+    return write_temp_export(df_sorted, df_duplicates, format)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+
+from app.core.config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES, XLSX_CONDITIONAL_MAX_ROWS, XLSX_FORMAT_MODE
+
+
+# 내보내기 파일 디스크 캐시
+# 키 = (입력 내용 해시 = dataset_id, 필터, 형식, 코드 버전) 의 해시. 같은 파일 + 같은 조건으로 다시 내려받으면
+# 파싱 / 정렬 / 중복 검사 / 쓰기 없이 캐시 파일을 그대로 보낸다 (ETag = 키, If-None-Match 면 304).
+# 용량 상한(EXPORT_CACHE_MAX_BYTES)을 넘으면 가장 오래 쓰지 않은 파일부터 지운다 (0 이면 캐시 비활성화).
+# 여러 워커 프로세스가 같은 폴더를 쓸 수 있다: 파일은 임시 이름으로 쓴 뒤 rename 하고,
+# 다른 워커가 만든 파일도 조회 시 찾아 쓴다 (용량 계산은 워커별 근사값).
+
+CACHE_EXTENSIONS = (".xlsx", ".csv")
+_CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # app 패키지
+
+_code_version = None
+
+
+def code_version() -> str:
+    """app 패키지 소스 + 출력에 영향을 주는 설정의 해시 (배포가 바뀌면 이전 캐시는 쓰지 않음)
+    (소스가 없는 실행 파일 빌드에서는 실행 파일의 크기 / 수정 시각)"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(json.dumps([XLSX_FORMAT_MODE, XLSX_CONDITIONAL_MAX_ROWS]).encode("utf-8"))
+        if getattr(sys, "frozen", False):
+            stat = os.stat(sys.executable)
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+        for root, dirs, files in os.walk(_CODE_DIR):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, _CODE_DIR).encode("utf-8"))
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+class ExportCache:
+    """키 -> 내보내기 파일 (디스크, 용량 상한 LRU)"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = None  # 키 -> (경로, 크기), 오래 안 쓴 순 (처음 쓸 때 폴더에서 읽음)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(dataset_id: str, filters: dict, format: str) -> str:
+        options = json.dumps({"filters": filters, "format": format}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{dataset_id}:{options}:{code_version()}".encode("utf-8")).hexdigest()
+
+    def path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, key + ext)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            key, ext = os.path.splitext(entry.name)
+            if ext in CACHE_EXTENSIONS and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, key, entry.path, stat.st_size))
+        self._entries = OrderedDict((key, (path, size)) for _, key, path, size in sorted(found))
+        self.total_bytes = sum(size for _, _, _, size in found)
+
+    def get(self, key: str, ext: str):
+        """캐시 파일 경로 (없으면 None, 스레드에서 호출)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            path = entry[0] if entry else self.path(key, ext)
+            if not os.path.exists(path):  # 다른 워커가 지웠거나 아직 없음
+                if entry:
+                    self._pop(key)
+                return None
+            if entry is None:  # 다른 워커가 만든 파일
+                self._entries[key] = (path, os.path.getsize(path))
+                self.total_bytes += self._entries[key][1]
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)  # 재시작 후에도 LRU 순서 유지
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, source_path: str, ext: str):
+        """임시 내보내기 파일을 캐시로 옮기고 캐시 경로 반환 (비활성화 / 한도보다 크면 None, 원본은 그대로)"""
+        size = os.path.getsize(source_path)
+        if not self.enabled or size > self.max_bytes:
+            return None
+        with self._lock:
+            self._load()
+        target = self.path(key, ext)
+        staging = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.move(source_path, staging)  # 다른 파일시스템이면 복사 -> 다 쓴 뒤 rename
+        os.replace(staging, target)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (target, size)
+            self.total_bytes += size
+            self._evict(keep=key)
+        return target
+
+    def _pop(self, key: str):
+        path, size = self._entries.pop(key)
+        self.total_bytes -= size
+        return path
+
+    def _evict(self, keep: str):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            try:
+                os.remove(self._pop(key))
+            except FileNotFoundError:
+                pass
+
+
+export_cache = ExportCache(EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,252 @@
+import asyncio
+import heapq
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from fastapi import UploadFile
+from pandas.api.types import is_numeric_dtype
+
+from app.core.config import EXTERNAL_CHUNK_ROWS, SORT_MEMORY_BUDGET
+from app.core.dataset_store import dataset_bytes, iter_dataset
+from app.core.executor import run_blocking
+from app.core.ingest import spool_upload
+from app.core.metrics import staged
+from app.core.overlap import find_overlap_rows
+from app.core.partitioned import code_runs
+from app.core.query import apply_filters
+from app.core.readers import iter_csv_chunks, iter_excel_chunks
+from app.models.schema import ALLOWED_COLUMNS, SCHEMA, coerce_dtypes, normalize_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 외부 정렬 비활성화 (항상 메모리에서 처리)
+    pa = pq = None
+
+
+# 메모리보다 큰 입력의 정렬 / 중복 검사 (out-of-core)
+# 1) 입력을 EXTERNAL_CHUNK_ROWS 행씩 읽어 정규화 + 필터 후, codes 해시로 파티션별 Parquet spill 파일에 나눠 쓴다.
+# 2) 시리얼 겹침은 같은 코드 안에서만 생기므로 파티션마다 따로 정렬 + 중복 검사한다 (파티션 하나 크기 <= 메모리 예산).
+# 3) 정렬된 파티션들을 코드 순으로 k-way 병합하면서 배치 단위로 내보내기 파일에 쓴다.
+# 메모리는 입력 크기와 관계없이 (청크 하나 + 파티션 하나 + 파티션별 읽기 배치) 로 제한된다.
+# 단, 코드 하나의 행이 예산보다 크면 그 파티션은 예산을 넘는다 (코드 단위로는 더 나눌 수 없음).
+
+ROW_COLUMN = "__row__"  # 원래 행 순서 (같은 키끼리 순서 유지용)
+MAX_PARTITIONS = 256
+MERGE_ROW_GROUP_ROWS = 8_192  # 정렬된 파티션 파일의 row group (병합 때 파일마다 이만큼만 읽어 둠)
+
+# 입력 파일 크기 -> 메모리에서 한 번에 파싱 + 정렬 + 내보낼 때의 최대 메모리 배수 (실측: CSV 7.3, xlsx 22.8)
+MEMORY_FACTORS = {".xlsx": 24, ".xls": 12, ".csv": 8, ".parquet": 12}
+
+# spill 파일 타입 (청크마다 추론 타입이 달라도 같은 스키마로 씀, 읽을 때 스키마 변환으로 복원)
+# text / category / number 는 입력 전체 기준 값 타입 (PartitionSpill.dtypes) 으로 되돌린다
+# - 숫자 코드 (category) 를 문자열 순서로 정렬하면 메모리 경로의 숫자 순서와 달라지므로.
+_SPILL_TYPES = {
+    "text": "string",
+    "category": "string",
+    "date": "timestamp[us]",
+    "serial": "float64",
+    "number": "float64",
+}
+
+
+def estimate_memory(size_bytes: int, ext: str) -> int:
+    return size_bytes * MEMORY_FACTORS.get(ext.lower(), 4)
+
+
+def partition_count(memory_bytes: int, budget: int = SORT_MEMORY_BUDGET) -> int:
+    """파티션 하나를 정렬하는 메모리가 예산 이하가 되도록"""
+    return max(1, min(MAX_PARTITIONS, math.ceil(memory_bytes / budget)))
+
+
+def needs_external(file: UploadFile = None, dataset_id: str = None, budget: int = SORT_MEMORY_BUDGET,
+                   file_path: str = None) -> bool:
+    """입력을 한 번에 올리면 메모리 예산을 넘는지 (추정, file_path 는 이미 받아 둔 업로드 파일)"""
+    if pq is None:
+        return False
+    if file_path:
+        return input_memory(file_path) > budget
+    if file is not None:
+        if not file.size:
+            return False
+        return estimate_memory(file.size, os.path.splitext(file.filename or "")[1]) > budget
+    if dataset_id:
+        return estimate_memory(dataset_bytes(dataset_id), ".parquet") > budget
+    return False
+
+
+def input_memory(file_path: str = None, dataset_id: str = None) -> int:
+    if file_path:
+        return estimate_memory(os.path.getsize(file_path), os.path.splitext(file_path)[1])
+    return estimate_memory(dataset_bytes(dataset_id), ".parquet")
+
+
+def iter_source_chunks(file_path: str = None, dataset_id: str = None, columns: list[str] = None,
+                       where=None, chunk_rows: int = EXTERNAL_CHUNK_ROWS):
+    """입력(업로드 파일 또는 저장된 데이터셋)을 정규화 + 필터된 청크로 읽음 (index 는 원래 행 위치)"""
+    if file_path:
+        if file_path.lower().endswith(".csv"):
+            chunks = iter_csv_chunks(file_path, columns or ALLOWED_COLUMNS, chunk_rows)
+        else:
+            chunks = iter_excel_chunks(file_path, None, columns or ALLOWED_COLUMNS, chunk_rows)
+        chunks = (normalize_frame(chunk) for chunk in chunks)
+    else:
+        chunks = iter_dataset(dataset_id, columns, chunk_rows)
+    for chunk in chunks:
+        yield apply_filters(chunk, where)
+
+
+def _spill_schema(df: pd.DataFrame):
+    return pa.schema([(col, _SPILL_TYPES[SCHEMA[col]]) for col in df.columns] + [(ROW_COLUMN, "int64")])
+
+
+def _source_dtype(seen, s: pd.Series):
+    """청크별 컬럼 타입 누적 -> 입력을 한 번에 읽었을 때의 타입 (숫자끼리는 넓은 쪽, 문자가 섞이면 object)
+    category 는 카테고리 값의 타입, 값이 모두 비어 있는 청크는 NaN 컬럼 (float64) 으로 본다."""
+    if not s.notna().any():
+        dtype = np.dtype("float64")
+    elif isinstance(s.dtype, pd.CategoricalDtype):
+        dtype = s.cat.categories.dtype
+    else:
+        dtype = s.dtype
+    if seen is None:
+        return dtype
+    if is_numeric_dtype(seen) and is_numeric_dtype(dtype):
+        return np.result_type(seen, dtype)
+    return np.dtype(object)
+
+
+def _restore(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """spill 스키마로 읽은 파티션 -> 정규화된 타입
+    입력 전체에서 숫자로 읽힌 text / category / number 컬럼만 그 타입으로 되돌리고 (숫자 카테고리 -> 숫자 순서),
+    문자로 읽힌 컬럼은 spill 문자열 그대로 둔다
+    (파티션마다 값을 보고 추측하면 0 으로 시작하는 값이 숫자가 되거나 파티션끼리 타입이 달라짐)."""
+    restored = {
+        col: pd.to_numeric(s).astype(dtypes[col])
+        for col, s in df.items() if col in dtypes and is_numeric_dtype(dtypes[col])
+    }
+    return coerce_dtypes(df.assign(**restored))
+
+
+class PartitionSpill:
+    """청크를 codes 해시 파티션별 Parquet 파일에 이어 쓰기"""
+
+    def __init__(self, directory: str, partitions: int):
+        self.directory = directory
+        self.partitions = partitions
+        self.rows = 0
+        self.dtypes = {}  # text / category / number 컬럼 -> 입력 전체 기준 값 타입 (_restore)
+        self._schema = None
+        self._writers = {}
+
+    def path(self, part: int) -> str:
+        return os.path.join(self.directory, f"part_{part:03d}.parquet")
+
+    @staged("spill")
+    def add(self, chunk: pd.DataFrame):
+        if chunk.empty:
+            return
+        if self._schema is None:
+            self._schema = _spill_schema(chunk)
+        chunk = chunk.reindex(columns=self._schema.names[:-1]).assign(**{ROW_COLUMN: chunk.index.to_numpy()})
+        for col in chunk.columns:
+            if SCHEMA.get(col) in ("text", "category", "number"):
+                self.dtypes[col] = _source_dtype(self.dtypes.get(col), chunk[col])
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False).cast(self._schema)
+        if "codes" in chunk.columns and self.partitions > 1:
+            # spill 문자열 기준 해시 (청크마다 숫자 / 문자로 읽혀도 같은 코드는 항상 같은 파티션)
+            hashes = pd.util.hash_pandas_object(table.column("codes").to_pandas(), index=False).to_numpy()
+            parts = hashes % np.uint64(self.partitions)
+        else:
+            parts = np.zeros(len(chunk), dtype=np.uint64)
+
+        for part in np.unique(parts):
+            piece = table.filter(pa.array(parts == part))
+            writer = self._writers.get(int(part))
+            if writer is None:
+                writer = self._writers[int(part)] = pq.ParquetWriter(self.path(int(part)), self._schema)
+            writer.write_table(piece)
+        self.rows += len(chunk)
+
+    def close(self) -> list[str]:
+        """쓰기 종료 후 행이 있는 파티션 파일 목록"""
+        for writer in self._writers.values():
+            writer.close()
+        paths = [self.path(part) for part in sorted(self._writers)]
+        self._writers = {}
+        return paths
+
+    def columns(self) -> list[str]:
+        return self._schema.names[:-1] if self._schema is not None else []
+
+
+@staged("partition_sort")
+def sort_partitions(paths: list[str], order_frame, directory: str, dtypes: dict) -> tuple[list[str], list[str], int]:
+    """파티션마다 읽기 (dtypes = PartitionSpill.dtypes 로 타입 복원) -> order_frame 으로 정렬 -> 겹침 행 검사 후
+    (정렬 파일, 중복 파일, 중복 행 수) 반환"""
+    sorted_paths, duplicate_paths, duplicates = [], [], 0
+    for i, path in enumerate(paths):
+        df = _restore(pq.read_table(path).to_pandas().set_index(ROW_COLUMN).rename_axis(None), dtypes)
+        os.remove(path)
+        df_sorted = order_frame(df)
+        df_duplicates = df_sorted.iloc[find_overlap_rows(df_sorted)]
+        del df
+
+        sorted_path = os.path.join(directory, f"sorted_{i:03d}.parquet")
+        df_sorted.to_parquet(sorted_path, index=False, row_group_size=MERGE_ROW_GROUP_ROWS)
+        sorted_paths.append(sorted_path)
+        if not df_duplicates.empty:
+            duplicate_path = os.path.join(directory, f"duplicates_{i:03d}.parquet")
+            df_duplicates.to_parquet(duplicate_path, index=False, row_group_size=MERGE_ROW_GROUP_ROWS)
+            duplicate_paths.append(duplicate_path)
+            duplicates += len(df_duplicates)
+    return sorted_paths, duplicate_paths, duplicates
+
+
+def _code_runs(path: str, batch_rows: int):
+    """정렬된 파티션 파일 -> (코드 키, 같은 코드의 연속 행) 을 파일 순서대로"""
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        df = batch.to_pandas()
+        if "codes" not in df.columns:
+            yield (False, ""), df
+            continue
+        keys, bounds = code_runs(df["codes"])
+        for key, start, end in zip(keys, bounds[:-1], bounds[1:]):
+            yield key, df.iloc[start:end]  # 코드 없는 행은 마지막
+
+
+def merge_sorted(paths: list[str], batch_rows: int = EXTERNAL_CHUNK_ROWS):
+    """코드가 겹치지 않는 정렬 파티션들을 코드 순으로 병합해서 batch_rows 행 내외의 DataFrame 으로 생성"""
+    runs = heapq.merge(*(_code_runs(path, MERGE_ROW_GROUP_ROWS) for path in paths), key=lambda run: run[0])
+    pending, rows = [], 0
+    for _, df in runs:
+        pending.append(df)
+        rows += len(df)
+        if rows >= batch_rows:
+            yield pd.concat(pending, ignore_index=True)
+            pending, rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def streaming_head(chunks, n: int, order_frame) -> pd.DataFrame:
+    """청크마다 (지금까지의 상위 n 행 + 청크) 를 정렬해서 상위 n 행만 유지 (메모리는 청크 하나 크기)"""
+    top = None
+    for chunk in chunks:
+        top = order_frame(chunk if top is None else pd.concat([top, chunk])).head(n)
+    return top if top is not None else pd.DataFrame()
+
+
+async def run_external(fn, file: UploadFile = None, dataset_id: str = None, *args):
+    """업로드 파일은 임시 파일로 받은 뒤 fn(file_path, dataset_id, *args) 를 작업 풀에서 실행"""
+    file_path = None
+    if file is not None:
+        dataset_id, file_path = await spool_upload(file)
+    try:
+        return await run_blocking(fn, file_path, None if file_path else dataset_id, *args)
+    finally:
+        if file_path:
+            await asyncio.to_thread(os.remove, file_path)
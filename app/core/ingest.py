@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+
+
+# 업로드 수신
+# 본문 전체를 메모리에 올리지 않고 청크 단위로 임시 파일에 쓰면서 해시를 계산한다
+# (청크 해시 + 디스크 쓰기는 스레드에서 - 큰 업로드를 받는 동안에도 이벤트 루프가 다른 요청을 처리하도록).
+# 파싱은 그 파일 경로로 실행한다 (작업 프로세스에도 경로만 넘기면 됨).
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"❌ 업로드 용량 초과 (최대 {UPLOAD_MAX_BYTES // (1024 * 1024)}MB)")
+
+
+def hash_file(file_path: str) -> str:
+    """파일을 청크 단위로 읽어 sha256 계산"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_chunk(target, digest, chunk: bytes):
+    digest.update(chunk)
+    target.write(chunk)
+
+
+async def spool_upload(file: UploadFile, dest_path: str = None) -> tuple[str, str]:
+    """업로드 본문을 dest_path (없으면 임시 파일)에 저장하고 (sha256, 경로) 반환"""
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        raise _too_large()
+
+    if dest_path is None:
+        fd, dest_path = tempfile.mkstemp(prefix="sheetflow_", suffix=os.path.splitext(file.filename or "")[1])
+        target = os.fdopen(fd, "wb")
+    else:
+        target = open(dest_path, "wb")
+
+    digest = hashlib.sha256()
+    total = 0
+    try:
+        with target:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > UPLOAD_MAX_BYTES:
+                    raise _too_large()
+                await asyncio.to_thread(_write_chunk, target, digest, chunk)
+    except BaseException:
+        os.remove(dest_path)
+        raise
+    return digest.hexdigest(), dest_path
@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+
+from fastapi import HTTPException
+
+from app.core.config import (
+    JOB_DB_PATH, JOB_MAX_PENDING, JOB_RESULT_DIR, JOB_RESULT_MAX_BYTES, JOB_RETENTION, JOB_WORKERS
+)
+from app.utils.serializer import dumps
+
+
+# 비동기 작업(job) 관리
+# 요청은 job_id 만 바로 돌려받고, 작업은 제한된 스레드 풀에서 단계(stage)별 진행률을 남기며 실행된다.
+# 무거운 단계는 작업 스레드가 run_sync 로 작업 풀(프로세스)에 넘기고, 요청과 같은 동시 실행 슬롯을 기다린다.
+# 작업 상태는 SQLite(WAL) 에 두므로 uvicorn --workers N 의 어느 워커에서도 조회되고,
+# 작업 풀 워커도 같은 저장소에 진행률을 기록한다.
+# 결과 파일은 JOB_RESULT_DIR 에 보관하고 보관 기간 / 전체 용량 기준으로 정리한다.
+# submit / get 은 SQLite 접근 + 결과 파일 삭제가 있으므로 요청에서는 asyncio.to_thread 로 호출한다.
+
+_COLUMNS = [
+    "job_id", "kind", "state", "stage", "progress", "error",
+    "result_path", "result", "filename", "media_type", "result_bytes", "created_at", "finished_at",
+]
+
+
+class Job:
+    """저장소의 작업 행 하나 (조회 시점 기준)"""
+
+    def __init__(self, job_id: str, kind: str, state: str = "queued", stage: str = None, progress: float = 0.0,
+                 error: str = None, result_path: str = None, result: str = None, filename: str = None,
+                 media_type: str = None, result_bytes: int = 0, created_at: float = None, finished_at: float = None):
+        self.id = job_id
+        self.kind = kind
+        self.state = state  # queued -> running -> done | failed
+        self.stage = stage
+        self.progress = progress
+        self.error = error
+        self.result_path = result_path
+        self.result = json.loads(result) if result is not None else None  # 파일이 아닌 결과 (JSON)
+        self.filename = filename
+        self.media_type = media_type
+        self.created_at = created_at
+        self.finished_at = finished_at
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def result_file(job_id: str, suffix: str) -> str:
+    """결과 파일을 쓸 경로"""
+    os.makedirs(JOB_RESULT_DIR, exist_ok=True)
+    return os.path.join(JOB_RESULT_DIR, f"{job_id}{suffix}")
+
+
+class JobManager:
+    def __init__(self, db_path: str, workers: int, max_pending: int, retention: int, max_bytes: int):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self._pending = set()  # 이 프로세스의 작업 스레드에서 대기 + 실행 중인 job_id
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sheetflow-job")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, state TEXT NOT NULL, stage TEXT, "
+                "progress REAL NOT NULL DEFAULT 0, error TEXT, result_path TEXT, result TEXT, filename TEXT, "
+                "media_type TEXT, result_bytes INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)")
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=10)) as conn, conn:
+            yield conn
+
+    def submit(self, kind: str, fn, *args) -> Job:
+        """fn(job_id, *args) 를 작업으로 등록 (이 프로세스의 대기 + 실행 중 작업이 한도를 넘으면 503)
+        fn 은 결과 컬럼 (result_path / filename / media_type / result) dict 를 돌려준다."""
+        self._evict()
+        job = Job(uuid.uuid4().hex, kind, created_at=time.time())
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="❌ 작업 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요",
+                    headers={"Retry-After": "5"},
+                )
+            self._pending.add(job.id)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, state, progress, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.state, job.progress, job.created_at),
+            )
+        self._pool.submit(self._run, job.id, fn, args)
+        return job
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(*row) if row is not None else None
+
+    def update(self, job_id: str, stage: str, progress: float):
+        """진행 단계 기록 (작업 풀 워커에서도 호출)"""
+        self._set(job_id, stage=stage, progress=round(progress, 2))
+
+    def _set(self, job_id: str, **fields):
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE job_id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def _run(self, job_id: str, fn, args):
+        try:
+            self._set(job_id, state="running")
+            outcome = fn(job_id, *args)
+            if "result" in outcome:
+                outcome["result"] = dumps(outcome["result"]).decode("utf-8")
+            self._set(job_id, state="done", stage="done", progress=1.0, finished_at=time.time(),
+                      result_bytes=_size(outcome.get("result_path")), **outcome)
+        except Exception as e:
+            print(f"❌ 작업 실패 ({job_id}):", e)
+            error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+            self._set(job_id, state="failed", error=error, finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+        self._evict()
+
+    def _evict(self):
+        """보관 기간이 지났거나 전체 용량을 넘는 완료 작업 + 보관 기간 동안 끝나지 않은 작업 (중단된 서버) 정리"""
+        now = time.time()
+        with self._connect() as conn:
+            finished = conn.execute(
+                "SELECT job_id, result_path, result_bytes, finished_at FROM jobs "
+                "WHERE finished_at IS NOT NULL ORDER BY finished_at"
+            ).fetchall()
+            total = sum(row[2] for row in finished)
+            expired = []
+            for job_id, result_path, result_bytes, finished_at in finished:
+                if now - finished_at <= self.retention and total <= self.max_bytes:
+                    break
+                total -= result_bytes
+                expired.append((job_id, result_path))
+            conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id, _ in expired])
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NULL AND created_at < ?", (now - self.retention,))
+        for _, result_path in expired:
+            _remove(result_path)
+
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def _remove(path: str):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # 다른 워커가 먼저 정리함
+            pass
+
+
+jobs = JobManager(JOB_DB_PATH, JOB_WORKERS, JOB_MAX_PENDING, JOB_RETENTION, JOB_RESULT_MAX_BYTES)
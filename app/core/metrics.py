@@ -0,0 +1,280 @@
+import bisect
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows (데스크톱 실행 파일) 에는 없음 -> 최대 RSS 는 0 으로 기록
+    resource = None
+
+
+# 요청 / 처리 단계별 지표 (Prometheus 텍스트 형식으로 /metrics 에 노출)
+# - 요청: 엔드포인트(라우트 경로)별 지연 히스토그램, 요청 수, 입출력 바이트
+# - 단계: read / normalize / filter / sort / dedupe / stats / write 등 단계별 지연 히스토그램 + 처리 행 수
+# - 메모리: API 프로세스와 작업 풀 프로세스의 최대 RSS
+# 작업 풀(프로세스)에서 기록된 단계는 작업 결과와 함께 돌려받아 API 프로세스 레지스트리에 합친다 (app.core.executor).
+# ?profile=1 요청은 같은 방식으로 cProfile 결과까지 모아 응답 대신 돌려준다 (main.py 미들웨어).
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+PROFILE_TOP = 40  # 프로파일 결과에 남길 함수 수 (누적 시간 순)
+
+
+class Histogram:
+    def __init__(self, buckets: list[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (이름, 라벨 튜플) -> Histogram
+        self._counters = {}  # (이름, 라벨 튜플) -> 값
+        self._gauges = {}  # (이름, 라벨 튜플) -> 값 (최대값 유지)
+        self._help = {}
+
+    def describe(self, name: str, kind: str, text: str):
+        self._help[name] = (kind, text)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def max_gauge(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = max(self._gauges.get(key, 0), value)
+
+    def record_stage(self, stage: str, seconds: float, rows: int = None):
+        self.observe("sheetflow_stage_seconds", seconds, stage=stage)
+        if rows is not None:
+            self.inc("sheetflow_stage_rows_total", rows, stage=stage)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        with self._lock:
+            histograms = {key: (h.counts[:], h.total, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines, described = [], set()
+
+        def header(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                help_kind, text = self._help.get(name, (kind, name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {help_kind}")
+
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip([*LATENCY_BUCKETS, "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels: tuple, **extra) -> str:
+    items = list(labels) + [(k, v) for k, v in extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+registry = MetricsRegistry()
+registry.describe("sheetflow_request_seconds", "histogram", "요청 처리 시간 (초, 라우트별)")
+registry.describe("sheetflow_requests_total", "counter", "요청 수 (라우트 / 상태 코드별)")
+registry.describe("sheetflow_request_bytes_total", "counter", "요청 본문 바이트")
+registry.describe("sheetflow_response_bytes_total", "counter", "응답 본문 바이트")
+registry.describe("sheetflow_stage_seconds", "histogram", "처리 단계별 시간 (초)")
+registry.describe("sheetflow_stage_rows_total", "counter", "처리 단계별 처리 행 수")
+registry.describe("sheetflow_peak_rss_bytes", "gauge", "프로세스 최대 RSS (바이트, role=api|worker)")
+
+
+# 현재 요청의 단계 기록 / 프로파일 (요청 밖이면 None)
+_request_stages = contextvars.ContextVar("sheetflow_request_stages", default=None)
+_request_profiles = contextvars.ContextVar("sheetflow_request_profiles", default=None)
+_request_worker_peaks = contextvars.ContextVar("sheetflow_request_worker_peaks", default=None)  # 작업별 최대 할당
+
+# 작업 풀 안에서 실행 중인 작업의 단계 기록 (스레드별, 작업이 끝나면 결과와 함께 반환)
+_collecting = threading.local()
+
+
+def peak_rss() -> int:
+    """현재 프로세스 최대 RSS (바이트, ru_maxrss 는 리눅스 KB / macOS 바이트 단위)"""
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _record(stage: str, seconds: float, rows: int = None):
+    samples = getattr(_collecting, "samples", None)
+    if samples is not None:
+        samples.append((stage, seconds, rows))
+        return
+    registry.record_stage(stage, seconds, rows)
+    request_stages = _request_stages.get()
+    if request_stages is not None:
+        request_stages.append((stage, seconds, rows))
+
+
+class StageTimer:
+    def __init__(self):
+        self.rows = None
+
+
+@contextmanager
+def stage(name: str):
+    """처리 단계 시간 측정 (with stage("sort") as s: ...; s.rows = len(df))"""
+    timer = StageTimer()
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        _record(name, time.perf_counter() - start, timer.rows)
+
+
+def staged(name: str):
+    """함수 전체를 단계로 측정 (반환값이 DataFrame 이면 행 수도 기록)
+    (pandas 는 import 하지 않음: DataFrame 을 돌려받았다면 이미 로드되어 있음)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name) as timer:
+                result = fn(*args, **kwargs)
+                pd = sys.modules.get("pandas")
+                if pd is not None and isinstance(result, pd.DataFrame):
+                    timer.rows = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def profile_text(profiler: cProfile.Profile) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP)
+    return out.getvalue()
+
+
+def call_collecting(fn, profile: bool, trace_memory: bool, *args, **kwargs):
+    """작업 풀에서 fn 실행 + 단계 기록 / 최대 RSS / (profile 이면) cProfile 결과 /
+    (trace_memory 면) 이 작업 동안의 tracemalloc 최대 할당을 함께 반환"""
+    _collecting.samples = samples = []
+    profiler = cProfile.Profile() if profile else None
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        if profiler is not None:
+            profiler.enable()
+        result = fn(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _collecting.samples = None
+    report = {"samples": samples, "pid": os.getpid(), "peak_rss": peak_rss()}
+    if trace_memory:
+        report["peak_traced"] = tracemalloc.get_traced_memory()[1] - baseline
+    if profiler is not None:
+        report["profile"] = profile_text(profiler)
+    return result, report
+
+
+def profiling() -> bool:
+    """현재 요청이 ?profile=1 인지"""
+    return _request_profiles.get() is not None
+
+
+def merge_report(report: dict):
+    """작업 풀에서 돌려받은 기록을 레지스트리 (+ 현재 요청) 에 합침"""
+    for sample in report["samples"]:
+        _record(*sample)
+    role = "api" if report["pid"] == os.getpid() else "worker"
+    registry.max_gauge("sheetflow_peak_rss_bytes", report["peak_rss"], role=role)
+    profiles = _request_profiles.get()
+    if profiles is not None and "profile" in report:
+        profiles.append(report["profile"])
+    peaks = _request_worker_peaks.get()
+    if peaks is not None and "peak_traced" in report:
+        peaks.append(report["peak_traced"])
+
+
+@contextmanager
+def request_scope(profile: bool = False):
+    """요청 하나의 단계 기록 (+ 프로파일) 범위 -> (단계 목록, 프로파일 텍스트 목록)"""
+    stages = []
+    profiles = [] if profile else None
+    stages_token = _request_stages.set(stages)
+    profiles_token = _request_profiles.set(profiles)
+    peaks_token = _request_worker_peaks.set([])
+    try:
+        yield stages, profiles
+    finally:
+        _request_stages.reset(stages_token)
+        _request_profiles.reset(profiles_token)
+        _request_worker_peaks.reset(peaks_token)
+
+
+def worker_peak_memory() -> int:
+    """현재 요청이 작업 풀(프로세스)에서 실행한 작업들의 tracemalloc 최대 할당 중 가장 큰 값 (없으면 0)"""
+    return max(_request_worker_peaks.get() or [0])
+
+
+def observe_request(route: str, method: str, status: int, seconds: float, bytes_in: int, bytes_out: int):
+    registry.observe("sheetflow_request_seconds", seconds, method=method, route=route)
+    registry.inc("sheetflow_requests_total", method=method, route=route, status=status)
+    registry.inc("sheetflow_request_bytes_total", bytes_in, route=route)
+    registry.inc("sheetflow_response_bytes_total", bytes_out, route=route)
+    registry.max_gauge("sheetflow_peak_rss_bytes", peak_rss(), role="api")
+
+
+def stage_summary(stages: list[tuple]) -> list[dict]:
+    """단계 기록 -> 단계별 합계 (처음 나온 순서)"""
+    summary = {}
+    for name, seconds, rows in stages:
+        entry = summary.setdefault(name, {"stage": name, "calls": 0, "seconds": 0.0, "rows": 0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["rows"] += rows or 0
+    return [{**entry, "seconds": round(entry["seconds"], 6)} for entry in summary.values()]
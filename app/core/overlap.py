@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from app.core.metrics import staged
+
+
+# 시리얼 구간 중복(겹침) 검출 엔진
+# (codes, serialst) 기준으로 한 번만 정렬한 뒤 NumPy 배열 연산으로 겹침을 찾는다.
+# 결과는 복사된 행이 아니라 행 위치(positional index)로 반환한다.
+
+def _sorted_ranges(df: pd.DataFrame, code_col="codes", start_col="serialst", end_col="serialsp"):
+    """유효한 (코드, 시작, 종료) 행만 골라 (코드, 시작) 순으로 정렬한 배열 반환"""
+    if df.empty or not {code_col, start_col, end_col}.issubset(df.columns):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=float), np.array([], dtype=float)
+
+    groups, _ = pd.factorize(df[code_col], sort=True)
+    starts = pd.to_numeric(df[start_col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    ends = pd.to_numeric(df[end_col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    pos = np.flatnonzero((groups >= 0) & ~np.isnan(starts) & ~np.isnan(ends))
+    order = np.lexsort((starts[pos], groups[pos]))
+    pos = pos[order]
+    return pos, groups[pos], starts[pos], ends[pos]
+
+
+def find_overlap_rows(df: pd.DataFrame, code_col="codes", start_col="serialst", end_col="serialsp") -> np.ndarray:
+    """다른 행과 시리얼 구간이 겹치는 행의 위치를 (코드, 시작시리얼) 순으로 반환"""
+    pos, groups, starts, ends = _sorted_ranges(df, code_col, start_col, end_col)
+    if len(pos) < 2:
+        return np.array([], dtype=np.int64)
+
+    same_next = groups[1:] == groups[:-1]
+
+    # 같은 코드 안에서 앞선 행들의 종료시리얼 누적 최대값 (직전 행까지)
+    running_max = pd.Series(ends).groupby(groups).cummax().to_numpy()
+    prev_max = np.empty_like(running_max)
+    prev_max[0] = -np.inf
+    prev_max[1:] = running_max[:-1]
+    prev_max[1:][~same_next] = -np.inf
+
+    # 앞선 행(인접 여부 무관)과 겹치는 행 + 바로 다음 행과 겹치는 행
+    flagged = starts <= prev_max
+    flagged[:-1] |= same_next & (starts[1:] <= ends[:-1])
+    return pos[flagged]
+
+
+@staged("dedupe")
+def find_overlap_pairs(df: pd.DataFrame, code_col="codes", start_col="serialst", end_col="serialsp") -> pd.DataFrame:
+    """겹치는 모든 행 쌍(인접하지 않은 쌍 포함)을 행 위치와 겹치는 구간으로 반환"""
+    columns = ["codes", "left", "right", "overlap_start", "overlap_end"]
+    pos, groups, starts, ends = _sorted_ranges(df, code_col, start_col, end_col)
+    if len(pos) < 2:
+        return pd.DataFrame(columns=columns)
+
+    # (코드, 시리얼) 복합 키를 정수 하나로 만들어 전역 searchsorted 로 그룹 내 탐색
+    values = np.unique(np.concatenate([starts, ends]))
+    width = len(values) + 1
+    start_keys = groups.astype(np.int64) * width + np.searchsorted(values, starts)
+    end_keys = groups.astype(np.int64) * width + np.searchsorted(values, ends)
+
+    # i 행과 겹치는 뒤쪽 행은 [i + 1, hi) 구간 (시작시리얼 <= i 의 종료시리얼)
+    idx = np.arange(len(pos))
+    hi = np.searchsorted(start_keys, end_keys, side="right")
+    counts = np.maximum(hi - idx - 1, 0)
+
+    left = np.repeat(idx, counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    right = np.arange(counts.sum()) - offsets + left + 1
+
+    return pd.DataFrame({
+        "codes": df[code_col].to_numpy()[pos[left]],
+        "left": pos[left],
+        "right": pos[right],
+        "overlap_start": starts[right],
+        "overlap_end": np.minimum(ends[left], ends[right]),
+    }, columns=columns)
+
+
+@staged("dedupe")
+def detect_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """시리얼 구간이 겹치는 행만 추려서 반환 (코드, 시작시리얼 순)"""
+    return df.iloc[find_overlap_rows(df)]
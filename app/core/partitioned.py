@@ -0,0 +1,109 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import PARTITION_MIN_ROWS, PARTITION_SHARDS, SPILL_DIR
+from app.core.metrics import staged
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 미설치 시 샤드 병렬 처리 비활성화 (작업 하나로 처리)
+    pa = None
+
+
+# 코드 샤드 병렬 처리
+# 정렬 / 시리얼 겹침 / 수율 통계는 모두 codes 안에서만 계산되므로, 행이 많으면 정규화된 DataFrame 을
+# 코드 단위 샤드로 나눠 작업 풀 전체(map_blocking)에서 따로 처리한 뒤 코드 순으로 합친다.
+# - 코드는 행 수가 많은 것부터 가장 가벼운 샤드에 배정한다 (코드 없는 행은 한 샤드에 모음).
+# - 샤드는 압축 없는 Arrow IPC 파일로 한 번만 쓰고 워커는 메모리 맵으로 읽는다 (DataFrame 을 pickle 로 넘기지 않음).
+# - 워커는 행 위치 / 코드 구간 / 작은 집계만 돌려주고, 합칠 때는 코드 구간 순서만 맞춘다.
+# 코드 하나가 전체 행 대부분이면 그 샤드가 전체 시간을 결정한다 (코드 단위로는 더 나눌 수 없음).
+
+
+def use_partitions(df: pd.DataFrame) -> bool:
+    return (pa is not None and PARTITION_SHARDS > 1 and "codes" in df.columns
+            and 0 < PARTITION_MIN_ROWS <= len(df))
+
+
+def _assign_shards(codes: pd.Series, shards: int) -> np.ndarray:
+    """행 -> 샤드 번호 (행 수가 많은 코드부터 지금까지 가장 가벼운 샤드에)"""
+    groups, uniques = pd.factorize(codes)
+    counts = np.bincount(groups + 1, minlength=len(uniques) + 1)  # 0 = 코드 없음
+    load = np.zeros(shards, dtype=np.int64)
+    target = np.zeros(len(counts), dtype=np.int64)
+    for group in np.argsort(-counts, kind="stable"):
+        if counts[group]:
+            shard = int(load.argmin())
+            target[group] = shard
+            load[shard] += counts[group]
+    return target[groups + 1]
+
+
+@staged("shard")
+def write_shards(df: pd.DataFrame, directory: str, shards: int = PARTITION_SHARDS) -> list[str]:
+    """코드 샤드별 Arrow IPC 파일 작성 (샤드 안의 행은 원래 순서 + index 유지) 후 행이 있는 샤드 경로 목록"""
+    target = _assign_shards(df["codes"], shards)
+    order = np.argsort(target, kind="stable")
+    bounds = np.searchsorted(target[order], np.arange(shards + 1))
+    paths = []
+    for shard, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        if start == end:
+            continue
+        table = pa.Table.from_pandas(df.take(order[start:end]), preserve_index=True)
+        path = os.path.join(directory, f"shard_{shard:03d}.arrow")
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        paths.append(path)
+    return paths
+
+
+def read_shard(path: str) -> pd.DataFrame:
+    """샤드 파일 -> DataFrame (메모리 맵, 타입 / index 는 pandas 메타데이터로 복원)"""
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas()
+
+
+@asynccontextmanager
+async def shard_files(df: pd.DataFrame):
+    """df 를 임시 폴더에 샤드 파일로 나눠 쓰고 경로 목록을 넘김 (끝나면 폴더 삭제)"""
+    directory = await asyncio.to_thread(tempfile.mkdtemp, prefix="sheetflow_shards_", dir=SPILL_DIR)
+    try:
+        yield await asyncio.to_thread(write_shards, df, directory)
+    finally:
+        await asyncio.to_thread(shutil.rmtree, directory, True)
+
+
+def code_runs(codes: pd.Series) -> tuple[list, np.ndarray]:
+    """codes 순으로 정렬된 컬럼 -> (구간별 정렬 키, 구간 경계) (코드 없는 행의 키가 가장 뒤)"""
+    if codes.empty:
+        return [], np.zeros(1, dtype=np.int64)
+    missing = codes.isna().to_numpy()
+    keys = np.where(missing, "", codes.astype(object).to_numpy())
+    bounds = np.r_[0, np.flatnonzero((keys[1:] != keys[:-1]) | (missing[1:] != missing[:-1])) + 1, len(keys)]
+    return [(bool(missing[start]), keys[start]) for start in bounds[:-1]], bounds
+
+
+def merge_runs(parts: list[tuple[np.ndarray, list, np.ndarray]]) -> np.ndarray:
+    """샤드별 (행 위치, 코드 구간 키, 구간 경계) -> 코드 순으로 이어 붙인 행 위치 (코드는 샤드끼리 겹치지 않음)"""
+    runs = sorted(
+        ((key, positions, start, end)
+         for positions, keys, bounds in parts
+         for key, start, end in zip(keys, bounds[:-1], bounds[1:])),
+        key=lambda run: run[0],
+    )
+    if not runs:
+        return np.array([], dtype=np.int64)
+    return np.concatenate([positions[start:end] for _, positions, start, end in runs])
+
+
+@staged("merge")
+def merge_by_code(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """codes 순으로 정렬된 샤드별 결과 -> 코드 순으로 이어 붙인 DataFrame"""
+    combined = pd.concat(frames, ignore_index=True)
+    offsets = np.cumsum([0] + [len(frame) for frame in frames])
+    parts = [(np.arange(offset, offset + len(frame)), *code_runs(frame["codes"])) for offset, frame in zip(offsets, frames)]
+    return combined.take(merge_runs(parts)).reset_index(drop=True)
@@ -0,0 +1,248 @@
+import json
+import operator
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.core.metrics import stage
+from app.models.schema import SCHEMA, canonical_name
+
+try:
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow 미설치 시 저장소 pushdown 없이 pandas 마스크로만 필터
+    pc = None
+
+
+# 선언형 필터 언어
+# JSON 필터를 한 번 컴파일해서 pandas 불리언 마스크 / pyarrow 필터 식(컬럼형 저장소 pushdown)으로 평가한다.
+#
+#   {"codes": ["A", "B"]}                               codes in (A, B)
+#   {"lotno": "L1"} / {"lotno__ne": "L1"}               같음 / 다름
+#   {"Testdate__gte": "2024-01-01", "Testdate__lt": "2024-02-01"}
+#   {"Testdate__between": ["2024-01-01", "2024-01-31"]} 양 끝 포함
+#   {"serial": 1234}                                    시리얼 1234 를 포함하는 구간
+#   {"serial__between": [1000, 2000]}                   [1000, 2000] 과 겹치는 구간
+#   {"or": [{...}, {...}]}, {"and": [...]}, {"not": {...}}
+#
+# 한 객체 안의 여러 키는 AND 로 묶는다. 컬럼명은 대소문자 / 공백을 무시하고 스키마 표기로 맞춘다.
+# 값이 비어 있는 행은 비교 조건(ne 포함)에 맞지 않고, not 은 안쪽 조건에 맞지 않는 모든 행이다
+# (마스크와 pushdown 이 같은 행을 고른다, tests/test_query.py).
+
+RANGE_OPS = {"gt", "gte", "lt", "lte", "between"}
+OPS = {"eq", "ne", "in"} | RANGE_OPS
+RANGE_KINDS = {"date", "number", "serial"}
+SERIAL_FIELD = "serial"  # serialst ~ serialsp 구간 조건
+
+# pandas Series 와 pyarrow 필터 식 모두에 쓰는 비교 연산
+_COMPARE = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+def _invalid(message: str):
+    return HTTPException(status_code=400, detail=f"❌ 잘못된 필터: {message}")
+
+
+def _coerce(kind: str, value):
+    try:
+        if kind == "date":
+            return pd.Timestamp(value)
+        if kind in ("number", "serial"):
+            return float(value)
+    except (TypeError, ValueError):
+        raise _invalid(f"{value!r} 를 {kind} 로 변환할 수 없음")
+    return value
+
+
+def _scalar(value):
+    # 정수 값은 int 로 넘긴다 (float 리터럴이면 pyarrow 가 int64 컬럼을 부동소수로 캐스팅하다 범위 오류)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class Condition:
+    def __init__(self, column: str, op: str, value):
+        kind = SCHEMA[column]
+        if op in RANGE_OPS and kind not in RANGE_KINDS:
+            raise _invalid(f"{column} 은 범위 조건을 쓸 수 없음")
+        if op in ("in", "between"):
+            if not isinstance(value, (list, tuple)) or (op == "between" and len(value) != 2):
+                raise _invalid(f"{column}__{op} 값은 {'[시작, 끝]' if op == 'between' else '목록'} 이어야 함")
+            value = [_coerce(kind, v) for v in value]
+        else:
+            value = _coerce(kind, value)
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def columns(self) -> set:
+        return {self.column}
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        if self.column not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        s = df[self.column]
+        if self.op == "in":
+            result = s.isin(self.value)
+        elif self.op == "between":
+            result = (s >= self.value[0]) & (s <= self.value[1])
+        else:
+            result = _COMPARE[self.op](s, self.value)
+            if self.op == "ne":
+                result &= s.notna()
+        return result.fillna(False).to_numpy(dtype=bool)
+
+    def expression(self):
+        field = pc.field(self.column)
+        if SCHEMA[self.column] in ("number", "serial") and any(
+            isinstance(v, float) and not v.is_integer() for v in np.atleast_1d(self.value)
+        ):
+            field = field.cast("float64")
+        if self.op == "in":
+            return field.isin([_scalar(v) for v in self.value])
+        if self.op == "between":
+            return (field >= _scalar(self.value[0])) & (field <= _scalar(self.value[1]))
+        return _COMPARE[self.op](field, _scalar(self.value))
+
+
+class SerialCondition:
+    """시리얼 구간 [serialst, serialsp] 이 [start, end] 와 겹치는 행"""
+
+    def __init__(self, start, end):
+        self.start = _coerce("serial", start)
+        self.end = _coerce("serial", end)
+        self._parts = And([Condition("serialst", "lte", self.end), Condition("serialsp", "gte", self.start)])
+
+    def columns(self) -> set:
+        return self._parts.columns()
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        return self._parts.mask(df)
+
+    def expression(self):
+        return self._parts.expression()
+
+
+class And:
+    def __init__(self, children: list):
+        self.children = children
+
+    def columns(self) -> set:
+        return set().union(*(child.columns() for child in self.children))
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        result = np.ones(len(df), dtype=bool)
+        for child in self.children:
+            result &= child.mask(df)
+        return result
+
+    def expression(self):
+        expr = self.children[0].expression()
+        for child in self.children[1:]:
+            expr = expr & child.expression()
+        return expr
+
+
+class Or(And):
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        result = np.zeros(len(df), dtype=bool)
+        for child in self.children:
+            result |= child.mask(df)
+        return result
+
+    def expression(self):
+        expr = self.children[0].expression()
+        for child in self.children[1:]:
+            expr = expr | child.expression()
+        return expr
+
+
+class Not:
+    """child 에 맞지 않는 모든 행 (child 컬럼 값이 비어 있어 맞지 않는 행도 포함)"""
+
+    def __init__(self, child):
+        self.child = child
+
+    def columns(self) -> set:
+        return self.child.columns()
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        return ~self.child.mask(df)
+
+    def expression(self):
+        # pyarrow 는 빈 값 비교가 null 이고 ~null 도 null (행 제외) -> 마스크처럼 null 을 False 로 바꾼 뒤 뒤집음
+        return pc.invert(pc.coalesce(self.child.expression(), False))
+
+
+def _compile_key(key: str, value):
+    field, _, op = str(key).partition("__")
+    op = op.lower() or ("in" if isinstance(value, (list, tuple)) else "eq")
+    if op not in OPS:
+        raise _invalid(f"지원하지 않는 연산 {op} (사용 가능: {sorted(OPS)})")
+
+    if field.strip().lower() == SERIAL_FIELD:
+        if op == "eq":
+            return SerialCondition(value, value)
+        if op == "between" and isinstance(value, (list, tuple)) and len(value) == 2:
+            return SerialCondition(value[0], value[1])
+        raise _invalid("serial 은 serial / serial__between 만 사용 가능")
+
+    column = canonical_name(field)
+    if column not in SCHEMA:
+        raise _invalid(f"알 수 없는 컬럼 {field}")
+    return Condition(column, op, value)
+
+
+def _compile(node):
+    if not isinstance(node, dict) or not node:
+        raise _invalid("조건은 비어 있지 않은 객체여야 함")
+    children = []
+    for key, value in node.items():
+        name = str(key).lower()
+        if name in ("and", "or"):
+            if not isinstance(value, list) or not value:
+                raise _invalid(f"{name} 값은 조건 목록이어야 함")
+            compiled = [_compile(child) for child in value]
+            children.append(And(compiled) if name == "and" else Or(compiled))
+        elif name == "not":
+            children.append(Not(_compile(value)))
+        else:
+            children.append(_compile_key(key, value))
+    return children[0] if len(children) == 1 else And(children)
+
+
+def parse_filters(text: str) -> dict:
+    """multipart 폼의 filters 필드 (JSON 문자열) -> dict (JSON 객체가 아니면 400)"""
+    try:
+        filters = json.loads(text or "{}")
+    except json.JSONDecodeError as e:
+        raise _invalid(f"filters 는 JSON 이어야 함 ({e.msg}, {e.pos}번째 문자)")
+    if not isinstance(filters, dict):
+        raise _invalid("filters 는 JSON 객체여야 함")
+    return filters
+
+
+def compile_filters(filters: dict):
+    """JSON 필터 -> 컴파일된 조건 (빈 필터면 None, 잘못된 필터는 400)"""
+    if not filters:
+        return None
+    return _compile(filters)
+
+
+def apply_filters(df: pd.DataFrame, where) -> pd.DataFrame:
+    """컴파일된 조건으로 행 선택 (where 가 None 이면 그대로)"""
+    if where is None:
+        return df
+    with stage("filter") as timer:
+        df = df[where.mask(df)]
+        timer.rows = len(df)
+    return df
@@ -0,0 +1,225 @@
+import csv
+import datetime
+import io
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import CSV_ENGINE, EXCEL_ENGINE
+from app.core.metrics import staged
+from app.models.schema import canonical_name
+
+try:
+    import python_calamine
+except ImportError:  # 미설치 시 read-only openpyxl 로 대체
+    python_calamine = None
+
+try:
+    import pyarrow.csv  # noqa: F401 (pandas engine="pyarrow" 사용 가능 여부)
+    HAS_PYARROW_CSV = True
+except ImportError:
+    HAS_PYARROW_CSV = False
+
+
+# 시트 읽기 엔진 선택
+# - calamine:  Rust 파서 (xlsx / xls), 가장 빠름 (python-calamine 설치 시)
+# - openpyxl:  read-only 스트리밍 (xlsx), 필요한 컬럼의 셀만 파이썬 값으로 모음
+# - pandas:    pd.read_excel 기본 엔진 (xls 는 xlrd)
+# - CSV 는 pyarrow (멀티스레드) -> pandas C 파서 순
+# 헤더 행을 먼저 읽고 필요한 컬럼(usecols)만 DataFrame 으로 만든다.
+# SHEETFLOW_EXCEL_ENGINE / SHEETFLOW_CSV_ENGINE 으로 배포별 고정 가능 (기본 auto).
+
+EXCEL_ENGINES = ("calamine", "openpyxl", "pandas")
+CSV_ENGINES = ("pyarrow", "pandas")
+
+
+def available_excel_engines() -> list[str]:
+    return [engine for engine in EXCEL_ENGINES if engine != "calamine" or python_calamine is not None]
+
+
+def available_csv_engines() -> list[str]:
+    return [engine for engine in CSV_ENGINES if engine != "pyarrow" or HAS_PYARROW_CSV]
+
+
+def _is_xls(source) -> bool:
+    return isinstance(source, str) and source.lower().endswith(".xls")
+
+
+def excel_engine(source, engine: str = None) -> str:
+    """설정된 엔진 (auto 면 파일 형식별 가장 빠른 설치된 엔진)"""
+    engine = engine or EXCEL_ENGINE
+    if engine == "auto" or engine not in available_excel_engines():
+        if python_calamine is not None:
+            return "calamine"
+        return "pandas" if _is_xls(source) else "openpyxl"
+    if engine == "openpyxl" and _is_xls(source):
+        return "pandas"  # openpyxl 은 xls 를 읽지 못함
+    return engine
+
+
+def csv_engine(engine: str = None) -> str:
+    engine = engine or CSV_ENGINE
+    if engine == "auto" or engine not in available_csv_engines():
+        return "pyarrow" if HAS_PYARROW_CSV else "pandas"
+    return engine
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _positions(header: list, columns: list[str] = None) -> list[int]:
+    """헤더에서 읽을 컬럼 위치 (columns 는 표준 표기, None 이면 전체, 같은 컬럼이 여러 번이면 첫 번째만)"""
+    if columns is None:
+        return list(range(len(header)))
+    wanted = set(columns)
+    positions, seen = [], set()
+    for i, name in enumerate(header):
+        name = canonical_name(name) if name is not None else None
+        if name in wanted and name not in seen:
+            positions.append(i)
+            seen.add(name)
+    return positions
+
+
+def _header_name(value, i: int):
+    """빈 헤더는 pandas 와 같은 Unnamed: i"""
+    if value is None or value == "":
+        return f"Unnamed: {i}"
+    return value
+
+
+def _frame(rows, header: list, positions: list[int], convert=None) -> pd.DataFrame:
+    """행 반복자 -> 필요한 위치의 값만 모아 컬럼별 리스트로 DataFrame 생성 (끝의 빈 행은 버림)"""
+    values = [[] for _ in positions]
+    last = 0
+    for row in rows:
+        width = len(row)
+        kept = [row[i] if i < width else None for i in positions]
+        if convert is not None:
+            kept = [convert(value) for value in kept]
+        for column, value in zip(values, kept):
+            column.append(value)
+        if any(value is not None for value in kept):
+            last = len(values[0]) if values else 0
+    # 값이 하나도 없는 컬럼은 pandas 와 같이 float NaN
+    return pd.DataFrame({
+        _header_name(header[i], i): column[:last] if any(v is not None for v in column) else [np.nan] * last
+        for i, column in zip(positions, values)
+    })
+
+
+def _calamine_cell(value):
+    # pandas calamine 엔진과 같은 변환: 빈 셀 -> None, 정수 실수 -> int, date -> datetime
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return datetime.datetime.combine(value, datetime.time())
+    return value
+
+
+def _read_calamine(source, sheet, columns):
+    workbook = python_calamine.CalamineWorkbook.from_object(_rewind(source))
+    data = workbook.get_sheet_by_name(sheet) if isinstance(sheet, str) else workbook.get_sheet_by_index(sheet or 0)
+    rows = iter(data.iter_rows())
+    header = next(rows, [])
+    return _frame(rows, header, _positions(header, columns), _calamine_cell)
+
+
+def _read_openpyxl(source, sheet, columns):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_rewind(source), read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet or 0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        return _frame(rows, header, _positions(header, columns))
+    finally:
+        workbook.close()
+
+
+def _read_pandas(source, sheet, columns):
+    usecols = None if columns is None else (lambda name: canonical_name(name) in set(columns))
+    return pd.read_excel(_rewind(source), sheet_name=sheet or 0, usecols=usecols)
+
+
+_EXCEL_READERS = {
+    "calamine": _read_calamine,
+    "openpyxl": _read_openpyxl,
+    "pandas": _read_pandas,
+}
+
+
+@staged("read")
+def read_excel(source, sheet=None, columns: list[str] = None, engine: str = None) -> pd.DataFrame:
+    """엑셀 시트 읽기 (sheet 는 이름 또는 위치, columns 는 표준 표기로 읽을 컬럼, None 이면 전체)"""
+    return _EXCEL_READERS[excel_engine(source, engine)](source, sheet, columns)
+
+
+def _csv_header(source) -> list[str]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return next(csv.reader(f), [])
+    first = _rewind(source).readline()
+    if isinstance(first, bytes):
+        first = first.decode("utf-8-sig")
+    return next(csv.reader(io.StringIO(first)), [])
+
+
+@staged("read")
+def read_csv(source, columns: list[str] = None, engine: str = None) -> pd.DataFrame:
+    """CSV 읽기 (헤더로 필요한 컬럼만 골라 usecols 로 전달)"""
+    usecols = None
+    if columns is not None:
+        header = _csv_header(source)
+        usecols = [header[i] for i in _positions(header, columns)]
+    return pd.read_csv(_rewind(source), usecols=usecols, engine="c" if csv_engine(engine) == "pandas" else "pyarrow")
+
+
+def iter_excel_chunks(source, sheet=None, columns: list[str] = None, chunk_rows: int = 100_000):
+    """행 청크 단위 읽기 (xlsx 는 read-only openpyxl 스트리밍, 시트 전체를 메모리에 올리지 않음)"""
+    if _is_xls(source):  # xls 는 스트리밍 읽기 불가 -> 한 번에 읽고 나눔
+        df = read_excel(source, sheet, columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_rewind(source), read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet or 0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        positions = _positions(header, columns)
+        start = 0
+        while block := list(itertools.islice(rows, chunk_rows)):
+            df = _frame(block, header, positions)
+            yield df.set_axis(range(start, start + len(df)))
+            start += len(block)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(source, columns: list[str] = None, chunk_rows: int = 100_000):
+    """CSV 행 청크 단위 읽기 (pandas C 파서 chunksize, 행 번호는 파일 전체 기준 index)"""
+    usecols = None
+    if columns is not None:
+        header = _csv_header(source)
+        usecols = [header[i] for i in _positions(header, columns)]
+    yield from pd.read_csv(_rewind(source), usecols=usecols, chunksize=chunk_rows)
+
+
+def sheet_names(source, engine: str = None) -> list[str]:
+    """시트 이름 목록 (데이터는 읽지 않음)"""
+    if excel_engine(source, engine) == "calamine":
+        return python_calamine.CalamineWorkbook.from_object(_rewind(source)).sheet_names
+    with pd.ExcelFile(_rewind(source)) as book:
+        return book.sheet_names
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+from app.core.config import RESULT_CACHE_ITEMS, RESULT_DB_PATH, RESULT_RETENTION
+from app.utils.serializer import dumps
+
+
+# 업로드 분석 결과 저장소 (dataset_id 기준)
+# 메모리 LRU 를 먼저 보고, 없으면 SQLite 에서 읽는다.
+# SQLite(WAL) 파일을 공유하므로 uvicorn --workers N 에서도 같은 결과를 본다.
+
+class ResultStore:
+    def __init__(self, db_path: str, cache_items: int, retention: int):
+        self.db_path = db_path
+        self.cache_items = cache_items
+        self.retention = retention
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "dataset_id TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_created_at ON results (created_at)")
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=10)) as conn, conn:
+            yield conn
+
+    def _remember(self, dataset_id: str, result: dict):
+        with self._lock:
+            self._cache[dataset_id] = result
+            self._cache.move_to_end(dataset_id)
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+
+    def put(self, dataset_id: str, result: dict):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (dataset_id, payload, created_at) VALUES (?, ?, ?)",
+                (dataset_id, dumps(result).decode("utf-8"), now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.retention,))
+        self._remember(dataset_id, result)
+
+    def get(self, dataset_id: str):
+        with self._lock:
+            if dataset_id in self._cache:
+                self._cache.move_to_end(dataset_id)
+                return self._cache[dataset_id]
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM results WHERE dataset_id = ? AND created_at >= ?",
+                (dataset_id, time.time() - self.retention),
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        self._remember(dataset_id, result)
+        return result
+
+    def latest(self):
+        """가장 최근에 저장된 (dataset_id, 결과), 없으면 (None, None)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT dataset_id FROM results WHERE created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (time.time() - self.retention,),
+            ).fetchone()
+        if row is None:
+            return None, None
+        return row[0], self.get(row[0])
+
+
+results = ResultStore(RESULT_DB_PATH, RESULT_CACHE_ITEMS, RESULT_RETENTION)
@@ -0,0 +1,317 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import SERIAL_INDEX_CODES, SERIAL_INDEX_DB
+from app.core.metrics import staged
+
+
+# 제품코드별 시리얼 구간 인덱스
+# 등록된 데이터셋의 (codes, serialst, serialsp, lotno, boxno, 원본 행) 을 SQLite 에 누적하고,
+# 메모리에는 최근 조회한 코드 SERIAL_INDEX_CODES 개까지 시작시리얼 순 정렬 배열 + 종료시리얼 누적 최대값을 둔다 (LRU).
+# 시리얼 X / 구간 [a, b] 와 겹치는 구간은 이진 탐색 두 번으로 후보 구간을 좁혀서 찾는다.
+# 새 데이터셋은 추가된 행만 정렬 배열에 병합하므로 전체 재구축이 없다.
+# 추가 전에 새 행만 검사해서 이전 파일들과 겹치는 시리얼 구간(파일 간 중복)을 찾는다
+# (로딩되지 않은 코드는 새 구간 묶음마다 SQLite 에서 후보 구간만 읽음: 코드별 최대 구간 길이 L 을 같이 저장해서
+#  [a, b] 와 겹칠 수 있는 구간을 a - L <= 시작시리얼 <= b 로 (codes, serialst) 인덱스 양쪽을 막고 찾으므로
+#  읽는 행 수가 이력 크기와 관계없이 새 구간 주변에만 비례한다).
+
+_QUERY_CHUNK = 500  # SQLite IN (...) 변수 개수 제한 대비
+
+
+class _CodeRanges:
+    """한 제품코드의 구간 (시작시리얼 순 정렬)"""
+
+    def __init__(self, ids: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        order = np.lexsort((ids, starts))
+        self.ids = ids[order]
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self._reindex()
+
+    def _reindex(self):
+        # max_ends[i] = 앞에서 i 번째까지 구간의 종료시리얼 최대값 (단조 증가 -> 이진 탐색 가능)
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def merge(self, ids: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        order = np.lexsort((ids, starts))
+        ids, starts, ends = ids[order], starts[order], ends[order]
+        pos = np.searchsorted(self.starts, starts, side="right")
+        self.ids = np.insert(self.ids, pos, ids)
+        self.starts = np.insert(self.starts, pos, starts)
+        self.ends = np.insert(self.ends, pos, ends)
+        self._reindex()
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """[start, end] 와 겹치는 구간 id (시작시리얼 순)"""
+        hi = np.searchsorted(self.starts, end, side="right")  # 시작시리얼 <= end
+        lo = np.searchsorted(self.max_ends, start, side="left")  # 앞쪽은 모두 종료시리얼 < start
+        if lo >= hi:
+            return self.ids[:0]
+        return self.ids[lo:hi][self.ends[lo:hi] >= start]
+
+    def overlapping_many(self, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """여러 구간 [starts[i], ends[i]] 에 대해 겹치는 (i, 구간 id) 쌍 (구간마다 이진 탐색 두 번)"""
+        hi = np.searchsorted(self.starts, ends, side="right")
+        lo = np.searchsorted(self.max_ends, starts, side="left")
+        counts = np.maximum(hi - lo, 0)
+        query = np.repeat(np.arange(len(starts)), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        window = np.arange(counts.sum()) - offsets + np.repeat(lo, counts)
+        hit = self.ends[window] >= starts[query]
+        return query[hit], self.ids[window[hit]]
+
+
+def index_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame -> 인덱스에 넣을 행 (코드/시리얼이 있는 행만, row 는 엑셀 행 번호)"""
+    if df.empty or not {"codes", "serialst", "serialsp"}.issubset(df.columns):
+        return pd.DataFrame(columns=["codes", "serialst", "serialsp", "row", "lotno", "boxno"])
+
+    starts = pd.to_numeric(df["serialst"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    ends = pd.to_numeric(df["serialsp"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    valid = df["codes"].notna().to_numpy() & ~np.isnan(starts) & ~np.isnan(ends)
+    pos = np.flatnonzero(valid)
+
+    def text(col):
+        if col not in df.columns:
+            return [None] * len(pos)
+        s = df[col].iloc[pos]
+        return s.astype(str).where(s.notna(), None).tolist()
+
+    return pd.DataFrame({
+        "codes": df["codes"].iloc[pos].astype(str).tolist(),
+        "serialst": starts[pos],
+        "serialsp": ends[pos],
+        "row": pos + 2,  # 헤더 = 1행
+        "lotno": text("lotno"),
+        "boxno": text("boxno"),
+    })
+
+
+def _code_ranges(rows: list) -> _CodeRanges:
+    """(id, serialst, serialsp) 행 목록 -> 정렬 배열"""
+    arr = np.array(rows, dtype="float64").reshape(-1, 3)
+    return _CodeRanges(arr[:, 0].astype(np.int64), arr[:, 1], arr[:, 2])
+
+
+def _clusters(starts: np.ndarray, ends: np.ndarray) -> list[tuple[float, float]]:
+    """새 구간들을 겹치거나 붙어 있는 것끼리 묶은 [시작, 끝] 목록 (시작시리얼 순)"""
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    # 앞의 모든 구간 끝 + 1 보다 뒤에서 시작하면 새 묶음
+    first = np.r_[True, starts[1:] > reach[:-1] + 1]
+    heads = np.flatnonzero(first)
+    tails = np.r_[heads[1:] - 1, len(starts) - 1]
+    return list(zip(starts[heads].tolist(), reach[tails].tolist()))
+
+
+def _serial(value: float):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class SerialIndex:
+    def __init__(self, db_path: str, max_codes: int):
+        self.db_path = db_path
+        self.max_codes = max_codes
+        self._codes = OrderedDict()  # codes -> _CodeRanges (조회 시 로딩, 구간이 있는 코드만)
+        self._watermark = 0  # 메모리에 반영된 최대 구간 id
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_datasets ("
+                "dataset_id TEXT PRIMARY KEY, source TEXT, rows INTEGER NOT NULL, indexed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS serial_ranges ("
+                "id INTEGER PRIMARY KEY, codes TEXT NOT NULL, serialst REAL NOT NULL, serialsp REAL NOT NULL, "
+                "dataset_id TEXT NOT NULL, row INTEGER NOT NULL, lotno TEXT, boxno TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_serial_ranges_codes ON serial_ranges (codes, serialst)")
+            conn.execute("CREATE TABLE IF NOT EXISTS serial_codes (codes TEXT PRIMARY KEY, max_length REAL NOT NULL)")
+            if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM serial_codes)").fetchone()[0]:
+                # 최대 구간 길이 표가 없던 이전 인덱스 파일 (한 번만 채움)
+                conn.execute(
+                    "INSERT INTO serial_codes (codes, max_length) "
+                    "SELECT codes, MAX(MAX(serialsp - serialst), 0) FROM serial_ranges GROUP BY codes"
+                )
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=10)) as conn, conn:
+            yield conn
+
+    def _refresh(self, conn):
+        """다른 워커/프로세스가 추가한 구간을 로딩된 코드에 병합 (lock 보유 상태에서 호출)"""
+        latest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM serial_ranges").fetchone()[0]
+        if latest <= self._watermark:
+            return
+        if self._codes:
+            rows = conn.execute(
+                "SELECT codes, id, serialst, serialsp FROM serial_ranges WHERE id > ? AND id <= ?",
+                (self._watermark, latest),
+            ).fetchall()
+            added = pd.DataFrame(rows, columns=["codes", "id", "serialst", "serialsp"])
+            for code, group in added.groupby("codes", sort=False):
+                ranges = self._codes.get(code)
+                if ranges is not None:
+                    ranges.merge(
+                        group["id"].to_numpy(dtype=np.int64),
+                        group["serialst"].to_numpy(dtype="float64"),
+                        group["serialsp"].to_numpy(dtype="float64"),
+                    )
+        self._watermark = latest
+
+    def _ranges(self, conn, code: str) -> _CodeRanges:
+        """코드의 정렬 배열 (없으면 로딩, 구간이 없는 코드는 캐시하지 않음 - 없는 코드 조회로 메모리가 늘지 않게)"""
+        ranges = self._codes.get(code)
+        if ranges is not None:
+            self._codes.move_to_end(code)
+            return ranges
+        ranges = _code_ranges(conn.execute(
+            "SELECT id, serialst, serialsp FROM serial_ranges WHERE codes = ? AND id <= ?",
+            (code, self._watermark),
+        ).fetchall())
+        if len(ranges.ids):
+            self._codes[code] = ranges
+            while len(self._codes) > self.max_codes:
+                self._codes.popitem(last=False)
+        return ranges
+
+    def _window(self, conn, code: str, starts: np.ndarray, ends: np.ndarray) -> _CodeRanges:
+        """코드의 구간 중 새 구간들 [starts[i], ends[i]] 과 겹칠 수 있는 후보 (로딩된 코드면 정렬 배열,
+        아니면 겹치는 새 구간을 묶어서 묶음마다 (codes, serialst) 인덱스 범위로 SQLite 에서 읽고 캐시하지 않음
+        - 업로드 검사가 코드 전체 이력을 읽거나 메모리에 남기지 않게)"""
+        ranges = self._codes.get(code)
+        if ranges is not None:
+            return ranges
+        row = conn.execute("SELECT max_length FROM serial_codes WHERE codes = ?", (code,)).fetchone()
+        if row is None:
+            return _code_ranges([])
+        max_length = row[0]
+        rows = {}
+        for start, end in _clusters(starts, ends):
+            rows.update((r[0], r) for r in conn.execute(
+                "SELECT id, serialst, serialsp FROM serial_ranges "
+                "WHERE codes = ? AND serialst >= ? AND serialst <= ? AND serialsp >= ? AND id <= ?",
+                (code, start - max_length, end, start, self._watermark),
+            ))
+        return _code_ranges(list(rows.values()))
+
+    def is_indexed(self, dataset_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM indexed_datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+        return row is not None
+
+    def _fetch(self, conn, ids: np.ndarray) -> dict:
+        """구간 id -> (id, serialst, serialsp, lotno, boxno, dataset_id, source, row)"""
+        found = {}
+        for i in range(0, len(ids), _QUERY_CHUNK):
+            chunk = ids[i:i + _QUERY_CHUNK].tolist()
+            placeholders = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                "SELECT r.id, r.serialst, r.serialsp, r.lotno, r.boxno, r.dataset_id, d.source, r.row "
+                "FROM serial_ranges r JOIN indexed_datasets d ON d.dataset_id = r.dataset_id "
+                f"WHERE r.id IN ({placeholders})",
+                chunk,
+            ):
+                found[row[0]] = row
+        return found
+
+    def _conflicts(self, conn, dataset_id: str, rows: pd.DataFrame) -> list[dict]:
+        """새 행과 겹치는 다른 데이터셋의 구간 (새 행만 코드별 정렬 배열에 대고 찾음)"""
+        conflicts = []
+        for code, group in rows.groupby("codes", sort=True):
+            starts = group["serialst"].to_numpy(dtype="float64")
+            ends = group["serialsp"].to_numpy(dtype="float64")
+            query, ids = self._window(conn, code, starts, ends).overlapping_many(starts, ends)
+            found = self._fetch(conn, np.unique(ids))
+            row_numbers = group["row"].to_numpy()
+            for q, i in zip(query.tolist(), ids.tolist()):
+                other = found.get(i)
+                if other is None or other[5] == dataset_id:
+                    continue
+                conflicts.append({
+                    "codes": code,
+                    "row": int(row_numbers[q]),
+                    "serialst": _serial(starts[q]),
+                    "serialsp": _serial(ends[q]),
+                    "other_dataset_id": other[5],
+                    "other_source": other[6],
+                    "other_row": other[7],
+                    "other_serialst": _serial(other[1]),
+                    "other_serialsp": _serial(other[2]),
+                    "overlap_start": _serial(max(starts[q], other[1])),
+                    "overlap_end": _serial(min(ends[q], other[2])),
+                })
+        return conflicts
+
+    @staged("serial_index")
+    def add_dataset(self, dataset_id: str, df: pd.DataFrame, source: str = None) -> list[dict]:
+        """데이터셋의 구간을 인덱스에 추가하고, 이전에 등록된 다른 데이터셋과 겹치는 행 목록 반환
+        (이미 등록된 dataset_id 면 추가 없이 검사만, 스레드에서 호출)"""
+        rows = index_rows(df)
+        with self._lock, self._connect() as conn:
+            self._refresh(conn)
+            conflicts = self._conflicts(conn, dataset_id, rows)
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO indexed_datasets (dataset_id, source, rows, indexed_at) VALUES (?, ?, ?, ?)",
+                (dataset_id, source, len(rows), time.time()),
+            ).rowcount
+            if inserted:
+                conn.executemany(
+                    "INSERT INTO serial_ranges (codes, serialst, serialsp, dataset_id, row, lotno, boxno) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (code, start, end, dataset_id, int(row), lotno, boxno)
+                        for code, start, end, row, lotno, boxno in zip(*(rows[c].tolist() for c in rows.columns))
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO serial_codes (codes, max_length) VALUES (?, ?) "
+                    "ON CONFLICT (codes) DO UPDATE SET max_length = MAX(max_length, excluded.max_length)",
+                    (
+                        (code, float(length))
+                        for code, length in (rows["serialsp"] - rows["serialst"]).clip(lower=0)
+                        .groupby(rows["codes"], sort=False).max().items()
+                    ),
+                )
+                self._refresh(conn)
+        return conflicts
+
+    def query(self, code: str, start: float, end: float = None, limit: int = None) -> list[dict]:
+        """code 의 구간 중 [start, end] (end 생략 시 시리얼 start 한 점) 와 겹치는 구간 목록"""
+        end = start if end is None else end
+        with self._lock, self._connect() as conn:
+            self._refresh(conn)
+            ids = self._ranges(conn, str(code)).overlapping(start, end)
+            if limit is not None:
+                ids = ids[:limit]
+            found = self._fetch(conn, ids)
+        return [
+            {
+                "serialst": _serial(found[i][1]),
+                "serialsp": _serial(found[i][2]),
+                "lotno": found[i][3],
+                "boxno": found[i][4],
+                "dataset_id": found[i][5],
+                "source": found[i][6],
+                "row": found[i][7],
+            }
+            for i in ids.tolist() if i in found
+        ]
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            datasets, ranges = conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM indexed_datasets").fetchone()
+        return {"datasets": datasets, "ranges": ranges, "loaded_codes": len(self._codes)}
+
+
+serial_index = SerialIndex(SERIAL_INDEX_DB, SERIAL_INDEX_CODES)
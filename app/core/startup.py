@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 시작 시간 보고 (GET /startup, 데스크톱 실행 파일 콜드 스타트 목표 1초)
+# 기준 시각은 run_app.py 가 가장 먼저 남기는 SHEETFLOW_STARTED_AT (uvicorn 으로 바로 띄우면 이 모듈 import 시각).
+# 실행 파일 압축 해제처럼 파이썬 시작 전 시간은 포함되지 않는다 (benchmarks/bench_startup.py 는 프로세스 밖에서 측정).
+# - phases: 앱 구성 import, 무거운 모듈 / 라우터별 import, 폴더 감시 시작 (시작 시각 + 걸린 시간)
+# - first_response: 첫 / 응답까지, ready: 예열(라우터 + 폴더 감시) 완료까지
+
+def _origin() -> float:
+    try:
+        return float(os.environ["SHEETFLOW_STARTED_AT"])
+    except (KeyError, ValueError):
+        return time.time()
+
+
+class StartupReport:
+    def __init__(self, origin: float):
+        self.origin = origin
+        self.first_response = None
+        self.ready = None
+        self._phases = []  # (이름, 기준 시각부터 시작까지, 걸린 초)
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.time() - self.origin
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases.append((name, start - self.origin, time.time() - start))
+
+    def mark_first_response(self):
+        with self._lock:
+            if self.first_response is not None:
+                return
+            self.first_response = self.elapsed()
+        print(f"🚀 첫 응답까지 {self.first_response:.2f}초")
+
+    def mark_ready(self):
+        self.ready = self.elapsed()
+        with self._lock:
+            slowest = sorted(self._phases, key=lambda phase: -phase[2])[:3]
+        detail = ", ".join(f"{name} {seconds:.2f}초" for name, _, seconds in slowest)
+        print(f"✅ 예열 완료: 시작부터 {self.ready:.2f}초 ({detail})")
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = list(self._phases)
+        rounded = lambda value: round(value, 4) if value is not None else None
+        return {
+            "first_response_seconds": rounded(self.first_response),
+            "ready_seconds": rounded(self.ready),
+            "uptime_seconds": rounded(self.elapsed()),
+            "phases": [
+                {"name": name, "started_at": rounded(started), "seconds": rounded(seconds)}
+                for name, started, seconds in phases
+            ],
+        }
+
+
+startup = StartupReport(_origin())
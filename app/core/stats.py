@@ -0,0 +1,121 @@
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from app.core.config import ANALYZE_CACHE_ITEMS
+from app.core.metrics import staged
+
+
+# 수율 / 불량 통계
+# 제품코드(+ lot / 품번 / 테스트일 구간) 별 합계를 groupby().agg() 한 번으로 구하고,
+# 비율과 상위 N 개 인사이트도 컬럼 연산 + nlargest 로 계산한다.
+
+GROUP_COLUMNS = ["codes", "lotno", "partno"]
+DATE_BUCKETS = {"day": "D", "week": "W", "month": "M"}
+
+# 응답 키 (기존 응답 호환: codes -> product_code)
+OUTPUT_NAMES = {"codes": "product_code", "date": "date"}
+
+
+def _bucket(dates: pd.Series, bucket: str) -> pd.Series:
+    """테스트일 -> 구간 시작일 (YYYY-MM-DD)"""
+    if bucket == "day":
+        start = dates.dt.floor("D")
+    else:
+        start = dates.dt.to_period(DATE_BUCKETS[bucket]).dt.start_time
+    return start.dt.strftime("%Y-%m-%d")
+
+
+@staged("stats")
+def stats_totals(df: pd.DataFrame, group_by: list[str] = None, bucket: str = None):
+    """그룹별 testedqty / goodqty 합계 + 행 수 (그룹 키가 index, 그룹 컬럼이 없으면 None)
+    합계라서 코드 샤드별 결과를 combine_totals 로 다시 합칠 수 있다 (app.core.partitioned)."""
+    group_by = [col for col in (group_by or ["codes"]) if col in df.columns]
+    frame = pd.DataFrame({
+        "testedqty": pd.to_numeric(df["testedqty"], errors="coerce") if "testedqty" in df.columns else 0,
+        "goodqty": pd.to_numeric(df["goodqty"], errors="coerce") if "goodqty" in df.columns else 0,
+    }, index=df.index)
+    keys = [df[col] for col in group_by]
+    if bucket and "Testdate" in df.columns:
+        keys.append(_bucket(df["Testdate"], bucket).rename("date"))
+    if not keys:
+        return None
+
+    return frame.groupby(keys, observed=True, sort=True).agg(
+        testedqty=("testedqty", "sum"),
+        goodqty=("goodqty", "sum"),
+        rows=("testedqty", "size"),
+    )
+
+
+def combine_totals(parts: list):
+    """샤드별 stats_totals 결과 합치기 (같은 그룹은 합계끼리 더함)"""
+    if not parts or parts[0] is None:
+        return None
+    totals = pd.concat(parts)
+    return totals.groupby(level=list(range(totals.index.nlevels)), observed=True, sort=True).sum()
+
+
+def finish_stats(totals) -> pd.DataFrame:
+    """합계 -> 불량 수 + 수율 / 불량율 (%) 을 붙인 통계 표"""
+    if totals is None:
+        return pd.DataFrame(columns=["testedqty", "goodqty", "rows", "defect_count", "yield_rate", "defect_rate"])
+
+    stats = totals.copy()
+    stats["testedqty"] = stats["testedqty"].astype("int64")
+    stats["goodqty"] = stats["goodqty"].astype("int64")
+    stats["defect_count"] = stats["testedqty"] - stats["goodqty"]
+    tested = stats["testedqty"].where(stats["testedqty"] != 0)
+    stats["yield_rate"] = (stats["goodqty"] / tested * 100).fillna(0.0).round(1)
+    stats["defect_rate"] = (stats["defect_count"] / tested * 100).fillna(0.0).round(1)
+    return stats.reset_index()
+
+
+def yield_stats(df: pd.DataFrame, group_by: list[str] = None, bucket: str = None) -> pd.DataFrame:
+    """그룹별 testedqty / goodqty 합계 + 불량 수 + 수율 / 불량율 (%)"""
+    return finish_stats(stats_totals(df, group_by, bucket))
+
+
+def stats_records(stats: pd.DataFrame) -> list[dict]:
+    names = [OUTPUT_NAMES.get(col, col) for col in stats.columns]
+    return [dict(zip(names, values)) for values in zip(*(stats[col].tolist() for col in stats.columns))]
+
+
+def top_insights(stats: pd.DataFrame, top: int = 1) -> dict:
+    """수율 / 불량율 상위 N 개 그룹"""
+    return {
+        "top_yield": stats_records(stats.nlargest(top, "yield_rate")),
+        "top_defect": stats_records(stats.nlargest(top, "defect_rate")),
+    }
+
+
+class StatsCache:
+    """dataset_id + 요청 옵션 -> 분석 결과 (dataset_id 는 내용 해시라 결과가 바뀌지 않음)"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(dataset_id: str, **options) -> str:
+        return dataset_id + ":" + json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+
+stats_cache = StatsCache(ANALYZE_CACHE_ITEMS)
@@ -1,19 +1,7 @@
-import os
-import pandas as pd
-from fastapi import UploadFile
-
-UPLOAD_DIR = "uploaded_files"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-async def save_uploaded_file(file: UploadFile) -> str:
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    return file_path
+from app.core.readers import read_excel
 
 def analyze_duplicates(file_path: str, subset: list[str] = None) -> dict:
-    df = pd.read_excel(file_path)
+    df = read_excel(file_path)
 
     if subset:
         duplicated = df[df.duplicated(subset=subset, keep=False)]
@@ -1,9 +1,20 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import cProfile
+import importlib
+import time
+import tracemalloc
 
-# ✅ 라우터들
-from app.api import upload, result, grouped, sort, generate, analyze
-from app.workers.watchdog_worker import start_watchdog  # ✅ 감시기 import
+from app.core.startup import startup
+
+with startup.phase("import fastapi"):
+    from fastapi import FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, Response
+
+from app.core.config import PROFILE_REQUESTS, STARTUP_WARMUP_DELAY_MS, TRACE_MEMORY, UPLOAD_MAX_BYTES
+from app.core.metrics import (
+    observe_request, profile_text, registry, request_scope, stage_summary, worker_peak_memory
+)
 
 app = FastAPI(
     title="SheetFlow Backend",
@@ -11,7 +22,148 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# ✅ CORS 설정
+# ✅ 라우터 등록 (모듈, prefix, 태그)
+# 첫 / 응답이 import 를 기다리지 않도록 시작 후 백그라운드 예열(warm_up) 때 import 해서 등록하고,
+# 예열 전에 들어온 요청은 해당 prefix 의 라우터만 그 자리에서 import 한다 (/openapi.json 은 전체).
+ROUTERS = [
+    ("app.api.upload", "/upload", "Upload"),
+    ("app.api.result", "/result", "Result"),
+    ("app.api.grouped", "/group", "Group"),
+    ("app.api.sort", "/sort", "Sort"),
+    ("app.api.generate", "/generate", "Generate"),
+    ("app.api.analyze", "/analyze", "Analyze"),
+    ("app.api.jobs", "/jobs", "Jobs"),
+    ("app.api.serials", "/serials", "Serials"),
+    ("app.api.batch", "/batch", "Batch"),
+]
+# 예열 때 라우터보다 먼저 import (시작 보고에서 라우터 import 와 따로 보이도록)
+HEAVY_MODULES = ["pandas", "xlsxwriter"]
+
+# 엔드포인트 -> 전체 라우트 경로 (포함된 라우터의 route.path 는 prefix 가 빠진 경로, 라우터 등록 때 채움)
+ROUTE_PATHS = {}
+_loaded_prefixes = set()
+_router_lock = asyncio.Lock()
+
+async def load_routers(prefixes: set = None):
+    """prefixes (None 이면 전체) 라우터 모듈을 스레드에서 import 한 뒤 등록 (이미 등록된 것은 건너뜀)"""
+    async with _router_lock:
+        for module_name, prefix, tag in ROUTERS:
+            if prefix in _loaded_prefixes or (prefixes is not None and prefix not in prefixes):
+                continue
+            with startup.phase(f"router {prefix}"):
+                module = await asyncio.to_thread(importlib.import_module, module_name)
+            app.include_router(module.router, prefix=prefix, tags=[tag])
+            ROUTE_PATHS.update({route.endpoint: prefix + route.path for route in module.router.routes})
+            _loaded_prefixes.add(prefix)
+            app.openapi_schema = None  # 문서는 등록된 라우터 기준으로 다시 생성
+
+@app.middleware("http")
+async def lazy_routers(request: Request, call_next):
+    if len(_loaded_prefixes) < len(ROUTERS):
+        path = request.url.path
+        if path == app.openapi_url:
+            await load_routers()
+        else:
+            prefixes = {prefix for _, prefix, _ in ROUTERS if path == prefix or path.startswith(prefix + "/")}
+            if prefixes - _loaded_prefixes:
+                await load_routers(prefixes)
+    return await call_next(request)
+
+# ✅ 업로드 용량 초과 요청은 본문을 받기 전에 거절 (multipart 헤더 여유분 1MB)
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES + 1024 * 1024:
+        return JSONResponse(status_code=413, content={"error": f"❌ 업로드 용량 초과 (최대 {UPLOAD_MAX_BYTES // (1024 * 1024)}MB)"})
+    return await call_next(request)
+
+# ✅ 요청별 최대 메모리 (SHEETFLOW_TRACE_MEMORY=1, 동시 요청이 있으면 프로세스 전체 기준 값)
+# 파싱 / 정렬 / 쓰기는 작업 풀 프로세스에서 실행되므로 워커가 작업마다 잰 최대 할당도 돌려받아
+# (API 프로세스, 워커 작업 중 가장 큰 작업) 중 큰 값을 X-Peak-Memory-Bytes 로 보낸다 (워커 크기 산정용).
+@app.middleware("http")
+async def trace_peak_memory(request: Request, call_next):
+    if not TRACE_MEMORY:
+        return await call_next(request)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    response = await call_next(request)
+    api_peak = tracemalloc.get_traced_memory()[1] - baseline
+    worker_peak = worker_peak_memory()
+    response.headers["X-Peak-Memory-Bytes"] = str(max(api_peak, worker_peak))
+    response.headers["X-Worker-Peak-Memory-Bytes"] = str(worker_peak)
+    print(f"📈 {request.method} {request.url.path} 최대 메모리: API {api_peak / (1024 * 1024):.1f}MB, "
+          f"작업 풀 {worker_peak / (1024 * 1024):.1f}MB")
+    return response
+
+def _route_label(request: Request) -> str:
+    """지표 라벨은 실제 URL 이 아니라 라우트 경로 (/result/{dataset_id} 등, 라벨 수 제한)"""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    return ROUTE_PATHS.get(request.scope.get("endpoint"), route.path)
+
+# ✅ 요청 지표 + 단계별 시간 (CORS 바로 안쪽 미들웨어, 응답 본문을 다 보낸 시점까지 측정)
+# ?profile=1 이면 응답 대신 단계별 시간 + cProfile 결과 (API 프로세스 / 작업 풀) 를 JSON 으로 반환
+@app.middleware("http")
+async def collect_metrics(request: Request, call_next):
+    profile = PROFILE_REQUESTS and request.query_params.get("profile") == "1"
+    length = request.headers.get("content-length")
+    bytes_in = int(length) if length and length.isdigit() else 0
+    start = time.perf_counter()
+
+    with request_scope(profile) as (stages, worker_profiles):
+        profiler = cProfile.Profile() if profile else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+        except ValueError:  # 다른 ?profile=1 요청이 이미 이 스레드를 측정 중
+            profiler = None
+        try:
+            response = await call_next(request)
+            if profile:
+                # 본문을 끝까지 소비해야 파일 응답의 정리 작업(BackgroundTask) 까지 실행됨
+                bytes_out = 0
+                async for chunk in response.body_iterator:
+                    bytes_out += len(chunk)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    route = _route_label(request)
+    if profile:
+        seconds = time.perf_counter() - start
+        observe_request(route, request.method, response.status_code, seconds, bytes_in, bytes_out)
+        return JSONResponse(content={
+            "route": route,
+            "status_code": response.status_code,
+            "seconds": round(seconds, 6),
+            "response_bytes": bytes_out,
+            "stages": stage_summary(stages),
+            "profile": {
+                "api": profile_text(profiler) if profiler is not None else None,
+                "workers": worker_profiles,
+            },
+        })
+
+    body = response.body_iterator
+
+    async def counted():
+        bytes_out = 0
+        try:
+            async for chunk in body:
+                bytes_out += len(chunk)
+                yield chunk
+        finally:
+            observe_request(route, request.method, response.status_code, time.perf_counter() - start,
+                            bytes_in, bytes_out)
+
+    response.body_iterator = counted()
+    return response
+
+# ✅ CORS 설정 (미들웨어는 나중에 등록한 것이 바깥쪽 -> 마지막에 등록해서 가장 바깥에 둠,
+# 안쪽 미들웨어가 바로 돌려주는 응답 (413 용량 초과 등) 에도 CORS 헤더가 붙도록)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 개발 단계에서는 전체 허용
@@ -20,20 +172,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ 라우터 등록
-app.include_router(upload.router, prefix="/upload", tags=["Upload"])
-app.include_router(result.router, prefix="/result", tags=["Result"])
-app.include_router(grouped.router, prefix="/group", tags=["Group"])
-app.include_router(sort.router, prefix="/sort", tags=["Sort"])
-app.include_router(generate.router, prefix="/generate", tags=["Generate"])
-app.include_router(analyze.router, prefix="/analyze", tags=["Analyze"])
+_first_response = asyncio.Event()
+
+async def warm_up():
+    """첫 / 응답 뒤 (늦어도 STARTUP_WARMUP_DELAY_MS 뒤) 무거운 모듈 + 라우터 import, 폴더 감시 시작"""
+    try:
+        await asyncio.wait_for(_first_response.wait(), STARTUP_WARMUP_DELAY_MS / 1000)
+    except asyncio.TimeoutError:
+        pass
+    try:
+        for module_name in HEAVY_MODULES:
+            with startup.phase(f"import {module_name}"):
+                await asyncio.to_thread(importlib.import_module, module_name)
+        await load_routers()
+        with startup.phase("watchdog"):
+            watchdog = await asyncio.to_thread(importlib.import_module, "app.workers.watchdog_worker")
+            await asyncio.to_thread(watchdog.start_watchdog)
+    except Exception as e:
+        import traceback
+        print("❌ 시작 예열 오류:", e)
+        print(traceback.format_exc())
+    startup.mark_ready()
 
-# ✅ 앱 시작 시 감시기 실행
+# ✅ 앱 시작 시 예열 (라우터 import + 폴더 감시) 을 백그라운드로 - 서버는 바로 요청을 받음
 @app.on_event("startup")
 async def startup_event():
-    start_watchdog()
+    app.state.warm_up = asyncio.create_task(warm_up())
+
+# ✅ 폴더 감시 수집 현황 (처리량 / 대기 건수)
+@app.get("/watchdog")
+async def watchdog_status():
+    watchdog = await asyncio.to_thread(importlib.import_module, "app.workers.watchdog_worker")
+    return watchdog.watchdog_stats()
+
+# ✅ 시작 시간 보고 (단계별 import 시간, 첫 / 응답 / 예열 완료까지)
+@app.get("/startup")
+async def startup_report():
+    return startup.report()
+
+# ✅ Prometheus 지표 (요청 지연 / 단계별 시간 / 처리 행 수 / 입출력 바이트 / 최대 RSS)
+@app.get("/metrics")
+async def metrics():
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
 
 # ✅ 기본 라우트 (헬스 체크용)
 @app.get("/")
 async def root():
+    startup.mark_first_response()
+    _first_response.set()
     return {"message": "Sheetflow backend is alive!"}
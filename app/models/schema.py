@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from app.core.metrics import staged
+
+
+# 업로드 시트 컬럼 스키마 (표준 표기 -> 타입)
+# - category: 반복이 많은 식별자 (메모리 절약 + 빠른 groupby / isin)
+# - serial:   시리얼 번호 (결측 허용 정수 Int64, 소수가 섞이면 실수 유지)
+# - number:   수량 / 수율
+# - date:     DATE_FORMATS 순서대로 명시 포맷 파싱
+# - text:     섞인 타입의 object 컬럼만 문자열로 통일
+SCHEMA = {
+    "package": "text",
+    "partno": "category",
+    "codes": "category",
+    "lotno": "category",
+    "dcode": "text",
+    "Testdate": "date",
+    "shipdate": "date",
+    "boxno": "text",
+    "serialst": "serial",
+    "serialsp": "serial",
+    "inqty": "number",
+    "currqty": "number",
+    "testedqty": "number",
+    "goodqty": "number",
+    "yld": "number",
+    "이슈사항": "text",
+}
+
+# 업로드 시트에서 사용하는 컬럼 (표준 표기)
+ALLOWED_COLUMNS = list(SCHEMA)
+
+# 미리보기 / 업로드 결과에 쓰는 컬럼 (이슈사항 제외)
+PREVIEW_COLUMNS = [col for col in ALLOWED_COLUMNS if col != "이슈사항"]
+
+# 소문자 컬럼명 -> 표준 표기
+COLUMN_MAPPING = {col.lower(): col for col in ALLOWED_COLUMNS}
+
+DATE_COLUMNS = [col for col, kind in SCHEMA.items() if kind == "date"]
+NUMERIC_COLUMNS = [col for col, kind in SCHEMA.items() if kind in ("serial", "number")]
+
+# 문자열 날짜 파싱 포맷 (형식 추론 없이 앞에서부터 시도)
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y/%m/%d", "%Y.%m.%d", "%Y%m%d"]
+DATE_DTYPE = "datetime64[us]"  # 읽기 엔진 (엑셀 / CSV / pyarrow) 에 관계없이 같은 단위
+
+
+def canonical_name(name: str) -> str:
+    """컬럼명(대소문자/공백 무관) -> 표준 표기 (스키마에 없으면 그대로)"""
+    return COLUMN_MAPPING.get(str(name).strip().lower(), name)
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """컬럼명을 공백 제거 + 소문자 기준으로 표준 표기로 맞추고 허용 컬럼만 남김"""
+    renamed = [COLUMN_MAPPING.get(str(col).strip().lower()) for col in df.columns]
+    keep = [name is not None for name in renamed]
+    df = df.loc[:, keep].set_axis([name for name in renamed if name is not None], axis=1)
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def _to_text(s: pd.Series) -> pd.Series:
+    if s.dtype == object:
+        return s.where(s.isna(), s.astype(str))
+    return s
+
+
+def _to_category(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    return _to_text(s).astype("category")
+
+
+def _to_number(s: pd.Series) -> pd.Series:
+    return pd.to_numeric(s, errors="coerce")
+
+
+def _to_serial(s: pd.Series) -> pd.Series:
+    numeric = pd.to_numeric(s, errors="coerce")
+    if pd.api.types.is_integer_dtype(numeric):
+        return numeric.astype("Int64")
+    values = numeric.to_numpy(dtype="float64", na_value=float("nan"))
+    valid = values[~pd.isna(values)]
+    if (valid % 1 == 0).all():
+        return numeric.astype("Int64")
+    return numeric
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(values, format=DATE_FORMATS[0], errors="coerce")
+    for fmt in DATE_FORMATS[1:]:
+        missing = parsed.isna() & values.notna()
+        if not missing.any():
+            break
+        parsed = parsed.mask(missing, pd.to_datetime(values.where(missing), format=fmt, errors="coerce"))
+    return parsed
+
+
+def _to_date(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s if s.dtype == DATE_DTYPE else s.astype(DATE_DTYPE)
+    # 날짜는 반복이 많으므로 고유값만 파싱한 뒤 위치로 펼침 (결측 코드 -1 -> 끝에 붙인 NaT)
+    codes, uniques = pd.factorize(s)
+    parsed = _parse_dates(pd.Series(uniques, dtype=object)).to_numpy().astype(DATE_DTYPE)
+    parsed = np.append(parsed, np.array(["NaT"], dtype=DATE_DTYPE))
+    return pd.Series(parsed[codes], index=s.index, name=s.name)
+
+
+# 타입 -> 변환 함수 (스키마는 import 시 한 번만 컬럼별 변환 함수로 펼쳐 둠)
+_CONVERTERS = {
+    "text": _to_text,
+    "category": _to_category,
+    "number": _to_number,
+    "serial": _to_serial,
+    "date": _to_date,
+}
+_COMPILED = {col: _CONVERTERS[kind] for col, kind in SCHEMA.items()}
+
+
+def coerce_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """스키마대로 컬럼 타입 통일 (컬럼형 저장 가능하도록)"""
+    return df.assign(**{col: _COMPILED.get(col, _to_text)(s) for col, s in df.items()})
+
+
+@staged("normalize")
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """컬럼 정규화 + 타입 통일"""
+    return coerce_dtypes(normalize_columns(df))
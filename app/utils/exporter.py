@@ -0,0 +1,174 @@
+import os
+import tempfile
+
+import pandas as pd
+import xlsxwriter
+
+from app.core.config import EXPORT_CHUNK_ROWS, XLSX_CONDITIONAL_MAX_ROWS, XLSX_FORMAT_MODE
+from app.core.metrics import staged
+from app.utils.formatter import FORMAT_MODES, WorkbookFormats, apply_sheet_formats, format_plan
+
+
+# 내보내기 파일 작성
+# 워크북 전체를 메모리에 만들지 않고 행 청크 단위로 임시 파일에 바로 쓴다.
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# pandas to_excel 기본 헤더 스타일과 동일
+HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+
+# 시트 하나에 쓸 수 있는 데이터 행 수 (엑셀 최대 1,048,576 행 - 헤더)
+MAX_SHEET_ROWS = 1_048_575
+
+
+def export_temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="sheetflow_export_", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def _chunk_rows(df: pd.DataFrame, chunk_rows: int):
+    """행 청크별로 컬럼 값을 파이썬 값 리스트로 변환 (NaN/NaT -> None)"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [col.astype(object).where(col.notna(), None).tolist() for _, col in chunk.items()]
+        yield start, zip(*columns)
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """CSV 바이트를 청크 단위로 생성 (엑셀 한글 깨짐 방지용 BOM 포함)"""
+    yield "\ufeff".encode("utf-8") + df.head(0).to_csv(index=False).encode("utf-8")
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode("utf-8")
+
+
+def format_mode(rows: int = None) -> str:
+    """값 있는 셀 노란색 방식 (rows 를 미리 모르는 스트리밍 쓰기는 auto 일 때 cells)"""
+    if XLSX_FORMAT_MODE in FORMAT_MODES:
+        return XLSX_FORMAT_MODE
+    return "conditional" if rows is not None and rows <= XLSX_CONDITIONAL_MAX_ROWS else "cells"
+
+
+def _write_values(worksheet, row: int, values, cell_formats: list = None):
+    """행 하나 쓰기 (cell_formats 가 있으면 값 있는 셀에 컬럼별 셀 서식, 빈 셀은 건너뜀)"""
+    if cell_formats is None:
+        worksheet.write_row(row, 0, values)
+        return
+    for col, (value, cell_format) in enumerate(zip(values, cell_formats)):
+        if value is None:
+            continue
+        if cell_format is not None and isinstance(value, str) and not value.strip():
+            cell_format = None  # 조건부 서식 no_blanks 와 같이 공백 문자열은 칠하지 않음
+        worksheet.write(row, col, value, cell_format)
+
+
+def _write_sheet(worksheet, header_format, df: pd.DataFrame, chunk_rows: int, cell_formats: list = None):
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+    for start, rows in _chunk_rows(df, chunk_rows):
+        for offset, values in enumerate(rows):
+            _write_values(worksheet, start + offset + 1, values, cell_formats)
+
+
+def _write_formatted_sheet(workbook, formats: WorkbookFormats, header_format, name: str, df: pd.DataFrame,
+                           chunk_rows: int):
+    """서식 (숫자 / 퍼센트 / 날짜 + 값 있는 셀 노란색) 을 적용한 시트 작성"""
+    worksheet = workbook.add_worksheet(name)
+    mode = format_mode(len(df))
+    apply_sheet_formats(workbook, worksheet, df, formats=formats, mode=mode)
+    cell_formats = formats.cell_formats(format_plan(df.columns)) if mode == "cells" else None
+    _write_sheet(worksheet, header_format, df, chunk_rows, cell_formats)
+
+
+@staged("write_xlsx")
+def write_xlsx(path: str, df_sorted: pd.DataFrame, df_duplicates: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS,
+               extra_sheets: dict = None):
+    """SortedData (+ Duplicates + extra_sheets 시트명 -> DataFrame) 시트를 constant_memory 모드로 작성
+    (SortedData / Duplicates 는 같은 서식, extra_sheets 는 서식 없음)"""
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    header_format = workbook.add_format(HEADER_FORMAT)
+    formats = WorkbookFormats(workbook)
+
+    _write_formatted_sheet(workbook, formats, header_format, "SortedData", df_sorted, chunk_rows)
+    if not df_duplicates.empty:
+        _write_formatted_sheet(workbook, formats, header_format, "Duplicates", df_duplicates, chunk_rows)
+
+    for name, df in (extra_sheets or {}).items():
+        _write_sheet(workbook.add_worksheet(name), header_format, df, chunk_rows)
+
+    workbook.close()
+
+
+@staged("write_csv")
+def write_csv(path: str, df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    with open(path, "wb") as f:
+        for chunk in iter_csv(df, chunk_rows):
+            f.write(chunk)
+
+
+class XlsxStreamWriter:
+    """행 청크를 순서대로 받아 constant_memory 워크북에 쓰기 (전체 행 수를 미리 몰라도 됨)
+    시트가 MAX_SHEET_ROWS 를 넘으면 같은 헤더로 "<이름>_2", "<이름>_3" ... 시트에 이어 쓴다."""
+
+    def __init__(self, path: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.header_format = self.workbook.add_format(HEADER_FORMAT)
+        self.formats = WorkbookFormats(self.workbook)
+        self.chunk_rows = chunk_rows
+        self._worksheet = None
+
+    def begin(self, name: str, columns: list, formats: bool = False):
+        """새 시트 묶음 시작 (시트는 첫 write 때 만듦)"""
+        self._name = name
+        self._columns = list(columns)
+        self._formats = formats
+        self._part = 0
+        self._worksheet = None
+
+    def _next_sheet(self):
+        self._part += 1
+        worksheet = self.workbook.add_worksheet(self._name if self._part == 1 else f"{self._name}_{self._part}")
+        self._cell_formats = None
+        if self._formats:
+            # 전체 행 수를 미리 모름 -> auto 면 셀 서식 (시트 최대 행 수 범위의 조건부 서식은 열기가 매우 느림)
+            mode = format_mode()
+            apply_sheet_formats(self.workbook, worksheet, pd.DataFrame(columns=self._columns), rows=MAX_SHEET_ROWS,
+                                formats=self.formats, mode=mode)
+            if mode == "cells":
+                self._cell_formats = self.formats.cell_formats(format_plan(self._columns))
+        worksheet.write_row(0, 0, [str(col) for col in self._columns], self.header_format)
+        self._worksheet, self._row = worksheet, 0
+
+    def write(self, df: pd.DataFrame):
+        if self._worksheet is None:
+            self._next_sheet()
+        for _, rows in _chunk_rows(df[self._columns], self.chunk_rows):
+            for values in rows:
+                if self._row >= MAX_SHEET_ROWS:
+                    self._next_sheet()
+                self._row += 1
+                _write_values(self._worksheet, self._row, values, self._cell_formats)
+
+    def close(self):
+        self.workbook.close()
+
+
+@staged("write_xlsx")
+def write_xlsx_stream(path: str, columns: list, sorted_chunks, duplicate_chunks=()):
+    """SortedData (+ Duplicates) 시트를 청크 반복자에서 바로 작성 (write_xlsx 와 같은 시트 구성)"""
+    writer = XlsxStreamWriter(path)
+    writer.begin("SortedData", columns, formats=True)
+    writer.write(pd.DataFrame(columns=columns))  # 행이 없어도 SortedData 시트는 만듦
+    for chunk in sorted_chunks:
+        writer.write(chunk)
+    writer.begin("Duplicates", columns, formats=True)
+    for chunk in duplicate_chunks:
+        writer.write(chunk)
+    writer.close()
+
+
+@staged("write_csv")
+def write_csv_stream(path: str, columns: list, chunks):
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8") + pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8"))
+        for chunk in chunks:
+            f.write(chunk[columns].to_csv(index=False, header=False).encode("utf-8"))
@@ -1,62 +1,101 @@
-# 숫자 포맷 (미리보기용 - 문자열 변환)
-def format_numbers_preview(row: dict) -> dict:
-    """천 단위 콤마 + yld 퍼센트 표시 (문자열)"""
-    for col in ["inqty", "currqty", "testedqty", "goodqty"]:
-        if col in row and row[col] is not None:
-            try:
-                row[col] = "{:,.0f}".format(float(row[col]))
-            except:
-                pass
-    if "yld" in row and row["yld"] is not None:
-        try:
-            row["yld"] = f"{float(row['yld']) * 100:.1f}%"
-        except:
-            pass
-    return row
+# 숫자 포맷 (엑셀 서식용 - 엑셀에서 계산 가능 + 가운데 정렬 + 값 있는 셀만 노란색)
+# 컬럼 구성별 서식 계획(FormatPlan)은 한 번만 만들어 재사용하고, 워크북 서식 객체는 워크북마다 한 번만 만든다.
+# 값 있는 셀 노란색은 두 가지 방식:
+# - conditional: 컬럼마다 no_blanks 조건부 서식 (파일이 작음, 행이 많으면 엑셀에서 열기가 매우 느림)
+# - cells:       행을 쓸 때 값 있는 셀에 노란색 셀 서식을 직접 지정 (파일은 커지지만 열기 빠름)
+
+ALIGN = {'align': 'center', 'valign': 'vcenter'}
+FORMAT_SPECS = {
+    "center": {},
+    "number": {'num_format': '#,##0'},
+    "percent": {'num_format': '0.0%'},
+    "date": {'num_format': 'yyyy-mm-dd'},
+}
+YELLOW = {'bg_color': '#FFFF00'}
+
+# 컬럼 -> (서식, 너비)
+COLUMN_FORMATS = {
+    **{col: ("number", 15) for col in ["inqty", "currqty", "testedqty", "goodqty"]},
+    "yld": ("percent", 10),
+    **{col: ("date", 12) for col in ["Testdate", "shipdate"]},
+}
+
+# 값이 있는 셀만 노란색
+YELLOW_COLUMNS = ["partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
+                  "boxno", "serialst", "serialsp", "inqty", "currqty",
+                  "testedqty", "goodqty", "yld"]
+
+FORMAT_MODES = ("conditional", "cells")
+
+
+class FormatPlan:
+    """컬럼 구성 하나에 대한 서식 계획 (컬럼 위치별 서식 이름 / 너비, 노란색 컬럼 위치)"""
+
+    def __init__(self, columns: tuple):
+        self.columns = columns
+        self.kinds = [COLUMN_FORMATS.get(col, ("center", None))[0] for col in columns]
+        self.widths = [COLUMN_FORMATS.get(col, ("center", None))[1] for col in columns]
+        self.yellow = [col in YELLOW_COLUMNS for col in columns]
+
+
+_plans = {}
+
+
+def format_plan(columns) -> FormatPlan:
+    """컬럼 구성별 서식 계획 (처음 한 번만 계산)"""
+    key = tuple(str(col) for col in columns)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = FormatPlan(key)
+    return plan
+
+
+class WorkbookFormats:
+    """워크북 하나의 서식 객체 (서식 이름별로 한 번만 add_format, 노란색 변형 포함)"""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, kind: str, yellow: bool = False):
+        key = (kind, yellow)
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = self._formats[key] = self.workbook.add_format({**FORMAT_SPECS[kind], **ALIGN, **(YELLOW if yellow else {})})
+        return fmt
+
+    def cell_formats(self, plan: FormatPlan) -> list:
+        """cells 방식에서 값 있는 셀에 쓸 컬럼 위치별 서식 (노란색 컬럼이 아니면 None = 컬럼 서식)"""
+        return [self.get(kind, True) if yellow else None for kind, yellow in zip(plan.kinds, plan.yellow)]
 
 
-# 숫자 포맷 (엑셀 서식용 - 엑셀에서 계산 가능 + 가운데 정렬 + 값 있는 셀만 노란색)
 def apply_excel_formats(writer, df):
     """엑셀 워크시트에 숫자, 퍼센트, 날짜 서식 적용 + 가운데 정렬 + 값 있는 셀만 노란색"""
-    workbook = writer.book
-    worksheet = writer.sheets["SortedData"]
-
-    # 포맷 정의
-    center_align = workbook.add_format({'align': 'center', 'valign': 'vcenter'})
-    number_format = workbook.add_format({'num_format': '#,##0', 'align': 'center', 'valign': 'vcenter'})
-    percent_format = workbook.add_format({'num_format': '0.0%', 'align': 'center', 'valign': 'vcenter'})
-    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd', 'align': 'center', 'valign': 'vcenter'})
-    yellow_bg = workbook.add_format({'bg_color': '#FFFF00', 'align': 'center', 'valign': 'vcenter'})
-
-    # 기본 가운데 정렬 (전체 컬럼)
-    worksheet.set_column(0, len(df.columns) - 1, None, center_align)
-
-    # 천 단위 콤마 적용
-    for col_name in ["inqty", "currqty", "testedqty", "goodqty"]:
-        if col_name in df.columns:
-            col_idx = df.columns.get_loc(col_name)
-            worksheet.set_column(col_idx, col_idx, 15, number_format)
-
-    # 퍼센트 적용
-    if "yld" in df.columns:
-        col_idx = df.columns.get_loc("yld")
-        worksheet.set_column(col_idx, col_idx, 10, percent_format)
-
-    # 날짜 서식 적용
-    for col_name in ["Testdate", "shipdate"]:
-        if col_name in df.columns:
-            col_idx = df.columns.get_loc(col_name)
-            worksheet.set_column(col_idx, col_idx, 12, date_format)
+    apply_sheet_formats(writer.book, writer.sheets["SortedData"], df)
+
+
+def apply_sheet_formats(workbook, worksheet, df, rows: int = None, formats: WorkbookFormats = None,
+                        mode: str = "conditional"):
+    """xlsxwriter 워크시트에 직접 서식 적용 (constant_memory 모드에서는 데이터 쓰기 전에 호출)
+    rows: 조건부 서식 범위 행 수 (스트리밍으로 쓸 때처럼 미리 모르면 시트 최대 행 수를 넘김, 기본 len(df))
+    mode="cells" 면 컬럼 서식만 지정하고 노란색은 행을 쓸 때 WorkbookFormats.cell_formats 로 셀마다 지정"""
+    plan = format_plan(df.columns)
+    formats = formats or WorkbookFormats(workbook)
+    if not plan.columns:
+        return
+
+    # 기본 가운데 정렬 (전체 컬럼) + 숫자 / 퍼센트 / 날짜 서식
+    worksheet.set_column(0, len(plan.columns) - 1, None, formats.get("center"))
+    for col_idx, (kind, width) in enumerate(zip(plan.kinds, plan.widths)):
+        if kind != "center":
+            worksheet.set_column(col_idx, col_idx, width, formats.get(kind))
 
     # 📌 조건부 서식 - 값이 있는 셀만 노란색
-    yellow_cols = ["partno", "codes", "lotno", "dcode", "Testdate", "shipdate",
-                   "boxno", "serialst", "serialsp", "inqty", "currqty",
-                   "testedqty", "goodqty", "yld"]
-
-    for col_name in yellow_cols:
-        if col_name in df.columns:
-            col_idx = df.columns.get_loc(col_name)
-            worksheet.conditional_format(
-                1, col_idx, len(df), col_idx,  # 데이터 범위만
-                {'type': 'no_blanks', 'format': yellow_bg}
-            )
+    if mode == "conditional":
+        last_row = len(df) if rows is None else rows
+        for col_idx, yellow in enumerate(plan.yellow):
+            if yellow:
+                worksheet.conditional_format(
+                    1, col_idx, last_row, col_idx,  # 데이터 범위만
+                    {'type': 'no_blanks', 'format': formats.get("center", True)}
+                )
@@ -0,0 +1,93 @@
+import json
+
+import pandas as pd
+from fastapi.responses import Response, StreamingResponse
+from app.core.metrics import staged
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+
+# JSON 미리보기 직렬화
+# NaN/NaT -> null, 천 단위 콤마, yld 퍼센트 표시를 컬럼 단위로 한 번에 처리하고 바로 JSON 바이트로 만든다.
+
+THOUSANDS_COLUMNS = ["inqty", "currqty", "testedqty", "goodqty"]
+PERCENT_COLUMNS = ["yld"]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_BYTES = 64 * 1024  # 스트리밍 응답에서 한 번에 보낼 크기 (작은 조각은 모아서 보냄)
+
+
+def _nullable(s: pd.Series) -> list:
+    values = s.astype(object).tolist()
+    return [None if n else v for v, n in zip(values, s.isna().tolist())]
+
+
+def _format_numbers(s: pd.Series, template: str, scale: float = 1.0) -> list:
+    numeric = pd.to_numeric(s, errors="coerce")
+    values = _nullable(s)
+    formatted = [template.format(v * scale) for v in numeric.fillna(0).tolist()]
+    return [f if ok else v for f, v, ok in zip(formatted, values, numeric.notna().tolist())]
+
+
+def _column_values(name: str, s: pd.Series) -> list:
+    if name in THOUSANDS_COLUMNS:
+        return _format_numbers(s, "{:,.0f}")
+    if name in PERCENT_COLUMNS:
+        return _format_numbers(s, "{:.1f}%", 100.0)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        s = s.dt.strftime("%Y-%m-%d")
+    return _nullable(s)
+
+
+@staged("serialize")
+def preview_records(df: pd.DataFrame) -> list[dict]:
+    """DataFrame -> JSON 미리보기용 행 목록"""
+    names = [str(col) for col in df.columns]
+    columns = [_column_values(name, s) for name, (_, s) in zip(names, df.items())]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
+
+
+def _batched(parts, size: int = STREAM_CHUNK_BYTES):
+    buffer, length = [], 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _separated(items, separator: bytes):
+    for i, item in enumerate(items):
+        yield separator + item if i else item
+
+
+def json_stream_response(key: str, items, extra: dict = None, headers: dict = None) -> StreamingResponse:
+    """{key: [items...], **extra} 를 조각 단위로 보냄 (items 는 항목별 JSON 바이트 목록 또는 생성기 - 보내면서 하나씩 꺼냄)"""
+    def body():
+        yield b"{" + dumps(key) + b":["
+        yield from _batched(_separated(items, b","))
+        tail = dumps(extra or {})
+        yield b"]" + (b"," + tail[1:] if len(tail) > 2 else b"}")
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
+def ndjson_response(items, headers: dict = None) -> StreamingResponse:
+    """항목 한 줄씩 (NDJSON) 보냄"""
+    return StreamingResponse(_batched(item + b"\n" for item in items), media_type=NDJSON_MEDIA_TYPE, headers=headers)
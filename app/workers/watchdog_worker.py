@@ -1,52 +1,207 @@
-
-import time
 import os
+import queue
+import threading
+import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from threading import Thread
 import pandas as pd
-from io import BytesIO
-from datetime import datetime
+from app.core.config import (
+    UPLOAD_DIR, WATCH_DEBOUNCE_MS, WATCH_OUTPUT_DIR, WATCH_POLL_MS, WATCH_QUEUE_SIZE, WATCH_WORKERS
+)
+from app.core.datasets import register_dataset
+from app.core.executor import run_sync
+from app.core.export import prepare_export_frame, sort_export_frame
+from app.core.ingest import hash_file
+from app.core.overlap import detect_duplicates
+from app.core.serial_index import serial_index
+from app.utils.exporter import write_xlsx
 
-WATCH_DIR = "uploaded_files"  # 감시할 폴더
-OUTPUT_DIR = "auto_generated"  # 결과 저장 폴더
+WATCH_DIR = UPLOAD_DIR  # 감시할 폴더 (/upload 로 받은 파일은 하위 폴더 API_UPLOAD_DIR 에 저장되어 감시되지 않음)
+OUTPUT_DIR = WATCH_OUTPUT_DIR  # 결과 저장 폴더
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 ALLOWED_EXTENSIONS = [".xlsx", ".xls", ".csv"]
 
-class ExcelHandler(FileSystemEventHandler):
-    def on_created(self, event):
-        if event.is_directory:
-            return
 
-        _, ext = os.path.splitext(event.src_path)
-        if ext.lower() not in ALLOWED_EXTENSIONS:
-            return
+# 폴더 감시 수집 파이프라인
+# 1) 감시 콜백은 경로만 기록하고 바로 반환한다.
+# 2) 쓰기 완료 대기: 크기/수정시각이 WATCH_DEBOUNCE_MS 동안 그대로이거나 close-write 이벤트가 오면 준비 완료.
+# 3) 준비된 파일은 제한된 대기열(WATCH_QUEUE_SIZE)로 보내고, 가득 차면 대기 목록에 남겨 다음에 다시 넣는다.
+# 4) 워커 스레드(WATCH_WORKERS)가 해시 확인 -> 파싱/정규화(작업 풀) -> 정렬/중복/서식 내보내기(작업 풀) -> 시리얼 인덱스.
+# 같은 내용(해시)이 이미 시리얼 인덱스에 등록됐으면 (파일명이 달라도, 결과 파일을 지웠어도) 건너뛴다.
+# 인덱스 등록은 내보내기가 끝난 뒤에 하므로 실패한 파일은 다음 이벤트 때 다시 처리된다.
+
+def output_path(path: str, dataset_id: str) -> str:
+    """결과 파일 경로 (원본 이름 + 내용 해시, 같은 초에 여러 파일이 와도 겹치지 않음)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(OUTPUT_DIR, f"autogen_{stem}_{dataset_id[:12]}.xlsx")
+
+
+def export_dataset(df: pd.DataFrame, out_path: str):
+    """정렬 + 중복 시트 + 서식 적용 엑셀을 out_path 에 저장 (작업 풀에서 실행, API 내보내기와 같은 단계)"""
+    df_sorted = sort_export_frame(prepare_export_frame(df, {}))
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        write_xlsx(tmp_path, df_sorted, detect_duplicates(df_sorted))
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class IngestPipeline:
+    def __init__(self, workers: int, queue_size: int, debounce: float, poll: float):
+        self.workers = workers
+        self.debounce = debounce
+        self.poll = poll
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = {}  # path -> (크기, 수정시각, 마지막 변경 시각)
+        self._lock = threading.Lock()
+        self._stats = {"detected": 0, "processed": 0, "skipped": 0, "failed": 0, "busy": 0}
+        self._active = set()  # 처리 중인 내용 해시 (같은 내용이 동시에 두 번 들어온 경우)
+        self._seconds = 0.0
+        self._started_at = None
+
+    def start(self):
+        self._started_at = time.monotonic()
+        threading.Thread(target=self._debounce_loop, name="sheetflow-watch-debounce", daemon=True).start()
+        for i in range(self.workers):
+            threading.Thread(target=self._worker_loop, name=f"sheetflow-watch-{i}", daemon=True).start()
+
+    def notify(self, path: str, closed: bool = False):
+        """감시 이벤트 (close-write 이면 다음 확인 때 바로 준비 완료로 처리)"""
+        with self._lock:
+            if path not in self._pending:
+                self._stats["detected"] += 1
+            size, mtime, _ = self._pending.get(path, (None, None, None))
+            self._pending[path] = (size, mtime, float("-inf") if closed else time.monotonic())
+
+    def _debounce_loop(self):
+        while True:
+            time.sleep(self.poll)
+            now = time.monotonic()
+            with self._lock:
+                paths = list(self._pending.items())
+            for path, (size, mtime, changed_at) in paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    self._forget(path)
+                    continue
+                if (stat.st_size, stat.st_mtime) != (size, mtime) and changed_at != float("-inf"):
+                    with self._lock:
+                        self._pending[path] = (stat.st_size, stat.st_mtime, now)
+                    continue
+                if now - changed_at < self.debounce:
+                    continue
+                try:
+                    self._queue.put_nowait(path)
+                except queue.Full:
+                    break  # 대기 목록에 남겨 두고 다음 확인 때 다시 시도
+                self._forget(path)
+
+    def _forget(self, path: str):
+        with self._lock:
+            self._pending.pop(path, None)
 
-        print(f"📁 새 파일 감지됨: {event.src_path}")
+    def _worker_loop(self):
+        while True:
+            path = self._queue.get()
+            with self._lock:
+                self._stats["busy"] += 1
+            start = time.perf_counter()
+            try:
+                outcome = self.process(path)
+            except Exception as e:
+                print(f"❌ 자동 분석 중 오류 발생 ({path}):", e)
+                outcome = "failed"
+            finally:
+                self._queue.task_done()
+            with self._lock:
+                self._stats["busy"] -= 1
+                self._stats[outcome] += 1
+                if outcome == "processed":
+                    self._seconds += time.perf_counter() - start
+
+    def process(self, path: str) -> str:
+        """파일 하나 처리 ("processed" | "skipped")"""
+        dataset_id = hash_file(path)
+        with self._lock:
+            if dataset_id in self._active:
+                return "skipped"
+            self._active.add(dataset_id)
         try:
-            if ext.lower() == ".csv":
-                df = pd.read_csv(event.src_path)
-            else:
-                df = pd.read_excel(event.src_path)
-
-            # 기본 정렬 (예시)
-            sort_keys = [col for col in ["codes", "lotno", "Testdate", "shipdate", "serialst"] if col in df.columns]
-            df_sorted = df.sort_values(by=sort_keys) if sort_keys else df
-
-            # 자동 저장
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            out_path = os.path.join(OUTPUT_DIR, f"autogen_{timestamp}.xlsx")
-            df_sorted.to_excel(out_path, index=False)
+            if serial_index.is_indexed(dataset_id):
+                return "skipped"  # 같은 내용은 이미 처리됨
+
+            # 업로드 API 와 같은 데이터셋이면 컬럼형 저장소에서 바로 읽음
+            df = register_dataset(dataset_id, path, path)
+            out_path = output_path(path, dataset_id)
+            run_sync(export_dataset, df, out_path)
             print(f"✅ 자동 저장됨: {out_path}")
 
-        except Exception as e:
-            print("❌ 자동 분석 중 오류 발생:", e)
+            # 시리얼 구간 인덱스에 추가 (= 처리 완료 표시) + 이전 파일들과 겹치는 구간 확인
+            cross_file = serial_index.add_dataset(dataset_id, df, os.path.basename(path))
+            if cross_file:
+                print(f"⚠️ 이전 파일과 겹치는 시리얼 구간 {len(cross_file)}건: {path}")
+            return "processed"
+        finally:
+            with self._lock:
+                self._active.discard(dataset_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            pending = len(self._pending)
+            seconds = self._seconds
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            **stats,
+            "pending": pending,  # 쓰기 완료 대기 + 대기열 자리 대기
+            "queued": self._queue.qsize(),
+            "backlog": pending + self._queue.qsize() + stats["busy"],
+            "workers": self.workers,
+            "files_per_second": round(stats["processed"] / elapsed, 3) if elapsed else 0.0,
+            "avg_seconds_per_file": round(seconds / stats["processed"], 3) if stats["processed"] else None,
+        }
+
+
+pipeline = IngestPipeline(WATCH_WORKERS, WATCH_QUEUE_SIZE, WATCH_DEBOUNCE_MS / 1000, WATCH_POLL_MS / 1000)
+
+
+class ExcelHandler(FileSystemEventHandler):
+    def _accept(self, path: str) -> bool:
+        name = os.path.basename(path)
+        _, ext = os.path.splitext(name)
+        return ext.lower() in ALLOWED_EXTENSIONS and not name.startswith(("~$", "."))
+
+    def on_created(self, event):
+        if not event.is_directory and self._accept(event.src_path):
+            print(f"📁 새 파일 감지됨: {event.src_path}")
+            pipeline.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and self._accept(event.src_path):
+            pipeline.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory and self._accept(event.dest_path):
+            pipeline.notify(event.dest_path)
+
+    def on_closed(self, event):
+        if not event.is_directory and self._accept(event.src_path):
+            pipeline.notify(event.src_path, closed=True)
+
+def watchdog_stats() -> dict:
+    return pipeline.stats()
 
 def start_watchdog():
+    os.makedirs(WATCH_DIR, exist_ok=True)
+    pipeline.start()
     event_handler = ExcelHandler()
     observer = Observer()
     observer.schedule(event_handler, WATCH_DIR, recursive=False)
-    observer_thread = Thread(target=observer.start, daemon=True)
-    observer_thread.start()
-    print(f"🔍 폴더 감시 시작됨: {WATCH_DIR}")
+    observer.daemon = True
+    observer.start()
+    print(f"🔍 폴더 감시 시작됨: {WATCH_DIR} (워커 {pipeline.workers}개)")
@@ -0,0 +1,76 @@
+"""
+일괄 처리 벤치마크: 시트 파싱 + 저장을 작업 프로세스 수별로 실행해서 처리 시간 / 속도 향상 비교
+
+    python -m benchmarks.bench_batch --files 8 --sheets 4 --rows 5000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.core import dataset_store
+from app.core.batch import list_sheets, load_sheets, store_sheet
+
+
+def make_workbook(path: str, sheets: int, rows: int, seed: int):
+    """라인별 시트가 있는 월간 워크북"""
+    rng = np.random.default_rng(seed)
+    with pd.ExcelWriter(path) as writer:
+        for i in range(sheets):
+            starts = rng.integers(0, 50_000_000, rows)
+            qty = rng.integers(10, 500, rows)
+            pd.DataFrame({
+                "partno": rng.choice(["P1", "P2", "P3"], rows),
+                "codes": [f"C{c:03d}" for c in rng.integers(0, 50, rows)],
+                "lotno": [f"L{c}" for c in rng.integers(0, 1000, rows)],
+                "Testdate": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, rows), unit="D"),
+                "serialst": starts, "serialsp": starts + qty,
+                "testedqty": qty, "goodqty": (qty * 0.95).astype(int),
+            }).to_excel(writer, sheet_name=f"line{i}", index=False)
+
+
+def _use_store(store_dir: str):
+    dataset_store.DATASET_STORE_DIR = store_dir
+
+
+def run(files: list[tuple[str, str]], workers: int, store_dir: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_store, initargs=(store_dir,)) as pool:
+        sheets = [sheet for found in pool.map(list_sheets, *zip(*files)) for sheet in found]
+        list(pool.map(store_sheet, *zip(*(sheet[:3] for sheet in sheets))))
+    _use_store(store_dir)
+    rows = len(load_sheets(sheets, {}))
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"month_{i}.xlsx")
+            make_workbook(path, args.sheets, args.rows, i)
+            files.append((os.path.basename(path), path))
+
+        print(f"cpu {os.cpu_count()}, {args.files} files x {args.sheets} sheets x {args.rows} rows")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'rows':>9}")
+        baseline = None
+        for workers in args.workers:
+            # 매번 빈 저장소에서 시작 (이미 저장된 시트는 건너뛰므로)
+            seconds, rows = run(files, workers, tempfile.mkdtemp(dir=tmp))
+            baseline = baseline or seconds
+            print(f"{workers:>8} {seconds:>9.2f} {baseline / seconds:>8.2f} {rows:>9}")
+
+
+if __name__ == "__main__":
+    main()
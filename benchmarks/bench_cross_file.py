@@ -0,0 +1,49 @@
+"""
+파일 간 중복 검사 벤치마크: 누적 이력이 늘어나도 업로드당 검사 + 추가 시간이 새 파일 크기에만 비례하는지 확인
+
+    python -m benchmarks.bench_cross_file --files 50 --rows 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import SERIAL_INDEX_CODES
+from app.core.serial_index import SerialIndex
+
+
+def make_file(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, 50_000_000, rows)
+    return pd.DataFrame({
+        "codes": [f"C{c:03d}" for c in rng.integers(0, 50, rows)],
+        "lotno": [f"L{c}" for c in rng.integers(0, 1000, rows)],
+        "boxno": rng.integers(1, 200, rows),
+        "serialst": starts,
+        "serialsp": starts + rng.integers(10, 500, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SerialIndex(os.path.join(tmp, "serials.db"), SERIAL_INDEX_CODES)
+        print(f"{'file':>5} {'history rows':>13} {'add(s)':>8} {'conflicts':>10}")
+        for i in range(args.files):
+            df = make_file(args.rows, i)
+            start = time.perf_counter()
+            conflicts = index.add_dataset(f"bench-{i}", df, f"bench_{i}.xlsx")
+            elapsed = time.perf_counter() - start
+            if i % max(1, args.files // 10) == 0 or i == args.files - 1:
+                print(f"{i:>5} {i * args.rows:>13} {elapsed:>8.3f} {len(conflicts):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+엑셀 재파싱 vs 컬럼형 저장소(Parquet, 메모리 맵) 재로딩 벤치마크
+
+    python -m benchmarks.bench_dataset_store --rows 10000 100000
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from app.core import dataset_store
+from app.core.datasets import parse_excel
+
+
+def make_sheet(rows: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, rows * 20, rows)
+    qty = rng.integers(10, 500, rows)
+    df = pd.DataFrame({
+        "package": "PKG", "partno": rng.choice(["P1", "P2", "P3"], rows),
+        "codes": [f"C{c:03d}" for c in rng.integers(0, 50, rows)],
+        "lotno": [f"L{c}" for c in rng.integers(0, 1000, rows)], "dcode": "D1",
+        "Testdate": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "shipdate": pd.Timestamp("2024-02-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "boxno": rng.integers(1, 200, rows), "serialst": starts, "serialsp": starts + qty,
+        "inqty": qty, "currqty": qty, "testedqty": qty, "goodqty": (qty * 0.95).astype(int), "yld": 0.95,
+    })
+    output = BytesIO()
+    df.to_excel(output, index=False)
+    return output.getvalue()
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_store.DATASET_STORE_DIR = tmp
+        print(f"{'rows':>8} {'xlsx(MB)':>9} {'parquet(MB)':>12} {'read_excel(s)':>14} {'parquet(s)':>11} {'3 cols(s)':>10}")
+        for rows in args.rows:
+            contents = make_sheet(rows)
+            dataset_id = hashlib.sha256(contents).hexdigest()
+            t_excel, df = timed(parse_excel, BytesIO(contents))
+            dataset_store.save_dataset(dataset_id, df)
+            t_full, _ = timed(dataset_store.load_dataset, dataset_id)
+            t_cols, _ = timed(dataset_store.load_dataset, dataset_id, ["codes", "serialst", "serialsp"])
+            size = os.path.getsize(os.path.join(tmp, f"{dataset_id}.parquet"))
+            print(f"{rows:>8} {len(contents) / 1e6:>9.1f} {size / 1e6:>12.2f} {t_excel:>14.2f} {t_full:>11.3f} {t_cols:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+엔드포인트 벤치마크: 합성 로트 시트로 /upload, /sort, /group, /analyze, /generate 를 프로세스 안에서 호출해서
+지연 (첫 호출 / 반복 호출 중앙값 / p95), 처리량 (행/초), 최대 RSS 를 측정하고 JSON 으로 저장
+
+    python -m benchmarks.bench_endpoints --rows 1000 100000 --repeat 5 -o bench.json
+    python -m benchmarks.bench_endpoints --rows 1000 100000 --compare bench.json --threshold 0.2
+
+- 엔드포인트마다 새 프로세스 (spawn) + 임시 저장소에서 실행해서 최대 RSS 를 따로 잰다 (기본 작업 풀은 thread,
+  앱 시작 이벤트인 업로드 폴더 감시는 실행하지 않음)
+- 첫 호출은 파일 파싱 + 저장소 저장, 이후 호출은 같은 파일이므로 콘텐츠 해시 캐시 경로 (둘 다 기록)
+- 핵심 함수 (정규화 / 중복 검출 / 통계 / 직렬화 / 엑셀 쓰기 등) 도 같은 데이터로 따로 잰다
+  (메모리는 시간 측정 후 한 번 더 실행해서 tracemalloc 최대 할당)
+- --compare 로 이전 결과와 비교해서 threshold 이상 느려지거나 메모리가 늘어난 항목을 표시 (있으면 종료 코드 1)
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from queue import Empty
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_lot_file
+
+# 이름 -> (경로, 폼 필드)
+ENDPOINTS = {
+    "upload": ("/upload/", {}),
+    "sort": ("/sort/sort_excel", {}),
+    "group": ("/group/", {}),
+    "analyze": ("/analyze/analyze_excel", {}),
+    "generate_xlsx": ("/generate/generate_excel", {"format": "xlsx"}),
+    "generate_csv": ("/generate/generate_excel", {"format": "csv"}),
+}
+KERNELS = ["normalize", "legacy_preview", "preview_records", "detect_duplicates", "yield_stats", "write_xlsx", "write_csv"]
+XLSX_INPUT_MAX_ROWS = 200_000  # 이보다 크면 입력 파일을 CSV 로 만듦 (--input auto)
+PREVIEW_KERNEL_ROWS = 10_000
+
+
+# 기존 미리보기 경로 (clean_dataframe -> 행마다 format_numbers_preview -> clean_json_safe), preview_records 비교용
+def legacy_preview(df: pd.DataFrame) -> list[dict]:
+    df = df.astype(object).where(pd.notnull(df), None)
+    for col in df.columns:
+        df[col] = df[col].apply(lambda x: None if (isinstance(x, float) and math.isnan(x)) else x)
+    rows = []
+    for row in df.to_dict(orient="records"):
+        for col in ["inqty", "currqty", "testedqty", "goodqty"]:
+            if col in row and row[col] is not None:
+                try:
+                    row[col] = "{:,.0f}".format(float(row[col]))
+                except (TypeError, ValueError):
+                    pass
+        if "yld" in row and row["yld"] is not None:
+            try:
+                row["yld"] = f"{float(row['yld']) * 100:.1f}%"
+            except (TypeError, ValueError):
+                pass
+        rows.append(row)
+    return _legacy_json_safe(rows)
+
+
+def _legacy_json_safe(obj):
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, list):
+        return [_legacy_json_safe(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _legacy_json_safe(v) for k, v in obj.items()}
+    return obj
+
+
+def _isolate(workdir: str, executor: str):
+    """import 전에 저장소 / DB / 업로드 폴더를 임시 폴더로 (실행 간 캐시 공유 방지)"""
+    os.chdir(workdir)
+    os.environ.update({
+        "SHEETFLOW_EXECUTOR": executor,
+        "SHEETFLOW_DATASET_STORE_DIR": os.path.join(workdir, "dataset_store"),
+        "SHEETFLOW_RESULT_DB": os.path.join(workdir, "results.db"),
+        "SHEETFLOW_SERIAL_INDEX_DB": os.path.join(workdir, "serials.db"),
+        "SHEETFLOW_UPLOAD_DIR": os.path.join(workdir, "uploaded_files"),
+        "SHEETFLOW_JOB_DB": os.path.join(workdir, "jobs.db"),
+        "SHEETFLOW_JOB_RESULT_DIR": os.path.join(workdir, "job_results"),
+        "SHEETFLOW_WATCH_OUTPUT_DIR": os.path.join(workdir, "auto_generated"),
+        "SHEETFLOW_EXPORT_CACHE_MAX_BYTES": "0",  # 매 반복 실제로 내보내기
+        "SHEETFLOW_PROFILE_REQUESTS": "0",
+    })
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timings(seconds: list[float], rows: int) -> dict:
+    warm = seconds[1:] or seconds
+    median = float(np.median(warm))
+    return {
+        "cold_seconds": round(seconds[0], 6),
+        "median_seconds": round(median, 6),
+        "p95_seconds": round(float(np.percentile(warm, 95)), 6),
+        "rows_per_second": round(rows / median, 1) if median else None,
+    }
+
+
+def _run_endpoint(name: str, path: str, rows: int, repeat: int, executor: str, result):
+    with tempfile.TemporaryDirectory(prefix="sheetflow_bench_") as workdir:
+        _isolate(workdir, executor)
+        from fastapi.testclient import TestClient
+        from app.main import app, load_routers
+        asyncio.run(load_routers())  # 라우터 import 는 cold 에 넣지 않음 (시작 시간은 bench_startup)
+
+        url, form = ENDPOINTS[name]
+        baseline = _peak_rss_mb()
+        seconds, statuses, response_bytes = [], set(), 0
+        client = TestClient(app)  # 시작 이벤트 (업로드 폴더 감시) 는 실행하지 않음
+        for _ in range(repeat + 1):
+            with open(path, "rb") as f:
+                start = time.perf_counter()
+                response = client.post(url, files={"file": (os.path.basename(path), f)}, data=form)
+                seconds.append(time.perf_counter() - start)
+            statuses.add(response.status_code)
+            response_bytes = len(response.content)
+        result.put({
+            "status": sorted(statuses),
+            **_timings(seconds, rows),
+            "response_bytes": response_bytes,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "rss_growth_mb": round(_peak_rss_mb() - baseline, 1),
+        })
+
+
+def _run_kernels(path: str, rows: int, repeat: int, result):
+    from app.core.export import sort_export_frame
+    from app.core.datasets import parse_file
+    from app.core.overlap import detect_duplicates
+    from app.core.stats import yield_stats
+    from app.models.schema import normalize_frame
+    from app.utils.exporter import export_temp_path, write_csv, write_xlsx
+    from app.utils.serializer import preview_records
+
+    df = parse_file(path)
+    df_sorted = sort_export_frame(df)
+    raw = df.astype(object)  # 정규화 전 (읽기 직후) 과 같은 object 컬럼
+
+    def write(writer, ext):
+        out = export_temp_path(ext)
+        try:
+            writer(out)
+        finally:
+            os.remove(out)
+
+    kernels = {
+        "normalize": lambda: normalize_frame(raw),
+        "legacy_preview": lambda: legacy_preview(df.head(PREVIEW_KERNEL_ROWS)),
+        "preview_records": lambda: preview_records(df.head(PREVIEW_KERNEL_ROWS)),
+        "detect_duplicates": lambda: detect_duplicates(df_sorted),
+        "yield_stats": lambda: yield_stats(df, ["codes"]),
+        "write_xlsx": lambda: write(lambda out: write_xlsx(out, df_sorted, detect_duplicates(df_sorted)), ".xlsx"),
+        "write_csv": lambda: write(lambda out: write_csv(out, df_sorted), ".csv"),
+    }
+    measured = {}
+    for name in KERNELS:
+        seconds = []
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            kernels[name]()
+            seconds.append(time.perf_counter() - start)
+        # 할당 추적은 느려지므로 시간 측정과 따로 한 번 더 실행
+        tracemalloc.start()
+        kernels[name]()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        kernel_rows = min(rows, PREVIEW_KERNEL_ROWS) if name in ("legacy_preview", "preview_records") else rows
+        measured[name] = {**_timings(seconds, kernel_rows), "peak_alloc_mb": round(peak / (1024 * 1024), 1)}
+    result.put(measured)
+
+
+def spawn(target, *args):
+    """새 프로세스에서 target(*args, queue) 실행 후 결과 (실패하면 None)"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(*args, queue))
+    process.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=1)
+            except Empty:
+                if not process.is_alive():
+                    return None
+    finally:
+        process.join()
+
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float, min_delta: float = 0.01) -> list[dict]:
+    """같은 (종류, 이름, 행 수) 끼리 중앙값 시간 / 메모리 비교 -> threshold 이상 나빠진 항목
+    (시간 차이가 min_delta 초 미만이면 측정 오차로 보고 무시)"""
+    previous = {(r["kind"], r["name"], r["rows"]): r for r in baseline}
+    regressions = []
+    print(f"\n{'kind':>8} {'name':>18} {'rows':>9} {'base(s)':>9} {'now(s)':>9} {'ratio':>6} {'mem ratio':>9}")
+    for r in results:
+        base = previous.get((r["kind"], r["name"], r["rows"]))
+        if base is None or not base.get("median_seconds") or not r.get("median_seconds"):
+            continue
+        ratio = r["median_seconds"] / base["median_seconds"]
+        mem_key = "peak_rss_mb" if r["kind"] == "endpoint" else "peak_alloc_mb"
+        mem_ratio = r[mem_key] / base[mem_key] if base.get(mem_key) else 1.0
+        flag = ""
+        slower = ratio > 1 + threshold and r["median_seconds"] - base["median_seconds"] >= min_delta
+        if slower or mem_ratio > 1 + threshold:
+            flag = "  ⚠️ 회귀"
+            regressions.append({**r, "time_ratio": round(ratio, 3), "memory_ratio": round(mem_ratio, 3)})
+        print(f"{r['kind']:>8} {r['name']:>18} {r['rows']:>9} {base['median_seconds']:>9.3f} "
+              f"{r['median_seconds']:>9.3f} {ratio:>6.2f} {mem_ratio:>9.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    parser.add_argument("--no-kernels", action="store_true", help="핵심 함수 측정 생략")
+    parser.add_argument("--repeat", type=int, default=3, help="첫 호출 이후 반복 횟수")
+    parser.add_argument("--codes", type=int, default=50, help="코드 종류 수")
+    parser.add_argument("--overlap", type=float, default=0.02, help="겹치는 구간 행 비율")
+    parser.add_argument("--nan", type=float, default=0.01, help="빈 셀 비율")
+    parser.add_argument("--input", choices=["auto", "xlsx", "csv"], default="auto",
+                        help=f"입력 파일 형식 (auto: {XLSX_INPUT_MAX_ROWS:,}행 이하 xlsx, 넘으면 csv)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("-o", "--output", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 볼 증가 비율 (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="회귀로 볼 최소 시간 차이 (초)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sheetflow_bench_input_") as tmp:
+        print(f"{'kind':>8} {'name':>18} {'rows':>9} {'cold(s)':>8} {'median(s)':>9} {'p95(s)':>8} "
+              f"{'rows/s':>11} {'mem(MB)':>8} {'status':>7}")
+        for rows in args.rows:
+            ext = args.input if args.input != "auto" else ("xlsx" if rows <= XLSX_INPUT_MAX_ROWS else "csv")
+            path = write_lot_file(os.path.join(tmp, f"lots_{rows}.{ext}"), rows, codes=args.codes,
+                                  overlap_rate=args.overlap, nan_rate=args.nan)
+            common = {"rows": rows, "input": ext, "input_bytes": os.path.getsize(path)}
+
+            for name in args.endpoints:
+                measured = spawn(_run_endpoint, name, path, rows, args.repeat, args.executor)
+                if measured is None:
+                    print(f"{'endpoint':>8} {name:>18} {rows:>9} 실패")
+                    continue
+                results.append({"kind": "endpoint", "name": name, **common, **measured})
+                print(f"{'endpoint':>8} {name:>18} {rows:>9} {measured['cold_seconds']:>8.3f} "
+                      f"{measured['median_seconds']:>9.3f} {measured['p95_seconds']:>8.3f} "
+                      f"{measured['rows_per_second'] or 0:>11,.0f} {measured['peak_rss_mb']:>8.0f} "
+                      f"{','.join(map(str, measured['status'])):>7}")
+
+            if not args.no_kernels:
+                kernels = spawn(_run_kernels, path, rows, args.repeat) or {}
+                for name, measured in kernels.items():
+                    results.append({"kind": "kernel", "name": name, **common, **measured})
+                    print(f"{'kernel':>8} {name:>18} {rows:>9} {measured['cold_seconds']:>8.3f} "
+                          f"{measured['median_seconds']:>9.3f} {measured['p95_seconds']:>8.3f} "
+                          f"{measured['rows_per_second'] or 0:>11,.0f} {measured['peak_alloc_mb']:>8.0f} {'-':>7}")
+
+    report = {"meta": _meta(args), "results": results}
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold, args.min_delta)
+        report["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+    if regressions:
+        print(f"⚠️ 회귀 {len(regressions)}건 (threshold {args.threshold:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
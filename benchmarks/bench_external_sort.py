@@ -0,0 +1,78 @@
+"""
+메모리 내 정렬 vs 외부 정렬(out-of-core) 벤치마크: CSV 입력 -> 정렬 + 중복 검사 + CSV 내보내기의 시간 / 최대 RSS
+
+    python -m benchmarks.bench_external_sort --rows 1000000 3000000 --budget-mb 256
+각 모드는 새 프로세스에서 실행해서 최대 RSS 를 따로 잰다.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_csv(path: str, rows: int, seed: int = 0, chunk_rows: int = 500_000):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        starts = rng.integers(0, rows * 20, n)
+        qty = rng.integers(10, 500, n)
+        pd.DataFrame({
+            "partno": rng.choice(["P1", "P2", "P3"], n),
+            "codes": [f"C{c:03d}" for c in rng.integers(0, 200, n)],
+            "lotno": [f"L{c}" for c in rng.integers(0, 5000, n)],
+            "Testdate": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")).strftime("%Y-%m-%d"),
+            "boxno": rng.integers(1, 200, n), "serialst": starts, "serialsp": starts + qty,
+            "testedqty": qty, "goodqty": (qty * 0.95).astype(int),
+        }).to_csv(path, mode="a" if start else "w", header=not start, index=False)
+
+
+def _run(mode: str, path: str, budget: int, result):
+    os.environ["SHEETFLOW_SORT_MEMORY_BUDGET"] = str(budget)
+    from app.api.generate import build_external_export
+    from app.core.export import build_export
+    from app.core.datasets import parse_file
+
+    start = time.perf_counter()
+    if mode == "memory":
+        out, *_ = build_export(parse_file(path), {}, "csv")
+    else:
+        out, *_ = build_external_export(path, None, {}, "csv")
+    os.remove(out)
+    result.put((time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def measure(mode: str, path: str, budget: int) -> tuple[float, float]:
+    ctx = multiprocessing.get_context("spawn")
+    result = ctx.Queue()
+    process = ctx.Process(target=_run, args=(mode, path, budget, result))
+    process.start()
+    process.join()
+    return result.get() if process.exitcode == 0 else (float("nan"), float("nan"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 3_000_000])
+    parser.add_argument("--budget-mb", type=int, default=256)
+    args = parser.parse_args()
+    budget = args.budget_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"budget {args.budget_mb}MB")
+        print(f"{'rows':>9} {'csv(MB)':>8} {'mode':>9} {'seconds':>8} {'peak RSS(MB)':>13}")
+        for rows in args.rows:
+            path = os.path.join(tmp, f"mes_{rows}.csv")
+            make_csv(path, rows)
+            size = os.path.getsize(path) / (1024 * 1024)
+            for mode in ("memory", "external"):
+                seconds, peak = measure(mode, path, budget)
+                print(f"{rows:>9} {size:>8.0f} {mode:>9} {seconds:>8.2f} {peak:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+필터 pushdown 벤치마크: 전체 로딩 후 마스크 vs 컬럼형 저장소 row group pushdown
+
+    python -m benchmarks.bench_filter_pushdown --rows 1000000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core import dataset_store
+from app.core.query import apply_filters, compile_filters
+from app.models.schema import normalize_frame
+
+FILTERS = {
+    "1 day": {"Testdate__between": ["2024-06-01", "2024-06-01"]},
+    "1 month": {"Testdate__gte": "2024-06-01", "Testdate__lt": "2024-07-01"},
+    "1 month + code": {"Testdate__gte": "2024-06-01", "Testdate__lt": "2024-07-01", "codes": ["C001"]},
+    "serial range": {"serial__between": [1_000_000, 1_050_000]},
+    "1 code (all year)": {"codes": "C001"},
+}
+
+
+def make_history(rows: int, seed: int = 0) -> pd.DataFrame:
+    """1년치 이력 (테스트일 순으로 쌓인 시트)"""
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.integers(0, rows * 20, rows))
+    qty = rng.integers(10, 500, rows)
+    return normalize_frame(pd.DataFrame({
+        "partno": rng.choice(["P1", "P2", "P3"], rows),
+        "codes": [f"C{c:03d}" for c in rng.integers(0, 50, rows)],
+        "lotno": [f"L{c}" for c in rng.integers(0, 1000, rows)],
+        "Testdate": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 365, rows)), unit="D"),
+        "serialst": starts, "serialsp": starts + qty,
+        "testedqty": qty, "goodqty": (qty * 0.95).astype(int),
+    }))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_store.DATASET_STORE_DIR = tmp
+        dataset_store.save_dataset("bench", make_history(args.rows))
+
+        print(f"{'filter':<20} {'rows':>9} {'load+mask(s)':>13} {'pushdown(s)':>12}")
+        for name, filters in FILTERS.items():
+            where = compile_filters(filters)
+            t_mask, expected = timed(lambda: apply_filters(dataset_store.load_dataset("bench"), where))
+            t_push, df = timed(dataset_store.load_dataset, "bench", None, where)
+            assert len(df) == len(expected)
+            print(f"{name:<20} {len(df):>9} {t_mask:>13.3f} {t_push:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
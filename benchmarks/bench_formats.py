@@ -0,0 +1,55 @@
+"""
+엑셀 서식 벤치마크: 값 있는 셀 노란색을 조건부 서식 (conditional) vs 셀 서식 (cells) 으로 쓸 때의 작성 시간 / 파일 크기
+(plain = 서식 없이 값만, 비교 기준)
+
+    python -m benchmarks.bench_formats --rows 10000 100000 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import xlsxwriter
+
+from app.core.export import prepare_export_frame, sort_export_frame
+from app.core.overlap import detect_duplicates
+from app.models.schema import normalize_frame
+from app.utils import exporter
+from benchmarks.synthetic import lot_sheet
+
+MODES = ["plain", "conditional", "cells"]
+
+
+def write(path: str, mode: str, df_sorted, df_duplicates):
+    if mode == "plain":
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        header_format = workbook.add_format(exporter.HEADER_FORMAT)
+        exporter._write_sheet(workbook.add_worksheet("SortedData"), header_format, df_sorted, exporter.EXPORT_CHUNK_ROWS)
+        exporter._write_sheet(workbook.add_worksheet("Duplicates"), header_format, df_duplicates, exporter.EXPORT_CHUNK_ROWS)
+        workbook.close()
+        return
+    exporter.XLSX_FORMAT_MODE = mode
+    exporter.write_xlsx(path, df_sorted, df_duplicates)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--overlap", type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>12} {'seconds':>8} {'size(MB)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            df_sorted = sort_export_frame(prepare_export_frame(normalize_frame(lot_sheet(rows, overlap_rate=args.overlap)), {}))
+            df_duplicates = detect_duplicates(df_sorted)
+            for mode in MODES:
+                path = os.path.join(tmp, f"{mode}_{rows}.xlsx")
+                start = time.perf_counter()
+                write(path, mode, df_sorted, df_duplicates)
+                seconds = time.perf_counter() - start
+                print(f"{rows:>9} {mode:>12} {seconds:>8.2f} {os.path.getsize(path) / (1024 * 1024):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+/group 시리얼 로그 생성 벤치마크 (기존 코드별 iterrows 루프 vs 한 번 정렬 + 컬럼 단위 포맷)
+
+    python -m benchmarks.bench_group --rows 10000 100000 500000 --codes 200
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from app.api.grouped import REQUIRED_COLUMNS, group_serial_logs
+from app.models.schema import normalize_frame
+from app.utils.serializer import dumps
+from benchmarks.synthetic import lot_sheet
+
+
+def legacy_group_serial_logs(df: pd.DataFrame) -> list[dict]:
+    df = df[df["serialst"].notnull() & df["serialsp"].notnull()]
+    grouped_result = []
+    for code, group in df.groupby("codes"):
+        logs = []
+        for _, row in group.sort_values("shipdate").iterrows():
+            logs.append({
+                "test_date": row["Testdate"].strftime("%Y-%m-%d") if pd.notnull(row["Testdate"]) else None,
+                "ship_date": row["shipdate"].strftime("%Y-%m-%d") if pd.notnull(row["shipdate"]) else None,
+                "serial_start": str(row["serialst"]).strip(),
+                "serial_end": str(row["serialsp"]).strip(),
+            })
+        grouped_result.append({"product_code": code, "serial_logs": logs})
+    return grouped_result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--codes", type=int, default=200)
+    parser.add_argument("--page", type=int, default=20, help="페이지 하나의 코드 수")
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="이 행 수까지만 기존 루프 측정")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'legacy(s)':>10} {'rows(s)':>8} {'columnar(s)':>12} {'page(s)':>8} {'rows(MB)':>9} {'columnar(MB)':>13}")
+    for rows in args.rows:
+        df = normalize_frame(lot_sheet(rows, codes=args.codes))[REQUIRED_COLUMNS]
+        legacy = "-"
+        if rows <= args.legacy_max:
+            # 기존 응답은 dict 를 만든 뒤 JSON 으로 직렬화
+            seconds, _ = timed(lambda: dumps(legacy_group_serial_logs(df)))
+            legacy = f"{seconds:.2f}"
+        t_rows, (_, items) = timed(group_serial_logs, df)
+        t_columnar, (_, columnar) = timed(group_serial_logs, df, 0, None, "columnar")
+        t_page, _ = timed(group_serial_logs, df, 0, args.page)
+        size = lambda parts: sum(map(len, parts)) / (1024 * 1024)
+        print(f"{rows:>9} {legacy:>10} {t_rows:>8.2f} {t_columnar:>12.2f} {t_page:>8.2f} "
+              f"{size(items):>9.1f} {size(columnar):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
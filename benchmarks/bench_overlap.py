@@ -0,0 +1,60 @@
+"""
+시리얼 구간 중복 검출 벤치마크 (기존 iloc 루프 vs 벡터화 엔진)
+
+    python -m benchmarks.bench_overlap --rows 1000 10000 100000 200000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.overlap import find_overlap_rows, find_overlap_pairs
+
+
+def make_ranges(rows: int, codes: int = 50, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, rows * 20, rows)
+    return pd.DataFrame({
+        "codes": [f"C{c:03d}" for c in rng.integers(0, codes, rows)],
+        "serialst": starts,
+        "serialsp": starts + rng.integers(1, 50, rows),
+    })
+
+
+def legacy_detect_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    duplicates = []
+    for code, group in df.groupby("codes"):
+        group = group.sort_values(by=["serialst"])
+        for i in range(len(group) - 1):
+            curr_end = group.iloc[i]["serialsp"]
+            next_start = group.iloc[i + 1]["serialst"]
+            if curr_end >= next_start:
+                duplicates.append(group.iloc[i])
+                duplicates.append(group.iloc[i + 1])
+    return pd.DataFrame(duplicates).drop_duplicates() if duplicates else pd.DataFrame(columns=df.columns)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 200_000])
+    parser.add_argument("--legacy-max", type=int, default=20_000, help="이 행 수까지만 기존 루프 측정")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy(s)':>10} {'rows(s)':>10} {'pairs(s)':>10} {'flagged':>8} {'pairs':>8}")
+    for rows in args.rows:
+        df = make_ranges(rows)
+        legacy = f"{timed(legacy_detect_duplicates, df)[0]:.3f}" if rows <= args.legacy_max else "-"
+        t_rows, flagged = timed(find_overlap_rows, df)
+        t_pairs, pairs = timed(find_overlap_pairs, df)
+        print(f"{rows:>10} {legacy:>10} {t_rows:>10.4f} {t_pairs:>10.4f} {len(flagged):>8} {len(pairs):>8}")
+
+
+if __name__ == "__main__":
+    main()
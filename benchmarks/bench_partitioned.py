@@ -0,0 +1,90 @@
+"""
+코드 샤드 병렬 처리 벤치마크 (작업 하나로 처리 vs 코드 샤드로 나눠 프로세스 풀 전체에서 처리)
+
+    python -m benchmarks.bench_partitioned --rows 1000000 3000000 --codes 500 --shards 1 4 8 16
+
+- analyze: 겹침 쌍 + 코드별 수율 통계 (/analyze/analyze_excel)
+- export:  필터 + 정렬 + 중복 행 검사 (/generate/generate_excel, 파일 쓰기 제외)
+- 작업 하나 = DataFrame pickle 왕복 (run_blocking 으로 워커에 넘기는 비용) + 처리
+- 샤드 쪽 시간 = 샤드 파일 쓰기 + 워커 처리 + 합치기 (작업 풀은 샤드 수만큼 미리 띄워 둠)
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.api.analyze import ANALYZE_COLUMNS, analyze_frame, analyze_shard, merge_analysis
+from app.api.generate import sort_shard
+from app.core.export import prepare_export_frame, sort_export_frame
+from app.core.overlap import detect_duplicates
+from app.core.partitioned import merge_runs, write_shards
+from app.models.schema import normalize_frame
+from benchmarks.synthetic import lot_sheet
+
+
+def single_export(df: pd.DataFrame):
+    df_sorted = sort_export_frame(prepare_export_frame(df, {}))
+    return df_sorted, detect_duplicates(df_sorted)
+
+
+def merge_export(parts: list[tuple], sizes: list[int]) -> np.ndarray:
+    offsets = np.cumsum([0] + sizes)
+    return merge_runs([(offset + part[0][0], *part[0][1:]) for offset, part in zip(offsets, parts)])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run_sharded(pool, df: pd.DataFrame, shards: int, kernel: str) -> tuple[float, float, float]:
+    """(샤드 쓰기, 워커 처리, 합치기) 초"""
+    with tempfile.TemporaryDirectory(prefix="sheetflow_bench_") as directory:
+        t_write, paths = timed(write_shards, df, directory, shards)
+        if kernel == "analyze":
+            t_work, parts = timed(lambda: list(pool.map(analyze_shard, paths, [{}] * len(paths))))
+            t_merge, _ = timed(merge_analysis, parts)
+        else:
+            t_work, parts = timed(lambda: list(pool.map(sort_shard, paths, [{}] * len(paths))))
+            sizes = [len(part[0][0]) for part in parts]
+            t_merge, _ = timed(merge_export, parts, sizes)
+    return t_write, t_work, t_merge
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--codes", type=int, default=500)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--kernel", choices=["analyze", "export", "both"], default="both")
+    args = parser.parse_args()
+    kernels = ["analyze", "export"] if args.kernel == "both" else [args.kernel]
+
+    print(f"cpu: {os.cpu_count()}")
+    print(f"{'kernel':>8} {'rows':>9} {'shards':>6} {'single(s)':>10} {'write(s)':>9} {'workers(s)':>11} "
+          f"{'merge(s)':>9} {'total(s)':>9} {'speedup':>8}")
+    for rows in args.rows:
+        df = normalize_frame(lot_sheet(rows, codes=args.codes))
+        for kernel in kernels:
+            frame = df[ANALYZE_COLUMNS] if kernel == "analyze" else df
+            single = analyze_frame if kernel == "analyze" else single_export
+            t_pickle, _ = timed(lambda: pickle.loads(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)))
+            t_single, _ = timed(single, frame, *([{}] if kernel == "analyze" else []))
+            t_single += t_pickle
+            for shards in args.shards:
+                with ProcessPoolExecutor(max_workers=shards) as pool:
+                    list(pool.map(abs, range(shards)))  # 워커 시작 시간 제외
+                    t_write, t_work, t_merge = run_sharded(pool, frame, shards, kernel)
+                total = t_write + t_work + t_merge
+                print(f"{kernel:>8} {rows:>9} {shards:>6} {t_single:>10.2f} {t_write:>9.2f} {t_work:>11.2f} "
+                      f"{t_merge:>9.2f} {total:>9.2f} {t_single / total:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
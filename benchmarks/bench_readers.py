@@ -0,0 +1,73 @@
+"""
+시트 읽기 엔진 벤치마크: 로트 시트 (스키마 컬럼 + 사용하지 않는 컬럼) 를 엔진별로 읽어 정규화까지의 시간 비교
+
+    python -m benchmarks.bench_readers --rows 10000 50000 --extra 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.readers import available_csv_engines, available_excel_engines, read_csv, read_excel
+from app.models.schema import ALLOWED_COLUMNS, normalize_frame
+
+
+def make_lot_sheet(rows: int, extra: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, rows * 20, rows)
+    qty = rng.integers(10, 500, rows)
+    df = pd.DataFrame({
+        "package": "PKG", "partno": rng.choice(["P1", "P2", "P3"], rows),
+        "codes": [f"C{c:03d}" for c in rng.integers(0, 50, rows)],
+        "lotno": [f"L{c}" for c in rng.integers(0, 1000, rows)], "dcode": "D1",
+        "Testdate": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "shipdate": pd.Timestamp("2024-02-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "boxno": rng.integers(1, 200, rows), "serialst": starts, "serialsp": starts + qty,
+        "inqty": qty, "currqty": qty, "testedqty": qty, "goodqty": (qty * 0.95).astype(int),
+        "yld": 0.95,
+    })
+    # 공정 메모 / 설비 값 등 분석에 쓰지 않는 컬럼
+    for i in range(extra):
+        df[f"memo_{i}"] = rng.integers(0, 1000, rows)
+    return df
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--extra", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>8} {'format':>6} {'engine':<24} {'seconds':>8}")
+        for rows in args.rows:
+            df = make_lot_sheet(rows, args.extra)
+            xlsx = os.path.join(tmp, f"lot_{rows}.xlsx")
+            csv = os.path.join(tmp, f"lot_{rows}.csv")
+            df.to_excel(xlsx, index=False)
+            df.to_csv(csv, index=False)
+
+            cases = [("pd.read_excel (all cols)", lambda: normalize_frame(pd.read_excel(xlsx)))]
+            cases += [(engine, lambda e=engine: normalize_frame(read_excel(xlsx, None, ALLOWED_COLUMNS, e)))
+                      for engine in available_excel_engines()]
+            for name, fn in cases:
+                print(f"{rows:>8} {'xlsx':>6} {name:<24} {timed(fn):>8.3f}")
+
+            cases = [("pd.read_csv (all cols)", lambda: normalize_frame(pd.read_csv(csv)))]
+            cases += [(engine, lambda e=engine: normalize_frame(read_csv(csv, ALLOWED_COLUMNS, e)))
+                      for engine in available_csv_engines()]
+            for name, fn in cases:
+                print(f"{rows:>8} {'csv':>6} {name:<24} {timed(fn):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+스키마 정규화 벤치마크: 라우터별 정규화(형식 추론 to_datetime, object 컬럼) vs 공용 스키마 정규화
+
+    python -m benchmarks.bench_schema --rows 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.models.schema import COLUMN_MAPPING, normalize_frame
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """CSV / 텍스트 셀처럼 날짜가 문자열인 원본 시트"""
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, rows * 20, rows)
+    qty = rng.integers(10, 500, rows)
+    testdate = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    return pd.DataFrame({
+        "Package": "PKG", "PartNo": rng.choice(["P1", "P2", "P3"], rows).astype(object),
+        "Codes": np.array([f"C{c:03d}" for c in rng.integers(0, 50, rows)], dtype=object),
+        "LotNo": np.array([f"L{c}" for c in rng.integers(0, 1000, rows)], dtype=object), "dcode": "D1",
+        "testdate": testdate.strftime("%Y-%m-%d").astype(object),
+        "shipdate": (testdate + pd.Timedelta(days=30)).strftime("%Y-%m-%d").astype(object),
+        "boxno": rng.integers(1, 200, rows), "serialst": starts.astype(float), "serialsp": (starts + qty).astype(float),
+        "inqty": qty, "currqty": qty, "testedqty": qty, "goodqty": (qty * 0.95).astype(int), "yld": 0.95,
+    })
+
+
+def legacy_normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """기존 라우터 방식: 소문자 변환 + rename + 형식 추론 날짜 파싱 + 숫자 변환"""
+    df = df.copy()
+    df.columns = [col.strip().lower() for col in df.columns]
+    df = df.rename(columns={col: COLUMN_MAPPING.get(col, col) for col in df.columns})
+    for col in ["Testdate", "shipdate"]:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in ["serialst", "serialsp", "inqty", "currqty", "testedqty", "goodqty", "yld"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def timed(fn, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'legacy(s)':>10} {'schema(s)':>10} {'legacy(MB)':>11} {'schema(MB)':>11}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        t_legacy, legacy = timed(legacy_normalize, df)
+        t_schema, schema = timed(normalize_frame, df)
+        mb_legacy = legacy.memory_usage(deep=True).sum() / 1e6
+        mb_schema = schema.memory_usage(deep=True).sum() / 1e6
+        print(f"{rows:>9} {t_legacy:>10.3f} {t_schema:>10.3f} {mb_legacy:>11.1f} {mb_schema:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+백엔드 콜드 스타트 벤치마크 (프로세스 실행 -> 첫 / 응답, 예열 완료까지) + import 시간 상위 모듈
+
+    python -m benchmarks.bench_startup --runs 5 --importtime 15
+    python -m benchmarks.bench_startup --exe dist/sheetflow_backend.exe --runs 5
+
+- 실행할 때마다 빈 임시 폴더에서 run_app.py (또는 --exe 실행 파일) 를 빈 포트로 띄우고 / 를 폴링한다
+  (시간은 프로세스 밖에서 재므로 실행 파일 압축 해제 + 인터프리터 시작까지 포함)
+- 예열 (라우터 import + 폴더 감시) 이 끝나면 GET /startup 의 단계별 시간을 함께 출력
+- --importtime N: python -X importtime 으로 app.main import 시 누적 시간 상위 N 개 모듈
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_SECONDS = 1.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+
+def cold_start(command: list[str], timeout: float) -> dict:
+    """프로세스 하나를 띄워 첫 / 응답 + 예열 완료까지 측정"""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="sheetflow_startup_") as workdir:
+        env = {**os.environ, "SHEETFLOW_PORT": str(port), "PYTHONPATH": ROOT}
+        env.pop("SHEETFLOW_STARTED_AT", None)
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            first = ready = None
+            report = {}
+            while time.perf_counter() - start < timeout:
+                if first is None:
+                    if _get(base + "/") is not None:
+                        first = time.perf_counter() - start
+                else:
+                    report = _get(base + "/startup") or {}
+                    if report.get("ready_seconds") is not None:
+                        ready = time.perf_counter() - start
+                        break
+                time.sleep(0.01)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return {"first_response": first, "ready": ready, "report": report}
+
+
+def import_times(top: int) -> list[tuple[str, float]]:
+    """python -X importtime -c "import app.main" -> (모듈, 누적 초) 상위 top 개"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        rows.append((name, int(cumulative) / 1e6))
+    return sorted(rows, key=lambda row: -row[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="PyInstaller 실행 파일 (없으면 현재 파이썬으로 run_app.py)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(ROOT, "run_app.py")]
+    print(f"{'run':>4} {'first /(s)':>11} {'ready(s)':>9}")
+    results = []
+    for run in range(args.runs):
+        result = cold_start(command, args.timeout)
+        results.append(result)
+        fmt = lambda value: f"{value:.2f}" if value is not None else "-"
+        print(f"{run + 1:>4} {fmt(result['first_response']):>11} {fmt(result['ready']):>9}")
+
+    firsts = [r["first_response"] for r in results if r["first_response"] is not None]
+    if firsts:
+        median = statistics.median(firsts)
+        verdict = "OK" if median < TARGET_SECONDS else "목표 초과"
+        print(f"첫 / 응답 중앙값 {median:.2f}초 (목표 {TARGET_SECONDS:.1f}초 미만: {verdict})")
+
+    phases = results[-1]["report"].get("phases", []) if results else []
+    if phases:
+        print(f"\n{'phase':<22} {'start(s)':>9} {'seconds':>8}")
+        for phase in phases:
+            print(f"{phase['name']:<22} {phase['started_at']:>9.3f} {phase['seconds']:>8.3f}")
+
+    if args.importtime:
+        print(f"\n{'module (import app.main)':<50} {'cumulative(s)':>13}")
+        for name, seconds in import_times(args.importtime):
+            print(f"{name:<50} {seconds:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+벤치마크용 합성 로트 시트 생성기 (ALLOWED_COLUMNS 스키마)
+
+    python -m benchmarks.synthetic --rows 100000 --codes 200 --overlap 0.02 --nan 0.01 -o lots.xlsx
+
+- 코드별 시리얼 구간은 이어지게 발급하고, overlap 비율만큼의 행은 앞 구간과 겹치게 당김
+- 코드 빈도는 실제 라인처럼 치우침 (Zipf 형태)
+- nan 비율만큼 키(codes / serialst / serialsp) 외 셀을 비움
+- 행 수가 많으면 청크 단위로 만들어 CSV 로 이어 씀 (xlsx 는 시트 최대 행 수 1,048,575 까지)
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.models.schema import ALLOWED_COLUMNS
+
+XLSX_MAX_ROWS = 1_048_575  # 헤더 제외
+KEY_COLUMNS = ["codes", "serialst", "serialsp"]
+PACKAGES = ["BGA", "QFN", "QFP", "SOP", "TSSOP"]
+ISSUES = ["재검사", "외관 불량", "라벨 재부착", "고객 요청 보류"]
+
+
+def lot_chunks(rows: int, codes: int = 50, overlap_rate: float = 0.02, nan_rate: float = 0.01,
+               seed: int = 0, chunk_rows: int = 500_000):
+    """rows 행을 chunk_rows 행씩 DataFrame 으로 생성 (청크 사이에도 코드별 시리얼이 이어짐)"""
+    rng = np.random.default_rng(seed)
+    code_names = np.array([f"C{i:04d}" for i in range(codes)], dtype=object)
+    weights = 1.0 / np.arange(1, codes + 1) ** 0.8
+    weights /= weights.sum()
+    next_serial = rng.integers(1, 1_000, codes) * 1_000_000  # 코드별 다음 발급 시리얼
+    start_date = pd.Timestamp("2024-01-01")
+
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        code = rng.choice(codes, n, p=weights)
+        qty = rng.integers(10, 500, n)
+
+        # 코드별로 발급 순서대로 구간 배정 (청크 안에서 같은 코드끼리 누적합)
+        order = np.argsort(code, kind="stable")
+        sorted_code, sorted_qty = code[order], qty[order]
+        group_start = np.r_[0, np.flatnonzero(sorted_code[1:] != sorted_code[:-1]) + 1]
+        cumulative = np.cumsum(sorted_qty)
+        offset = cumulative - np.repeat(cumulative[group_start] - sorted_qty[group_start], np.diff(np.r_[group_start, n]))
+        serialst = np.empty(n, dtype=np.int64)
+        serialst[order] = next_serial[sorted_code] + offset - sorted_qty
+        np.add.at(next_serial, code, qty)
+
+        # 겹침: 일부 행을 앞 구간 안쪽으로 당김
+        overlapped = rng.random(n) < overlap_rate
+        serialst[overlapped] -= rng.integers(1, 200, overlapped.sum())
+        serialsp = serialst + qty - 1
+
+        tested = qty
+        good = (tested * rng.uniform(0.85, 1.0, n)).astype(np.int64)
+        testdate = start_date + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+        df = pd.DataFrame({
+            "package": np.array(PACKAGES, dtype=object)[code % len(PACKAGES)],
+            "partno": pd.Categorical.from_codes(code % 20, [f"P{i:02d}" for i in range(20)]).astype(object),
+            "codes": code_names[code],
+            "lotno": [f"L{c:04d}-{l:03d}" for c, l in zip(code, rng.integers(0, 500, n))],
+            "dcode": testdate.strftime("%y%W"),
+            "Testdate": testdate,
+            "shipdate": testdate + pd.to_timedelta(rng.integers(1, 15, n), unit="D"),
+            "boxno": rng.integers(1, 2_000, n).astype(str),
+            "serialst": serialst,
+            "serialsp": serialsp,
+            "inqty": qty + rng.integers(0, 5, n),
+            "currqty": good,
+            "testedqty": tested,
+            "goodqty": good,
+            "yld": np.round(good / tested, 4),
+            "이슈사항": np.where(rng.random(n) < 0.02, np.array(ISSUES, dtype=object)[rng.integers(0, len(ISSUES), n)], None),
+        }, columns=ALLOWED_COLUMNS)
+
+        if nan_rate > 0:
+            for col in df.columns.difference(KEY_COLUMNS):
+                mask = rng.random(n) < nan_rate
+                if mask.any():
+                    df[col] = df[col].astype(object).where(~mask, None) if df[col].dtype == object else df[col].where(~mask)
+        yield df
+
+
+def lot_sheet(rows: int, **options) -> pd.DataFrame:
+    return pd.concat(lot_chunks(rows, **options), ignore_index=True)
+
+
+def write_lot_file(path: str, rows: int, **options) -> str:
+    """합성 시트를 파일로 저장 (.xlsx 또는 .csv, 확장자로 결정) 후 경로 반환"""
+    if path.lower().endswith(".csv"):
+        for i, chunk in enumerate(lot_chunks(rows, **options)):
+            chunk.to_csv(path, mode="a" if i else "w", header=not i, index=False, date_format="%Y-%m-%d")
+        return path
+    if rows > XLSX_MAX_ROWS:
+        raise ValueError(f"xlsx 시트는 최대 {XLSX_MAX_ROWS:,}행 (CSV 로 저장하세요)")
+    with pd.ExcelWriter(path, engine="xlsxwriter", datetime_format="yyyy-mm-dd") as writer:
+        lot_sheet(rows, **options).to_excel(writer, sheet_name="Sheet1", index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--codes", type=int, default=50, help="코드 종류 수")
+    parser.add_argument("--overlap", type=float, default=0.02, help="앞 구간과 겹치는 행 비율")
+    parser.add_argument("--nan", type=float, default=0.01, help="빈 셀 비율 (키 컬럼 제외)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="lots.xlsx")
+    args = parser.parse_args()
+
+    write_lot_file(args.output, args.rows, codes=args.codes, overlap_rate=args.overlap, nan_rate=args.nan, seed=args.seed)
+    print(f"{args.output}: {args.rows:,}행, {os.path.getsize(args.output) / (1024 * 1024):.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
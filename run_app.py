@@ -1,9 +1,12 @@
-import uvicorn
-import webbrowser
-import threading
+import os
 import time
+
+# 🔹 시작 시간 보고 기준 시각 (app.core.startup, 다른 import 보다 먼저)
+os.environ.setdefault("SHEETFLOW_STARTED_AT", str(time.time()))
+
+import multiprocessing
+import uvicorn
 import sys
-import os
 
 # 🔹 PyInstaller 빌드 시 FastAPI 하위 모듈 누락 방지
 import fastapi.middleware.cors
@@ -14,6 +17,9 @@ def open_browser():
     pass
 
 if __name__ == "__main__":
+    # 🔹 PyInstaller 빌드에서 작업 프로세스 풀이 동작하도록
+    multiprocessing.freeze_support()
+
     if getattr(sys, 'frozen', False):
         base_dir = os.path.dirname(sys.executable)
     else:
@@ -23,7 +29,7 @@ if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="127.0.0.1",
-        port=8000,
+        port=int(os.environ.get("SHEETFLOW_PORT", "8000")),
         reload=False,
         log_config=None
     )
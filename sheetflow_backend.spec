@@ -1,16 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
 
 a = Analysis(
     ['run_app.py'],
     pathex=[],
     binaries=[],
-    datas=[('app', 'app')],
-    hiddenimports=['fastapi', 'fastapi.middleware', 'fastapi.middleware.cors', 'fastapi.responses', 'starlette.middleware', 'uvicorn', 'pandas', 'openpyxl', 'xlsxwriter', 'python-multipart'],
+    datas=[],
+    hiddenimports=['fastapi', 'fastapi.middleware', 'fastapi.middleware.cors', 'fastapi.responses', 'starlette.middleware', 'uvicorn', 'pandas', 'openpyxl', 'xlsxwriter', 'python-multipart'] + collect_submodules('app'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython', 'notebook', 'pytest', 'scipy'],
     noarchive=False,
     optimize=0,
 )
@@ -0,0 +1,24 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# app.core.config 는 import 시 환경변수를 읽으므로, app 을 import 하기 전에 저장소 / DB / 폴더를 임시 폴더로
+_WORKDIR = tempfile.mkdtemp(prefix="sheetflow_tests_")
+os.environ.update({
+    "SHEETFLOW_EXECUTOR": "thread",
+    "SHEETFLOW_UPLOAD_DIR": os.path.join(_WORKDIR, "uploaded_files"),
+    "SHEETFLOW_DATASET_STORE_DIR": os.path.join(_WORKDIR, "dataset_store"),
+    "SHEETFLOW_RESULT_DB": os.path.join(_WORKDIR, "results.db"),
+    "SHEETFLOW_SERIAL_INDEX_DB": os.path.join(_WORKDIR, "serials.db"),
+    "SHEETFLOW_JOB_DB": os.path.join(_WORKDIR, "jobs.db"),
+    "SHEETFLOW_JOB_RESULT_DIR": os.path.join(_WORKDIR, "job_results"),
+    "SHEETFLOW_WATCH_OUTPUT_DIR": os.path.join(_WORKDIR, "auto_generated"),
+    "SHEETFLOW_EXPORT_CACHE_DIR": os.path.join(_WORKDIR, "export_cache"),
+    "SHEETFLOW_SPILL_DIR": _WORKDIR,
+    "SHEETFLOW_PARTITION_SHARDS": "4",  # 샤드 경로는 테스트에서 PARTITION_MIN_ROWS 로 켬
+})
+tempfile.tempdir = _WORKDIR  # 내보내기 / spill 임시 파일도 같은 폴더에 (끝나면 함께 삭제)
+atexit.register(shutil.rmtree, _WORKDIR, True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
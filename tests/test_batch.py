@@ -0,0 +1,47 @@
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import batch
+from app.core.batch import extract_zip
+
+
+def make_zip(path, members: dict, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(path, "w", compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def test_extracts_accepted_members(tmp_path):
+    source = make_zip(tmp_path / "in.zip", {"a.csv": b"codes\nA\n", "dir/b.xlsx": b"x", "notes.txt": b"skip"})
+    out = tmp_path / "out"
+    out.mkdir()
+    files, extracted = extract_zip(source, str(out), start=3)
+    assert [name for name, _ in files] == ["a.csv", "b.xlsx"]
+    assert [path.rsplit("/", 1)[1] for _, path in files] == ["3_a.csv", "4_b.xlsx"]
+    assert extracted == len(b"codes\nA\n") + 1
+
+
+def test_total_extracted_size_is_capped(tmp_path):
+    """항목 하나하나는 한도 안이어도 풀린 크기 합계가 max_bytes 를 넘으면 413"""
+    data = b"codes,serialst\n" + b"A,1\n" * 2_000
+    source = make_zip(tmp_path / "in.zip", {f"{i}.csv": data for i in range(5)}, zipfile.ZIP_STORED)
+    out = tmp_path / "out"
+    out.mkdir()
+    with pytest.raises(HTTPException) as error:
+        extract_zip(source, str(out), max_bytes=3 * len(data))
+    assert error.value.status_code == 413
+    extract_zip(source, str(out), max_bytes=5 * len(data))
+
+
+def test_compression_ratio_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_ZIP_MAX_RATIO", 50)
+    source = make_zip(tmp_path / "bomb.zip", {"bomb.csv": b"0" * 5_000_000})
+    out = tmp_path / "out"
+    out.mkdir()
+    with pytest.raises(HTTPException) as error:
+        extract_zip(source, str(out))
+    assert error.value.status_code == 413
+    assert sum(f.stat().st_size for f in out.iterdir()) <= 50 * zipfile.ZipFile(source).infolist()[0].compress_size
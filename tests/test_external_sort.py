@@ -0,0 +1,95 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api import generate
+from app.api.generate import build_external_export
+from app.core.export import build_export
+from app.core import external_sort
+from app.core.datasets import parse_file
+
+
+CODES = {
+    "text": ["C1", "C2", "C3", "C4", "C5"],
+    "numeric": [7, 25, 101, 1000, 30],  # 문자열 순서와 숫자 순서가 다름
+}
+
+
+def lot_sheet(rows: int = 2_000, seed: int = 0, codes: str = "text") -> pd.DataFrame:
+    """숫자 모양 문자열 text 컬럼 (0 으로 시작하는 값 포함, 문자 값은 다섯 번째 코드에만 -> 파티션에 따라 숫자만 있음),
+    빈 값은 뒤쪽 청크에만 있는 시트"""
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 20_000, rows).astype(float)
+    values = CODES[codes]
+    codes = pd.Series(rng.choice(len(values) + 1, rows)).map(dict(enumerate(values))).astype(object)
+    letters = (codes == values[-1]).to_numpy()
+    df = pd.DataFrame({
+        "package": "PKG",
+        "partno": rng.choice(["P1", "P2"], rows),
+        "codes": codes,
+        "lotno": [f"L{i}" for i in rng.integers(0, 30, rows)],
+        "dcode": np.where(letters, "D-1", rng.choice(["2419", "2420"], rows)).astype(object),
+        "Testdate": rng.choice(["2024-01-05", "2024-01-06"], rows),
+        "boxno": np.where(letters, "A3", rng.choice(["007", "012"], rows)),
+        "serialst": start,
+        "serialsp": start + rng.integers(0, 40, rows),
+        "testedqty": rng.integers(0, 100, rows).astype(float),
+        "goodqty": rng.integers(0, 90, rows),
+        "yld": 0.9,
+        "이슈사항": rng.choice(["", "확인", None], rows),
+    })
+    late = np.flatnonzero(rng.random(rows) < 0.05)
+    late = late[late > rows // 2]
+    df.loc[late, "dcode"] = None
+    df.loc[late, "testedqty"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def sources(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("external_sort")
+    paths = {}
+    for codes in CODES:
+        df = lot_sheet(codes=codes)
+        paths[codes, "csv"] = str(directory / f"lots_{codes}.csv")
+        paths[codes, "xlsx"] = str(directory / f"lots_{codes}.xlsx")
+        df.to_csv(paths[codes, "csv"], index=False)
+        df.to_excel(paths[codes, "xlsx"], index=False)
+    return paths
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """외부 정렬이 작은 입력에서도 청크 여러 개 / 파티션 여러 개로 돌도록"""
+    monkeypatch.setattr(generate, "partition_count", lambda memory: 3)
+    monkeypatch.setattr(generate, "iter_source_chunks", partial(external_sort.iter_source_chunks, chunk_rows=300))
+
+
+@pytest.mark.parametrize("codes", list(CODES))
+@pytest.mark.parametrize("source", ["csv", "xlsx"])
+def test_external_csv_matches_in_memory(sources, small_chunks, source, codes):
+    source = sources[codes, source]
+    expected, *_ = build_export(parse_file(source), {}, "csv")
+    actual, *_ = build_external_export(source, None, {}, "csv")
+    with open(expected, encoding="utf-8-sig") as f:
+        expected_lines = f.read().splitlines()
+    with open(actual, encoding="utf-8-sig") as f:
+        actual_lines = f.read().splitlines()
+    assert actual_lines == expected_lines
+    assert any(",007," in line for line in actual_lines)  # 문자로 읽힌 text 컬럼은 앞의 0 유지
+
+
+@pytest.mark.parametrize("codes", list(CODES))
+@pytest.mark.parametrize("source", ["csv", "xlsx"])
+def test_external_xlsx_matches_in_memory(sources, small_chunks, source, codes):
+    source = sources[codes, source]
+    filters = {"Testdate": "2024-01-05"}
+    expected, *_ = build_export(parse_file(source), filters, "xlsx")
+    actual, *_ = build_external_export(source, None, filters, "xlsx")
+    expected_sheets = pd.read_excel(expected, sheet_name=None, dtype=object)
+    actual_sheets = pd.read_excel(actual, sheet_name=None, dtype=object)
+    assert list(actual_sheets) == list(expected_sheets)
+    for name, sheet in expected_sheets.items():
+        pd.testing.assert_frame_equal(actual_sheets[name], sheet)
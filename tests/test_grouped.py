@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api.grouped import REQUIRED_COLUMNS, group_page, iter_group_items
+from app.models.schema import normalize_frame
+
+
+def lot_frame(rows: int = 600, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 10_000, rows).astype(float)
+    df = pd.DataFrame({
+        "codes": rng.choice([f"C{i:02d}" for i in range(30)] + [None], rows),
+        "Testdate": rng.choice(["2024-01-05", "2024-02-10", None], rows),
+        "shipdate": rng.choice(["2024-03-01", "2024-03-02", "2024-03-03", None], rows),
+        "serialst": start,
+        "serialsp": start + rng.integers(0, 50, rows),
+    })
+    df.loc[rng.random(rows) < 0.05, "serialsp"] = np.nan
+    return normalize_frame(df)[REQUIRED_COLUMNS]
+
+
+def reference(df: pd.DataFrame) -> list[dict]:
+    """코드별로 따로 출하일 순 정렬해서 만든 시리얼 로그"""
+    df = df[df["serialst"].notnull() & df["serialsp"].notnull() & df["codes"].notnull()]
+    date = lambda value: value.strftime("%Y-%m-%d") if pd.notnull(value) else None
+    items = []
+    for code in sorted(df["codes"].astype(object).unique()):
+        group = df[df["codes"] == code].sort_values("shipdate", kind="stable", na_position="last")
+        items.append({"product_code": code, "serial_logs": [
+            {"test_date": date(t), "ship_date": date(s), "serial_start": str(a).strip(), "serial_end": str(b).strip()}
+            for t, s, a, b in zip(group["Testdate"], group["shipdate"], group["serialst"], group["serialsp"])
+        ]})
+    return items
+
+
+@pytest.mark.parametrize("batch_rows", [1, 7, 10_000])
+def test_batched_items_match_reference(batch_rows):
+    df = lot_frame()
+    total, page, bounds = group_page(df)
+    items = [json.loads(item) for item in iter_group_items(page, bounds, "rows", batch_rows)]
+    assert total == 30
+    assert items == reference(df)
+
+
+def test_page_and_columnar_shape():
+    df = lot_frame()
+    total, page, bounds = group_page(df, code_offset=25, code_limit=10)
+    items = [json.loads(item) for item in iter_group_items(page, bounds, "columnar", batch_rows=5)]
+    expected = reference(df)[25:]
+    assert [item["product_code"] for item in items] == [item["product_code"] for item in expected]
+    assert items[0]["serial_start"] == [log["serial_start"] for log in expected[0]["serial_logs"]]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.overlap import detect_duplicates, find_overlap_pairs, find_overlap_rows
+
+
+def brute_force_pairs(df: pd.DataFrame) -> set:
+    """같은 코드 안에서 시리얼 구간이 겹치는 모든 (앞 행, 뒤 행) 위치 쌍"""
+    pairs = set()
+    rows = list(zip(df["codes"], pd.to_numeric(df["serialst"], errors="coerce"),
+                    pd.to_numeric(df["serialsp"], errors="coerce")))
+    for i, (code_i, start_i, end_i) in enumerate(rows):
+        for j, (code_j, start_j, end_j) in enumerate(rows):
+            if i >= j or pd.isna(code_i) or code_i != code_j:
+                continue
+            if any(pd.isna(v) for v in (start_i, end_i, start_j, end_j)):
+                continue
+            if start_i <= end_j and start_j <= end_i:
+                pairs.add((i, j))
+    return pairs
+
+
+def random_ranges(seed: int, rows: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 2_000, rows).astype(float)
+    df = pd.DataFrame({
+        "codes": rng.choice(["A", "B", "C", None], rows),
+        "serialst": start,
+        "serialsp": start + rng.integers(0, 60, rows),
+    })
+    df.loc[rng.random(rows) < 0.05, "serialsp"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pairs_match_brute_force(seed):
+    df = random_ranges(seed)
+    pairs = find_overlap_pairs(df)
+    found = {tuple(sorted(pair)) for pair in zip(pairs["left"], pairs["right"])}
+    assert found == brute_force_pairs(df)
+    assert len(found) == len(pairs)  # 같은 쌍이 두 번 나오지 않음
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rows_match_brute_force(seed):
+    df = random_ranges(seed)
+    expected = {row for pair in brute_force_pairs(df) for row in pair}
+    assert set(find_overlap_rows(df).tolist()) == expected
+
+
+def test_overlap_range_values():
+    df = pd.DataFrame({"codes": ["A", "A", "B"], "serialst": [1, 5, 1], "serialsp": [10, 20, 10]})
+    pairs = find_overlap_pairs(df)
+    assert pairs[["left", "right", "overlap_start", "overlap_end"]].values.tolist() == [[0, 1, 5, 10]]
+
+
+def test_detect_duplicates_sorted_by_code_and_start():
+    df = pd.DataFrame({"codes": ["B", "A", "A", "B"], "serialst": [50, 30, 10, 40], "serialsp": [60, 40, 35, 55]})
+    assert detect_duplicates(df).index.tolist() == [2, 1, 3, 0]
+
+
+def test_empty_and_missing_columns():
+    assert find_overlap_pairs(pd.DataFrame()).empty
+    assert len(find_overlap_rows(pd.DataFrame({"codes": ["A"]}))) == 0
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api.analyze import ANALYZE_COLUMNS, analyze_dataframe
+from app.api.generate import export_dataframe
+from app.core import partitioned
+from app.models.schema import normalize_frame
+
+
+def lot_frame(rows: int = 3_000, seed: int = 0) -> pd.DataFrame:
+    """코드 빈도가 치우치고, 코드 / 시리얼 / 수량 빈 값과 겹치는 구간이 섞인 정규화된 시트"""
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"C{i:02d}" for i in range(12)] + [None], dtype=object)
+    weights = np.r_[1.0 / np.arange(1, 13), 0.05]
+    start = rng.integers(0, 30_000, rows).astype(float)
+    df = pd.DataFrame({
+        "package": "PKG",
+        "partno": rng.choice(["P1", "P2", "P3"], rows),
+        "codes": rng.choice(codes, rows, p=weights / weights.sum()),
+        "lotno": [f"L{i}" for i in rng.integers(0, 40, rows)],
+        "Testdate": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, rows), unit="D")).strftime("%Y-%m-%d"),
+        "boxno": rng.integers(1, 20, rows).astype(str),
+        "serialst": start,
+        "serialsp": start + rng.integers(0, 80, rows),
+        "testedqty": rng.integers(0, 500, rows).astype(float),
+        "goodqty": rng.integers(0, 450, rows).astype(float),
+        "yld": 0.9,
+    })
+    df.loc[rng.random(rows) < 0.03, "serialsp"] = np.nan
+    df.loc[rng.random(rows) < 0.03, "testedqty"] = np.nan
+    return normalize_frame(df)
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    """True 면 행 수와 관계없이 코드 샤드 경로 (SHEETFLOW_PARTITION_SHARDS=4, conftest)"""
+    def use(enabled: bool):
+        monkeypatch.setattr(partitioned, "PARTITION_MIN_ROWS", 1 if enabled else 0)
+    return use
+
+
+def run_both(sharded, coroutine_fn, *args):
+    sharded(False)
+    single = asyncio.run(coroutine_fn(*args))
+    sharded(True)
+    return single, asyncio.run(coroutine_fn(*args))
+
+
+@pytest.mark.parametrize("filters, group_by, bucket, top", [
+    ({}, ["codes"], None, 1),
+    ({"Testdate__gte": "2024-01-20"}, ["codes", "lotno"], "week", 3),
+    ({"not": {"partno": "P2"}}, ["partno"], "month", 2),
+])
+def test_sharded_analysis_matches_single(sharded, filters, group_by, bucket, top):
+    df = lot_frame()[ANALYZE_COLUMNS]
+    single, by_shards = run_both(sharded, analyze_dataframe, df, filters, group_by, bucket, top)
+    assert by_shards == single
+    assert single["overlaps"]
+
+
+def test_write_shards_keeps_codes_together(tmp_path):
+    df = lot_frame()
+    paths = partitioned.write_shards(df, str(tmp_path), 4)
+    shards = [partitioned.read_shard(path) for path in paths]
+    assert len(paths) == 4
+    assert sorted(pd.concat(shards).index.tolist()) == df.index.tolist()
+    seen = [set(shard["codes"].dropna()) for shard in shards]
+    assert all(not (a & b) for i, a in enumerate(seen) for b in seen[i + 1:])
+    assert sum(shard["codes"].isna().any() for shard in shards) == 1
+
+
+@pytest.mark.parametrize("filters", [{}, {"codes__in": ["C00", "C03", "C07"]}])
+def test_sharded_csv_export_matches_single(sharded, filters):
+    (single, *_), (by_shards, *_) = run_both(sharded, export_dataframe, lot_frame(), filters, "csv")
+    with open(single, "rb") as a, open(by_shards, "rb") as b:
+        assert b.read() == a.read()
+
+
+def test_sharded_xlsx_export_matches_single(sharded):
+    (single, *_), (by_shards, *_) = run_both(sharded, export_dataframe, lot_frame(), {}, "xlsx")
+    expected = pd.read_excel(single, sheet_name=None)
+    actual = pd.read_excel(by_shards, sheet_name=None)
+    assert list(actual) == list(expected)
+    for name, sheet in expected.items():
+        pd.testing.assert_frame_equal(actual[name], sheet)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.core.dataset_store import load_dataset, save_dataset
+from app.core.query import compile_filters, parse_filters
+from app.models.schema import normalize_frame
+
+DATASET_ID = "query_equivalence"
+
+# 연산마다 (필터 키, 값) - 값이 비어 있는 행이 섞인 컬럼에 대해 검사
+CONDITIONS = [
+    ("lotno", "L1"),
+    ("lotno__eq", "L2"),
+    ("lotno__ne", "L1"),
+    ("lotno__in", ["L1", "L3"]),
+    ("boxno__ne", "7"),
+    ("testedqty__gt", 50),
+    ("testedqty__gte", 50),
+    ("testedqty__lt", 50.5),
+    ("testedqty__lte", 50),
+    ("testedqty__between", [20, 80]),
+    ("Testdate__gte", "2024-01-10"),
+    ("Testdate__lt", "2024-01-20"),
+    ("Testdate__between", ["2024-01-05", "2024-01-25"]),
+    ("serialst__between", [100, 900]),
+    ("serial", 500),
+    ("serial__between", [300, 700]),
+]
+
+
+def lot_frame(rows: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 1_000, rows).astype(float)
+    df = pd.DataFrame({
+        "codes": rng.choice(["A", "B", "C"], rows),
+        "lotno": rng.choice(["L1", "L2", "L3", None], rows),
+        "boxno": rng.choice(["5", "7", None], rows),
+        "Testdate": pd.Series(pd.date_range("2024-01-01", periods=31).strftime("%Y-%m-%d")).sample(
+            rows, replace=True, random_state=seed).to_numpy(),
+        "serialst": start,
+        "serialsp": start + rng.integers(0, 100, rows),
+        "testedqty": rng.integers(0, 100, rows).astype(float),
+    })
+    for col in ["Testdate", "serialst", "serialsp", "testedqty"]:
+        df.loc[rng.random(rows) < 0.1, col] = None
+    return normalize_frame(df)
+
+
+@pytest.fixture(scope="module")
+def stored():
+    df = lot_frame().reset_index(drop=True)
+    save_dataset(DATASET_ID, df)
+    return df
+
+
+def assert_same_rows(df: pd.DataFrame, filters: dict):
+    where = compile_filters(filters)
+    by_mask = np.flatnonzero(where.mask(df)).tolist()
+    by_pushdown = sorted(load_dataset(DATASET_ID, where=where).index.tolist())
+    assert by_pushdown == by_mask
+
+
+@pytest.mark.parametrize("key, value", CONDITIONS, ids=[key for key, _ in CONDITIONS])
+def test_pushdown_matches_mask(stored, key, value):
+    assert_same_rows(stored, {key: value})
+
+
+@pytest.mark.parametrize("key, value", CONDITIONS, ids=[key for key, _ in CONDITIONS])
+def test_not_pushdown_matches_mask(stored, key, value):
+    assert_same_rows(stored, {"not": {key: value}})
+
+
+def test_not_includes_rows_with_missing_values(stored):
+    where = compile_filters({"not": {"lotno": "L1"}})
+    selected = stored[where.mask(stored)]
+    assert selected["lotno"].isna().any()
+    assert not (selected["lotno"] == "L1").any()
+
+
+@pytest.mark.parametrize("filters", [
+    {"not": {"lotno": "L1", "testedqty__gt": 50}},
+    {"not": {"or": [{"lotno": "L1"}, {"testedqty__lt": 20}]}},
+    {"not": {"not": {"boxno": "5"}}},
+    {"or": [{"not": {"lotno__ne": "L2"}}, {"serial": 250}]},
+    {"and": [{"not": {"Testdate__between": ["2024-01-05", "2024-01-15"]}}, {"codes": ["A", "B"]}]},
+])
+def test_nested_pushdown_matches_mask(stored, filters):
+    assert_same_rows(stored, filters)
+
+
+def test_parse_filters_reads_form_json():
+    assert parse_filters('{"codes": ["A"], "not": {"lotno": "L1"}}') == {"codes": ["A"], "not": {"lotno": "L1"}}
+    assert parse_filters("") == {}
+
+
+@pytest.mark.parametrize("text", ["{bad", "[1, 2]", '"codes"'])
+def test_parse_filters_rejects_invalid_json(text):
+    with pytest.raises(HTTPException) as error:
+        parse_filters(text)
+    assert error.value.status_code == 400
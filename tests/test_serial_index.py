@@ -0,0 +1,103 @@
+import sqlite3
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.serial_index import SerialIndex
+
+
+class CountingIndex(SerialIndex):
+    """SQLite 가상 머신 명령 수 (읽은 행 수에 비례) 를 세는 인덱스"""
+
+    steps = 0
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=10)) as conn, conn:
+            conn.set_progress_handler(self._count, 100)
+            yield conn
+
+    def _count(self):
+        self.steps += 1
+        return 0
+
+
+def lot_file(rows: int, first_serial: int, seed: int, codes=("A", "B")) -> pd.DataFrame:
+    """first_serial 부터 이어지는 시리얼 구간 (코드별로 번갈아)"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 50, rows)
+    starts = first_serial + np.r_[0, np.cumsum(lengths + 1)[:-1]]
+    return pd.DataFrame({
+        "codes": rng.choice(list(codes), rows),
+        "lotno": [f"L{seed}"] * rows,
+        "boxno": rng.integers(1, 20, rows),
+        "serialst": starts,
+        "serialsp": starts + lengths,
+    })
+
+
+FILE_ROWS = 2_000
+FILE_SPAN = FILE_ROWS * 100  # 이력 파일 하나의 시리얼 폭보다 넓게
+
+
+def history_index(path, positions) -> CountingIndex:
+    """positions 번째 자리마다 이력 파일 하나 (시리얼이 겹치지 않게)"""
+    index = CountingIndex(str(path), max_codes=0)  # 코드를 메모리에 두지 않음 -> 매번 SQLite 후보 조회
+    for i in positions:
+        index.add_dataset(f"old-{i}", lot_file(FILE_ROWS, i * FILE_SPAN, i))
+    return index
+
+
+def upload_steps(index: CountingIndex, df: pd.DataFrame) -> tuple[int, list]:
+    index.steps = 0
+    conflicts = index.add_dataset("new", df)
+    return index.steps, conflicts
+
+
+def test_upload_check_does_not_scan_history(tmp_path):
+    """새 파일 시리얼이 이력보다 높은 보통의 경우: 이력이 10배여도 검사 비용은 그대로"""
+    small = history_index(tmp_path / "small.db", range(2))
+    large = history_index(tmp_path / "large.db", range(20))
+    new = lot_file(200, 20 * FILE_SPAN, 99)
+    small_steps, small_conflicts = upload_steps(small, new)
+    large_steps, large_conflicts = upload_steps(large, new)
+    assert small_conflicts == large_conflicts == []
+    assert large_steps < 1.5 * small_steps
+
+
+def test_scattered_upload_reads_only_neighbours(tmp_path):
+    """이력 사이사이에 흩어진 새 구간: 이력 전체를 감싸는 범위가 아니라 새 구간 주변만 읽음"""
+    small = history_index(tmp_path / "small.db", [0, 19])
+    large = history_index(tmp_path / "large.db", range(20))
+    starts = [10, 10, 19 * FILE_SPAN + 10, 19 * FILE_SPAN + 10]
+    new = pd.DataFrame({"codes": ["A", "B", "A", "B"], "serialst": starts, "serialsp": [s + 5 for s in starts]})
+    small_steps, small_conflicts = upload_steps(small, new)
+    large_steps, large_conflicts = upload_steps(large, new)
+    assert small_conflicts and large_conflicts == small_conflicts
+    assert large_steps < 1.5 * small_steps
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sqlite_window_matches_loaded_codes(tmp_path, seed):
+    """로딩된 코드 (정렬 배열) 와 로딩되지 않은 코드 (SQLite 후보 조회) 의 중복 결과가 같음"""
+    rng = np.random.default_rng(seed)
+    files = []
+    for i in range(4):
+        start = rng.integers(0, 20_000, 500)
+        files.append(pd.DataFrame({
+            "codes": rng.choice(["A", "B", "C"], 500),
+            "serialst": start,
+            "serialsp": start + rng.integers(0, 300, 500),
+        }))
+    cold = SerialIndex(str(tmp_path / "cold.db"), max_codes=0)
+    warm = SerialIndex(str(tmp_path / "warm.db"), max_codes=16)
+    for i, df in enumerate(files):
+        for code in ["A", "B", "C"]:
+            warm.query(code, 0)  # 코드를 메모리에 로딩
+        key = lambda conflict: (conflict["row"], conflict["other_dataset_id"], conflict["other_row"])
+        expected = sorted(warm.add_dataset(f"f{i}", df), key=key)
+        actual = sorted(cold.add_dataset(f"f{i}", df), key=key)
+        assert actual == expected
+        assert i == 0 or actual
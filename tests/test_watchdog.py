@@ -0,0 +1,52 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from app.workers import watchdog_worker
+from app.workers.watchdog_worker import IngestPipeline
+
+
+@pytest.fixture
+def pipeline():
+    return IngestPipeline(workers=1, queue_size=4, debounce=0.0, poll=0.01)
+
+
+def lot_csv(path, first_serial: int):
+    pd.DataFrame({
+        "codes": ["A", "A", "B"],
+        "lotno": ["L1", "L2", "L1"],
+        "serialst": [first_serial, first_serial + 10, first_serial],
+        "serialsp": [first_serial + 5, first_serial + 20, first_serial + 9],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def outputs() -> set:
+    return set(os.listdir(watchdog_worker.OUTPUT_DIR))
+
+
+def test_same_content_is_processed_once(tmp_path, pipeline):
+    first = lot_csv(tmp_path / "lots.csv", 7_000_000)
+    before = outputs()
+    assert pipeline.process(first) == "processed"
+    created = outputs() - before
+    assert len(created) == 1
+
+    # 같은 내용이 다른 이름으로 와도 다시 처리하지 않음
+    renamed = shutil.copy(first, tmp_path / "lots_copy.csv")
+    assert pipeline.process(renamed) == "skipped"
+
+    # 결과 파일을 지워도 다시 처리하지 않음
+    for name in created:
+        os.remove(os.path.join(watchdog_worker.OUTPUT_DIR, name))
+    assert pipeline.process(first) == "skipped"
+    assert outputs() == before
+
+
+def test_changed_content_is_processed(tmp_path, pipeline):
+    path = lot_csv(tmp_path / "lots.csv", 8_000_000)
+    assert pipeline.process(path) == "processed"
+    lot_csv(tmp_path / "lots.csv", 9_000_000)
+    assert pipeline.process(path) == "processed"